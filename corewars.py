@@ -3,41 +3,117 @@ import argparse
 import sys
 
 from src.args import IntBetween, check_warrior_count
-from src.config import SCREEN_X, SCREEN_Y
+from src.checkpoint import Checkpoint
+from src.config import SCREEN_X, SCREEN_Y, MAX_PROCESSES, CLOCK_TICKS, MAX_WARRIORS, MAX_CORE_SIZE, \
+    MAX_ROUNDS, MAX_CYCLES, CHECKPOINT_INTERVAL, MIN_SEED, MAX_SEED
 from src.file import get_warrior_list
 from src.game import Game
-from src.gui.gui import PyGameGUI, MockGUI
+from src.gui.gui import PyGameGUI, MockGUI, SimulationAbortedException
+from src.trace import TraceReader
 
 
 def parse_args(args):
     parser = argparse.ArgumentParser()
-    parser.add_argument('warriors', nargs='*', action=check_warrior_count(5))
-    parser.add_argument('--rounds', nargs='?', default=10, type=IntBetween(1, 10))
-    parser.add_argument('--core-size', nargs='?', default=8000, type=IntBetween(100, 8000))
-    parser.add_argument('--max-cycles', nargs='?', default=80000, type=IntBetween(100, 100000))
+    parser.add_argument('warriors', nargs='*', action=check_warrior_count(MAX_WARRIORS))
+    parser.add_argument('--rounds', nargs='?', default=10, type=IntBetween(1, MAX_ROUNDS))
+    parser.add_argument('--core-size', nargs='?', default=8000, type=IntBetween(100, MAX_CORE_SIZE))
+    parser.add_argument('--max-cycles', nargs='?', default=80000, type=IntBetween(100, MAX_CYCLES))
+    parser.add_argument('--max-processes', nargs='?', default=MAX_PROCESSES, type=IntBetween(1, MAX_CORE_SIZE))
+    parser.add_argument('--speed', nargs='?', default=CLOCK_TICKS, type=IntBetween(0, 1000000))
     parser.add_argument('--no-gui', action='store_true')
+    parser.add_argument('--seed', nargs='?', default=None, type=IntBetween(MIN_SEED, MAX_SEED))
+    parser.add_argument('--replay-round', nargs='?', default=None, type=IntBetween(1, MAX_ROUNDS),
+                        help='Play only given round of the game with --seed')
+    parser.add_argument('--trace', nargs='?', default=None,
+                        help='Record every round to binary trace TRACE<round number>.trace')
+    parser.add_argument('--replay-trace', nargs='?', default=None, help='Show recorded trace without simulation')
+    parser.add_argument('--start-cycle', nargs='?', default=0, type=IntBetween(0, MAX_CYCLES),
+                        help='First cycle shown by --replay-trace')
+    parser.add_argument('--checkpoint', nargs='?', default=None,
+                        help='Save the game to CHECKPOINT file; the file is removed when the game is finished')
+    parser.add_argument('--checkpoint-interval', nargs='?', default=CHECKPOINT_INTERVAL,
+                        type=IntBetween(1, MAX_CYCLES), help='Simulation steps between checkpoints')
+    parser.add_argument('--resume', nargs='?', default=None, help='Resume the game saved with --checkpoint')
     return parser.parse_args(args[1:])
 
 
+def replay_trace(path, speed, start_cycle):
+    reader = TraceReader.from_file(path)
+    gui = PyGameGUI(SCREEN_X, SCREEN_Y, reader.core_size(), speed)
+    try:
+        reader.replay(gui, start_cycle)
+        print(f'Replayed {reader.cycles()} cycles of {", ".join(reader.warrior_names())}')
+    except SimulationAbortedException:
+        print('Replay aborted!')
+    gui.close()
+
+
+def resume(path, interval, speed, no_gui):
+    checkpoint = Checkpoint.open(path, interval)
+    core_size = checkpoint.settings()['core_size']
+    gui = MockGUI(core_size) if no_gui else PyGameGUI(SCREEN_X, SCREEN_Y, core_size, speed)
+    game = Game.resume(checkpoint, gui)
+    game.play()
+    finish_game(game, checkpoint, path)
+    gui.close()
+
+
+def finish_game(game, checkpoint, path):
+    """
+    Print results of played game and remove its checkpoint; aborted game keeps checkpoint to be resumed
+    :param game: Played Game
+    :param checkpoint: Optional Checkpoint of the game
+    :param path: Checkpoint path
+    """
+    if game.is_aborted():
+        print(f'Simulation aborted! Resume it with --resume {path}' if checkpoint else 'Simulation aborted!')
+        if checkpoint:
+            checkpoint.close()
+        return
+    if checkpoint:
+        checkpoint.remove()
+    print(game.get_results_string())
+
+
 def main(args):
     args = parse_args(args)
-    warriors = get_warrior_list(args.warriors)
+    if args.replay_trace:
+        replay_trace(args.replay_trace, args.speed, args.start_cycle)
+        return
+    if args.resume:
+        resume(args.resume, args.checkpoint_interval, args.speed, args.no_gui)
+        return
+    warriors = get_warrior_list(args.warriors, core_size=int(args.core_size))
     # Get args
     core_size = int(args.core_size)
     rounds = int(args.rounds)
     max_cycles = int(args.max_cycles)
+    max_processes = int(args.max_processes)
     no_gui = args.no_gui
     # Init gui
     if no_gui:
         gui = MockGUI(core_size)
     else:
-        gui = PyGameGUI(SCREEN_X, SCREEN_Y, core_size)
+        gui = PyGameGUI(SCREEN_X, SCREEN_Y, core_size, args.speed)
     # Init game
-    game = Game(warriors, core_size, gui, rounds, max_cycles)
-    # Play game
-    game.play()
-    # Print results
-    print(game.get_results_string())
+    checkpoint = Checkpoint(args.checkpoint, args.checkpoint_interval) if args.checkpoint else None
+    game = Game(warriors, core_size, gui, rounds, max_cycles, max_processes, args.seed, trace=args.trace,
+                checkpoint=checkpoint)
+    if args.replay_round:
+        if args.seed is None:
+            print('--replay-round requires --seed')
+        else:
+            # Replay single round
+            try:
+                round_obj = game.replay_round(game.round_record(args.replay_round), args.replay_round)
+                names = [warrior.warrior_info().name() for warrior in round_obj.get_alive_warriors()]
+                print(f'Round {args.replay_round} ended after {round_obj.cycles()} cycles; alive: {", ".join(names)}')
+            except SimulationAbortedException:
+                print('Simulation aborted!')
+    else:
+        # Play game and print results
+        game.play()
+        finish_game(game, checkpoint, args.checkpoint)
     # Close gui
     gui.close()
 
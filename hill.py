@@ -0,0 +1,34 @@
+#!/usr/bin/env python3
+import argparse
+import sys
+
+from src.args import IntBetween
+from src.config import MAX_PROCESSES, MAX_CORE_SIZE, MAX_ROUNDS, MAX_CYCLES, HILL_DATABASE
+from src.file import get_warrior_list
+from src.hill import Hill
+
+
+def parse_args(args):
+    parser = argparse.ArgumentParser()
+    parser.add_argument('warriors', nargs='*', help='Warriors to submit; without warriors only ranking is printed')
+    parser.add_argument('--database', nargs='?', default=HILL_DATABASE)
+    parser.add_argument('--rounds', nargs='?', default=100, type=IntBetween(1, MAX_ROUNDS))
+    parser.add_argument('--core-size', nargs='?', default=8000, type=IntBetween(100, MAX_CORE_SIZE))
+    parser.add_argument('--max-cycles', nargs='?', default=80000, type=IntBetween(100, MAX_CYCLES))
+    parser.add_argument('--max-processes', nargs='?', default=MAX_PROCESSES, type=IntBetween(1, MAX_CORE_SIZE))
+    return parser.parse_args(args[1:])
+
+
+def main(args):
+    args = parse_args(args)
+    hill = Hill(args.database, args.core_size, args.max_cycles, args.rounds, args.max_processes)
+    if args.warriors:
+        for warrior in get_warrior_list(args.warriors, core_size=args.core_size):
+            played = hill.submit(warrior)
+            print(f'{warrior.warrior_info().name()}: played {played} new pairing/s')
+    print(hill.get_results_string())
+    hill.close()
+
+
+if __name__ == '__main__':
+    main(sys.argv)
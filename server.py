@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+import argparse
+import asyncio
+import sys
+
+from src.args import IntBetween
+from src.config import SERVER_HOST, SERVER_PORT, SERVER_QUEUE_SIZE
+from src.server import BattleServer
+
+
+def parse_args(args):
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--host', nargs='?', default=SERVER_HOST)
+    parser.add_argument('--port', nargs='?', default=SERVER_PORT, type=IntBetween(0, 65535))
+    parser.add_argument('--socket', nargs='?', default=None, help='Listen on Unix socket instead of TCP')
+    parser.add_argument('--workers', nargs='?', default=None, type=IntBetween(1, 1024))
+    parser.add_argument('--queue-size', nargs='?', default=SERVER_QUEUE_SIZE, type=IntBetween(1, 1000000),
+                        help='Max jobs waiting for a worker')
+    return parser.parse_args(args[1:])
+
+
+async def serve(args):
+    server = BattleServer(args.workers, args.queue_size)
+    await server.start(args.host, args.port, args.socket)
+    print(f'Listening on {", ".join(str(address) for address in server.addresses())}')
+    try:
+        await server.serve_forever()
+    finally:
+        await server.close()
+
+
+def main(args):
+    args = parse_args(args)
+    try:
+        asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main(sys.argv)
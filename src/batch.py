@@ -0,0 +1,442 @@
+"""
+Batched engine which plays many independent rounds of the same warriors in lockstep with NumPy
+
+Cores of all rounds are stored as rows of 2-D arrays; every simulation step executes one instruction of a warrior
+in all rounds at once. Rounds execute different instructions, so lanes are grouped by opcode and modifier/mode
+differences are handled with lookup tables and masks. Results are the same as results of Round played after
+the same random.seed() (or with the same seeds), because warriors are placed with the same random calls.
+
+Requires numpy (optional dependency).
+"""
+import numpy as np
+
+from src.config import MAX_PROCESSES
+from src.core import OPCODES, MODIFIERS, MODES, OPCODE_CODES, MODIFIER_CODES, MODE_CODES, encode_instruction
+from src.enum.mode import Mode
+from src.enum.modifier import Modifier
+from src.instructions import DAT, MOV, ADD, SUB, MUL, DIV, MOD, JMP, JMZ, JMN, DJN, SEQ, SNE, SLT, SPL, NOP
+from src.round import draw_record
+
+
+def _table(codes, items, selected):
+    """
+    Lookup table indexed with encoded field
+    :param codes: Encoding dict
+    :param items: All encoded items
+    :param selected: Items for which table contains True
+    :return: Boolean array
+    """
+    table = np.zeros(len(items), dtype=bool)
+    for item in selected:
+        table[codes[item]] = True
+    return table
+
+
+# Address modes
+IS_IMMEDIATE = _table(MODE_CODES, MODES, [Mode.IMMEDIATE])
+IS_INDIRECT = _table(MODE_CODES, MODES, [mode for mode in Mode if mode not in (Mode.IMMEDIATE, Mode.DIRECT)])
+IS_A_FIELD_INDIRECT = _table(MODE_CODES, MODES,
+                             [Mode.A_INDIRECT, Mode.A_PRE_DEC_INDIRECT, Mode.A_POST_INC_INDIRECT])
+A_PRE_DEC = MODE_CODES[Mode.A_PRE_DEC_INDIRECT]
+B_PRE_DEC = MODE_CODES[Mode.B_PRE_DEC_INDIRECT]
+A_POST_INC = MODE_CODES[Mode.A_POST_INC_INDIRECT]
+B_POST_INC = MODE_CODES[Mode.B_POST_INC_INDIRECT]
+
+# Modifiers; see operation() of instructions
+MODIFIER_I = MODIFIER_CODES[Modifier.I]
+WRITES_A = _table(MODIFIER_CODES, MODIFIERS, [Modifier.A, Modifier.BA, Modifier.F, Modifier.X, Modifier.I])
+WRITES_B = _table(MODIFIER_CODES, MODIFIERS, [Modifier.B, Modifier.AB, Modifier.F, Modifier.X, Modifier.I])
+MOV_A_FROM_B = _table(MODIFIER_CODES, MODIFIERS, [Modifier.BA, Modifier.X])
+MOV_B_FROM_A = _table(MODIFIER_CODES, MODIFIERS, [Modifier.AB, Modifier.X])
+ARITHMETIC_A_FROM_B = _table(MODIFIER_CODES, MODIFIERS, [Modifier.BA])
+ARITHMETIC_A_BY_B = _table(MODIFIER_CODES, MODIFIERS, [Modifier.X])
+ARITHMETIC_B_BY_A = _table(MODIFIER_CODES, MODIFIERS, [Modifier.AB, Modifier.X])
+TESTS_A = _table(MODIFIER_CODES, MODIFIERS, [Modifier.A, Modifier.BA])
+TESTS_B = _table(MODIFIER_CODES, MODIFIERS, [Modifier.B, Modifier.AB])
+COMPARES_A_B = _table(MODIFIER_CODES, MODIFIERS, [Modifier.B, Modifier.BA])
+COMPARES_TO_B = _table(MODIFIER_CODES, MODIFIERS, [Modifier.B, Modifier.AB, Modifier.X])
+COMPARES_TWICE = _table(MODIFIER_CODES, MODIFIERS, [Modifier.F, Modifier.X])
+COMPARES_X = _table(MODIFIER_CODES, MODIFIERS, [Modifier.X])
+
+ARITHMETIC_UFUNCS = {
+    OPCODE_CODES[ADD]: np.add,
+    OPCODE_CODES[SUB]: np.subtract,
+    OPCODE_CODES[MUL]: np.multiply,
+    OPCODE_CODES[DIV]: np.floor_divide,
+    OPCODE_CODES[MOD]: np.remainder,
+}
+DIVIDING = (OPCODE_CODES[DIV], OPCODE_CODES[MOD])
+COMPARISON_UFUNCS = {
+    OPCODE_CODES[SEQ]: np.equal,
+    OPCODE_CODES[SNE]: np.not_equal,
+    OPCODE_CODES[SLT]: np.less,
+}
+
+# Opcodes with the same execution path share a group
+DAT_GROUP, MOV_GROUP, ARITHMETIC_GROUP, JMP_GROUP, JMZ_GROUP, JMN_GROUP, DJN_GROUP, COMPARE_GROUP, SPL_GROUP, \
+    NOP_GROUP = range(10)
+OPCODE_GROUPS = np.array([{
+    DAT: DAT_GROUP, MOV: MOV_GROUP, ADD: ARITHMETIC_GROUP, SUB: ARITHMETIC_GROUP, MUL: ARITHMETIC_GROUP,
+    DIV: ARITHMETIC_GROUP, MOD: ARITHMETIC_GROUP, JMP: JMP_GROUP, JMZ: JMZ_GROUP, JMN: JMN_GROUP, DJN: DJN_GROUP,
+    SEQ: COMPARE_GROUP, SNE: COMPARE_GROUP, SLT: COMPARE_GROUP, SPL: SPL_GROUP, NOP: NOP_GROUP
+}[instruction_class] for instruction_class in OPCODES], dtype=np.int8)
+
+
+class BatchRound:
+    def __init__(self, warriors, rounds, core_size=8000, max_cycles=80000, max_processes=MAX_PROCESSES, seeds=None):
+        """
+        Many rounds between the same warriors played at once
+        :param warriors: Warriors list; warriors aren't modified, only results are added to their WarriorInfo
+        :param rounds: Number of rounds played in lockstep
+        :param core_size: Core size
+        :param max_cycles: Max cycles of single round
+        :param max_processes: Max processes of single warrior
+        :param seeds: Optional list of placement seeds of every round; see Round
+        """
+        self._warriors = warriors
+        self._seeds = seeds if seeds is not None else [None] * rounds
+        self._records = []
+        self._rounds = rounds
+        self._core_size = core_size
+        self._max_cycles = max_cycles
+        self._max_processes = max_processes
+        # Cores of all rounds; row is a core, flat views are used for indexing with lane * core_size + address
+        cells = rounds * core_size
+        opcode, modifier, a_mode, a_value, b_mode, b_value = encode_instruction(DAT('F', '$', 0, '$', 0))
+        self._opcodes = np.full(cells, opcode, dtype=np.uint8)
+        self._modifiers = np.full(cells, modifier, dtype=np.uint8)
+        self._a_modes = np.full(cells, a_mode, dtype=np.uint8)
+        # Values are kept mod core size like in Core; int64 so products in arithmetic don't overflow
+        self._a_values = np.full(cells, a_value, dtype=np.int64)
+        self._b_modes = np.full(cells, b_mode, dtype=np.uint8)
+        self._b_values = np.full(cells, b_value, dtype=np.int64)
+        # Circular process queue of every warrior in every round
+        self._queues = [np.zeros(rounds * max_processes, dtype=np.int64) for _ in warriors]
+        self._heads = [np.zeros(rounds, dtype=np.int64) for _ in warriors]
+        self._counts = [np.zeros(rounds, dtype=np.int64) for _ in warriors]
+        self._loses = [np.zeros(rounds, dtype=np.int64) for _ in warriors]
+        self._cycles = np.zeros(rounds, dtype=np.int64)
+        self.init_warriors()
+
+    def init_warriors(self):
+        """
+        Load warriors into all cores; positions are drawn like in Round.init_warriors()
+        """
+        encoded = {id(warrior): np.array([encode_instruction(instruction) for instruction in warrior.instructions()],
+                                         dtype=np.int64).reshape(-1, 6) for warrior in self._warriors}
+        self._records = [draw_record(len(self._warriors), self._core_size, seed) for seed in self._seeds]
+        for lane, record in enumerate(self._records):
+            for warrior_index in record.order:
+                warrior = self._warriors[warrior_index]
+                self._init_warrior(lane, warrior_index, encoded[id(warrior)], record.positions[warrior_index],
+                                   warrior.start())
+
+    def _init_warrior(self, lane, warrior, fields, starting_core_address, start=0):
+        addresses = lane * self._core_size + (starting_core_address + np.arange(len(fields))) % self._core_size
+        self._opcodes[addresses] = fields[:, 0]
+        self._modifiers[addresses] = fields[:, 1]
+        self._a_modes[addresses] = fields[:, 2]
+        self._a_values[addresses] = fields[:, 3] % self._core_size
+        self._b_modes[addresses] = fields[:, 4]
+        self._b_values[addresses] = fields[:, 5] % self._core_size
+        self._heads[warrior][lane] = 0
+        self._queues[warrior][lane * self._max_processes] = (starting_core_address + start) % self._core_size
+        self._counts[warrior][lane] = 1
+
+    def rounds(self):
+        return self._rounds
+
+    def records(self):
+        """
+        :return: List of RoundRecord of every round; see Round.record()
+        """
+        return self._records
+
+    def cycles(self):
+        """
+        :return: Array of executed cycles of every round
+        """
+        return self._cycles
+
+    def core_fields(self, lane):
+        """
+        Copy core of single round
+        :param lane: Round index
+        :return: Tuple of opcode, modifier, A-mode, A-value, B-mode, B-value lists (as in Core arrays)
+        """
+        cells = slice(lane * self._core_size, (lane + 1) * self._core_size)
+        return tuple(field[cells].tolist() for field in (self._opcodes, self._modifiers, self._a_modes,
+                                                         self._a_values, self._b_modes, self._b_values))
+
+    def process_counts(self):
+        """
+        :return: Array (warriors x rounds) of queued processes
+        """
+        return np.array(self._counts)
+
+    def is_ended(self):
+        """
+        :return: Boolean array; True for rounds which are ended
+        """
+        alive = (self.process_counts() > 0).sum(axis=0)
+        return (alive <= 1) | (self._cycles > self._max_cycles)
+
+    def simulation_step(self, active):
+        """
+        Execute one queued instruction of every warrior in active rounds
+        :param active: Indexes of rounds to step
+        """
+        for warrior in range(len(self._warriors)):
+            lanes = active[self._counts[warrior][active] > 0]
+            if lanes.size:
+                self._execute(lanes, warrior)
+                self._cycles[lanes] += 1
+                # Warrior without processes lost the round
+                self._loses[warrior][lanes[self._counts[warrior][lanes] == 0]] += 1
+
+    def play(self):
+        """
+        Play all rounds until every round is ended, then add results to warriors' WarriorInfo
+        """
+        active = np.flatnonzero(~self.is_ended())
+        while active.size:
+            self.simulation_step(active)
+            active = active[~self.is_ended()[active]]
+        for warrior, (wins, loses, ties) in zip(self._warriors, self.results()):
+            warrior.warrior_info().add_results(wins, loses, ties)
+
+    def results(self):
+        """
+        Results of ended rounds, counted like in Round.update_warriors_results()
+        :return: List of (wins, loses, ties) tuples in warriors order
+        """
+        alive = self.process_counts() > 0
+        alive_count = alive.sum(axis=0)
+        return [(int((alive[i] & (alive_count == 1)).sum()), int(self._loses[i].sum()),
+                 int((alive[i] & (alive_count > 1)).sum())) for i in range(len(self._warriors))]
+
+    def _next_process(self, lanes, warrior):
+        heads = self._heads[warrior]
+        positions = self._queues[warrior][lanes * self._max_processes + heads[lanes]]
+        heads[lanes] = (heads[lanes] + 1) % self._max_processes
+        self._counts[warrior][lanes] -= 1
+        return positions
+
+    def _add_process(self, lanes, warrior, positions):
+        """
+        Queue positions; ignored in rounds where queue is full
+        """
+        counts = self._counts[warrior]
+        not_full = counts[lanes] < self._max_processes
+        lanes = lanes[not_full]
+        slots = (self._heads[warrior][lanes] + counts[lanes]) % self._max_processes
+        self._queues[warrior][lanes * self._max_processes + slots] = positions[not_full] % self._core_size
+        counts[lanes] += 1
+
+    def _resolve(self, base, position, mode, value):
+        """
+        Get pointer relative to position; performs predecrement
+        """
+        size = self._core_size
+        pointer = np.where(IS_IMMEDIATE[mode], 0, value)
+        indirect = np.flatnonzero(IS_INDIRECT[mode])
+        if indirect.size:
+            mode = mode[indirect]
+            value = value[indirect]
+            base = base[indirect]
+            address = base + (position[indirect] + value) % size
+            self._decrement(self._a_values, address[mode == A_PRE_DEC])
+            self._decrement(self._b_values, address[mode == B_PRE_DEC])
+            pointer[indirect] = np.where(IS_A_FIELD_INDIRECT[mode], self._a_values[address],
+                                         self._b_values[address]) + value
+        return pointer
+
+    def _postincrement(self, base, position, mode, value):
+        address = base + (position + value) % self._core_size
+        a_incremented = address[mode == A_POST_INC]
+        self._a_values[a_incremented] = (self._a_values[a_incremented] + 1) % self._core_size
+        b_incremented = address[mode == B_POST_INC]
+        self._b_values[b_incremented] = (self._b_values[b_incremented] + 1) % self._core_size
+
+    def _decrement(self, values, addresses):
+        values[addresses] = (values[addresses] - 1) % self._core_size
+
+    def _execute(self, lanes, warrior):
+        """
+        Execute instruction of warrior in every lane; equivalent of compiled Instruction.compile() execute
+        """
+        size = self._core_size
+        base = lanes * size
+        position = self._next_process(lanes, warrior)
+        address = base + position
+        opcode = self._opcodes[address]
+        a_mode = self._a_modes[address]
+        b_mode = self._b_modes[address]
+        a_value = self._a_values[address]
+        b_value = self._b_values[address]
+
+        # Operands; values are snapshotted before postincrement like in compiled instructions
+        a_pointer = self._resolve(base, position, a_mode, a_value)
+        a_address = base + (position + a_pointer) % size
+        a = self._a_values[a_address], self._b_values[a_address]
+        self._postincrement(base, position, a_mode, a_value)
+        b_pointer = self._resolve(base, position, b_mode, b_value)
+        b_address = base + (position + b_pointer) % size
+        b = self._a_values[b_address], self._b_values[b_address]
+        self._postincrement(base, position, b_mode, b_value)
+
+        operands = Operands(self._modifiers[address], a_address, b_address, a, b)
+        next_position = position + 1
+        killed = np.zeros(lanes.size, dtype=bool)
+        groups = OPCODE_GROUPS[opcode]
+        for group in np.unique(groups):
+            selected = np.flatnonzero(groups == group)
+            if group == DAT_GROUP:
+                killed[selected] = True
+            elif group == MOV_GROUP:
+                self._mov(operands.select(selected))
+            elif group == ARITHMETIC_GROUP:
+                for code in np.unique(opcode[selected]):
+                    same_opcode = selected[opcode[selected] == code]
+                    killed[same_opcode] = self._arithmetic(code, operands.select(same_opcode))
+            elif group == JMP_GROUP:
+                next_position[selected] = position[selected] + a_pointer[selected]
+            elif group in (JMZ_GROUP, JMN_GROUP, DJN_GROUP):
+                jump = self._jump_test(group, operands.select(selected))
+                next_position[selected] = position[selected] + np.where(jump, a_pointer[selected], 1)
+            elif group == COMPARE_GROUP:
+                for code in np.unique(opcode[selected]):
+                    same_opcode = selected[opcode[selected] == code]
+                    skip = self._compare(code, operands.select(same_opcode))
+                    next_position[same_opcode] = position[same_opcode] + np.where(skip, 2, 1)
+
+        alive = np.flatnonzero(~killed)
+        self._add_process(lanes[alive], warrior, next_position[alive])
+        split = np.flatnonzero(groups == SPL_GROUP)
+        if split.size:
+            self._add_process(lanes[split], warrior, position[split] + a_pointer[split])
+
+    def _mov(self, operands):
+        modifier = operands.modifier
+        a_a, a_b = operands.a
+        target = operands.b_address
+        whole = modifier == MODIFIER_I
+        if whole.any():
+            source = operands.a_address[whole]
+            cell = target[whole]
+            self._opcodes[cell] = self._opcodes[source]
+            self._modifiers[cell] = self._modifiers[source]
+            self._a_modes[cell] = self._a_modes[source]
+            self._b_modes[cell] = self._b_modes[source]
+            self._a_values[cell] = a_a[whole]
+            self._b_values[cell] = a_b[whole]
+        fields = ~whole
+        writes_a = fields & WRITES_A[modifier]
+        self._a_values[target[writes_a]] = np.where(MOV_A_FROM_B[modifier], a_b, a_a)[writes_a]
+        writes_b = fields & WRITES_B[modifier]
+        self._b_values[target[writes_b]] = np.where(MOV_B_FROM_A[modifier], a_a, a_b)[writes_b]
+
+    def _arithmetic(self, opcode, operands):
+        """
+        :return: Boolean array; True for lanes where process was killed by division by zero
+        """
+        size = self._core_size
+        ufunc = ARITHMETIC_UFUNCS[opcode]
+        modifier = operands.modifier
+        a_a, a_b = operands.a
+        b_a, b_b = operands.b
+        target = operands.b_address
+
+        first_a = np.where(ARITHMETIC_A_FROM_B[modifier], b_b, b_a) % size
+        second_a = np.where(ARITHMETIC_A_BY_B[modifier], a_b, a_a) % size
+        first_b = b_b % size
+        second_b = np.where(ARITHMETIC_B_BY_A[modifier], a_a, a_b) % size
+        writes_a = WRITES_A[modifier]
+        writes_b = WRITES_B[modifier]
+        if opcode in DIVIDING:
+            # A field is written before B field is calculated, so only B write is skipped when B divisor is 0
+            failed_a = writes_a & (second_a == 0)
+            failed_b = writes_b & (second_b == 0)
+            second_a[second_a == 0] = 1
+            second_b[second_b == 0] = 1
+            writes_a = writes_a & ~failed_a
+            writes_b = writes_b & ~failed_a & ~failed_b
+            killed = failed_a | failed_b
+        else:
+            killed = np.zeros(modifier.size, dtype=bool)
+        self._a_values[target[writes_a]] = (ufunc(first_a, second_a) % size)[writes_a]
+        self._b_values[target[writes_b]] = (ufunc(first_b, second_b) % size)[writes_b]
+        return killed
+
+    def _jump_test(self, group, operands):
+        """
+        :return: Boolean array; True for lanes which jump to A pointer
+        """
+        modifier = operands.modifier
+        a_a, a_b = operands.a
+        tests_a = TESTS_A[modifier]
+        tests_b = TESTS_B[modifier]
+        if group == DJN_GROUP:
+            # Decrement A-pointed instruction; see DJN.operation()
+            address = operands.a_address
+            decremented_a = self._a_values[address] - 1
+            decremented_b = self._b_values[address] - 1
+            self._a_values[address] = np.where(tests_a | tests_b, decremented_a, decremented_b) % self._core_size
+            a_a = np.where(tests_b, a_a, decremented_a)
+            a_b = np.where(tests_a | tests_b, a_b, decremented_b)
+        if group == JMZ_GROUP:
+            return np.where(tests_a, a_a == 0, np.where(tests_b, a_b == 0, (a_a == 0) & (a_b == 0)))
+        b_b = operands.b[1]
+        return np.where(tests_a, a_a != 0, np.where(tests_b, a_b != 0, (a_a != 0) | (b_b != 0)))
+
+    def _compare(self, opcode, operands):
+        """
+        :return: Boolean array; True for lanes which skip next instruction
+        """
+        ufunc = COMPARISON_UFUNCS[opcode]
+        modifier = operands.modifier
+        a_a, a_b = operands.a
+        b_a, b_b = operands.b
+        skip = ufunc(np.where(COMPARES_A_B[modifier], a_b, a_a), np.where(COMPARES_TO_B[modifier], b_b, b_a))
+        twice = COMPARES_TWICE[modifier]
+        skip &= ~twice | ufunc(a_b, np.where(COMPARES_X[modifier], b_a, b_b))
+        whole = modifier == MODIFIER_I
+        if whole.any():
+            # Modifier I compares whole instructions for equality
+            source = operands.a_address[whole]
+            target = operands.b_address[whole]
+            skip[whole] = ((a_a[whole] == b_a[whole]) & (a_b[whole] == b_b[whole]) &
+                           (self._opcodes[source] == self._opcodes[target]) &
+                           (self._modifiers[source] == self._modifiers[target]) &
+                           (self._a_modes[source] == self._a_modes[target]) &
+                           (self._b_modes[source] == self._b_modes[target]))
+        return skip
+
+
+class Operands:
+    """
+    Decoded operands of instructions executed in lanes
+    """
+    __slots__ = ('modifier', 'a_address', 'b_address', 'a', 'b')
+
+    def __init__(self, modifier, a_address, b_address, a, b):
+        """
+        :param modifier: Modifier codes
+        :param a_address: Flat addresses of A operands
+        :param b_address: Flat addresses of B operands
+        :param a: Tuple (a_values, b_values) of A operands snapshot
+        :param b: Tuple (a_values, b_values) of B operands snapshot
+        """
+        self.modifier = modifier
+        self.a_address = a_address
+        self.b_address = b_address
+        self.a = a
+        self.b = b
+
+    def select(self, selected):
+        """
+        :param selected: Indexes of lanes
+        :return: Operands of selected lanes
+        """
+        return Operands(self.modifier[selected], self.a_address[selected], self.b_address[selected],
+                        (self.a[0][selected], self.a[1][selected]), (self.b[0][selected], self.b[1][selected]))
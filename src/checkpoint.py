@@ -0,0 +1,243 @@
+"""
+Checkpoints of long battles in memory-mapped file; interrupted game is resumed without parsing and simulation
+
+File layout (little endian):
+    header: CHECKPOINT_HEADER (magic, version, core size, max cycles, max processes, rounds, seed flag, seed,
+            warrior count), then every warrior as WARRIOR_LENGTH and warrior_to_bytes() data
+    two slots: SLOT_HEADER (sequence, round number, cycles), SLOT_WARRIOR (wins, loses, ties, process count) of every
+               warrior, Core.fields() arrays and process queue of every warrior as max processes unsigned ints
+
+Checkpoints are written to the older slot and its sequence is written last, so a checkpoint interrupted while it is
+written leaves the previous one valid. Every checkpoint is a bulk copy of the core arrays and process queues.
+"""
+import mmap
+import os
+import struct
+from array import array
+
+from src.config import CHECKPOINT_INTERVAL
+from src.core import Core
+from src.file import warrior_to_bytes, warrior_from_bytes
+from src.gui.colors import get_warrior_color
+from src.round import Round, RoundHooks
+
+CHECKPOINT_MAGIC = b'CWCK'
+CHECKPOINT_VERSION = 1
+# Magic, version, core size, max cycles, max processes, rounds, seed flag, seed, warrior count
+CHECKPOINT_HEADER = struct.Struct('<4sBIQIIBqH')
+WARRIOR_LENGTH = struct.Struct('<I')
+SLOT_HEADER = struct.Struct('<QIQ')  # Sequence (0 for invalid slot), round number, cycles
+SLOT_WARRIOR = struct.Struct('<IIII')  # Wins, loses, ties, process count
+PROCESS_TYPE = 'I'
+SLOT_COUNT = 2
+
+
+class Checkpoint:
+    def __init__(self, path, interval=CHECKPOINT_INTERVAL):
+        """
+        Checkpoint file; create() it for a new game or open() saved one
+        :param path: File path
+        :param interval: Simulation steps between checkpoints of a round
+        """
+        self._path = path
+        self._interval = interval
+        self._file = None
+        self._map = None
+        self._round = None
+        self._steps = 0
+        self._sequence = 0
+        self._settings = None
+        self._warriors = []
+
+    def create(self, warriors, core_size, max_cycles, max_processes, rounds=1, seed=None):
+        """
+        Create empty checkpoint file for a game; existing file is replaced
+        :param warriors: Warriors list
+        :param core_size: Core size
+        :param max_cycles: Max cycles of single round
+        :param max_processes: Max processes of single warrior
+        :param rounds: Rounds of the game
+        :param seed: Optional seed of the game; in range [MIN_SEED,MAX_SEED]
+        """
+        header = bytearray(CHECKPOINT_HEADER.pack(CHECKPOINT_MAGIC, CHECKPOINT_VERSION, core_size, max_cycles,
+                                                  max_processes, rounds, seed is not None, seed or 0, len(warriors)))
+        for warrior in warriors:
+            data = warrior_to_bytes(warrior)
+            header += WARRIOR_LENGTH.pack(len(data))
+            header += data
+        self.close()
+        self._read_settings(header)
+        self._file = open(self._path, 'w+b')
+        self._file.truncate(self._slots_offset + SLOT_COUNT * self._slot_size)
+        self._file.write(header)
+        self._file.flush()
+        self._map = mmap.mmap(self._file.fileno(), 0)
+        self._sequence = 0
+
+    @classmethod
+    def open(cls, path, interval=CHECKPOINT_INTERVAL):
+        """
+        Open saved checkpoint file
+        :raises ValueError: When file isn't a valid checkpoint
+        """
+        checkpoint = cls(path, interval)
+        checkpoint._file = open(path, 'r+b')
+        try:
+            checkpoint._map = mmap.mmap(checkpoint._file.fileno(), 0)
+        except ValueError:
+            checkpoint.close()
+            raise ValueError('Empty checkpoint file')
+        try:
+            checkpoint._read_settings(checkpoint._map)
+        except (struct.error, ValueError):
+            checkpoint.close()
+            raise ValueError('Invalid checkpoint file')
+        if len(checkpoint._map) != checkpoint._slots_offset + SLOT_COUNT * checkpoint._slot_size:
+            checkpoint.close()
+            raise ValueError('Invalid checkpoint file')
+        checkpoint._sequence = max(checkpoint._slot_header(slot)[0] for slot in range(SLOT_COUNT))
+        return checkpoint
+
+    def _read_settings(self, data):
+        """
+        Read header and compute layout of slots
+        :param data: bytes-like object starting with header
+        """
+        (magic, version, core_size, max_cycles, max_processes, rounds, has_seed, seed,
+         warrior_count) = CHECKPOINT_HEADER.unpack_from(data)
+        if magic != CHECKPOINT_MAGIC or version != CHECKPOINT_VERSION:
+            raise ValueError('Invalid checkpoint file')
+        self._settings = {'core_size': core_size, 'max_cycles': max_cycles, 'max_processes': max_processes,
+                          'rounds': rounds, 'seed': seed if has_seed else None}
+        offset = CHECKPOINT_HEADER.size
+        self._warriors = []
+        for _ in range(warrior_count):
+            length, = WARRIOR_LENGTH.unpack_from(data, offset)
+            offset += WARRIOR_LENGTH.size
+            self._warriors.append(warrior_from_bytes(bytes(data[offset:offset + length])))
+            offset += length
+        self._slots_offset = offset
+        self._core_bytes = Core(core_size).bytes_size()
+        self._queue_bytes = max_processes * array(PROCESS_TYPE).itemsize
+        self._slot_size = (SLOT_HEADER.size + warrior_count * SLOT_WARRIOR.size + self._core_bytes +
+                           warrior_count * self._queue_bytes)
+
+    def _slot_offset(self, slot):
+        return self._slots_offset + slot * self._slot_size
+
+    def _slot_header(self, slot):
+        return SLOT_HEADER.unpack_from(self._map, self._slot_offset(slot))
+
+    def settings(self):
+        """
+        :return: Dict with core_size, max_cycles, max_processes, rounds and seed of the game
+        """
+        return dict(self._settings)
+
+    def warriors(self):
+        """
+        :return: List of warriors saved in checkpoint; with colors of Game
+        """
+        for index, warrior in enumerate(self._warriors):
+            warrior.set_color(get_warrior_color(index))
+        return self._warriors
+
+    def update(self, round_obj):
+        """
+        Called by Round after every simulation step; saves checkpoint every interval steps
+        :param round_obj: Round
+        """
+        if round_obj is not self._round:
+            # Steps are counted from the start of every round
+            self._round = round_obj
+            self._steps = 0
+        self._steps += 1
+        if self._steps % self._interval == 0:
+            self.save(round_obj)
+
+    def save(self, round_obj):
+        """
+        Save state of the round into the older slot
+        :param round_obj: Round with warriors in the same order as in create()
+        """
+        self._sequence += 1
+        offset = self._slot_offset(self._sequence % SLOT_COUNT)
+        data = self._map
+        # Slot is invalid while it is written
+        SLOT_HEADER.pack_into(data, offset, 0, 0, 0)
+        position = offset + SLOT_HEADER.size
+        warriors = round_obj.warriors()
+        for warrior in warriors:
+            info = warrior.warrior_info()
+            SLOT_WARRIOR.pack_into(data, position, info.wins(), info.loses(), info.ties(), warrior.process_count())
+            position += SLOT_WARRIOR.size
+        for field in round_obj.core().fields():
+            view = memoryview(field).cast('B')
+            data[position:position + len(view)] = view
+            position += len(view)
+        size = round_obj.core().size()
+        for warrior in warriors:
+            queue = array(PROCESS_TYPE, [process % size for process in warrior.processes()]).tobytes()
+            data[position:position + len(queue)] = queue
+            position += self._queue_bytes
+        data.flush()
+        SLOT_HEADER.pack_into(data, offset, self._sequence, round_obj.number(), round_obj.cycles())
+        data.flush()
+
+    def has_round(self):
+        """
+        :return: True when any round was saved
+        """
+        return self._sequence > 0
+
+    def restore(self, gui=None):
+        """
+        Restore the latest saved round into warriors of warriors()
+        :param gui: Optional GUI of restored round
+        :return: Round which continues from saved cycle
+        :raises ValueError: When no round was saved
+        """
+        if not self.has_round():
+            raise ValueError('Checkpoint has no saved round')
+        offset = self._slot_offset(self._sequence % SLOT_COUNT)
+        sequence, round_number, cycles = SLOT_HEADER.unpack_from(self._map, offset)
+        position = offset + SLOT_HEADER.size
+        warriors = self.warriors()
+        counts = []
+        for warrior in warriors:
+            wins, loses, ties, count = SLOT_WARRIOR.unpack_from(self._map, position)
+            position += SLOT_WARRIOR.size
+            info = warrior.warrior_info()
+            info.add_results(wins - info.wins(), loses - info.loses(), ties - info.ties())
+            counts.append(count)
+        core = Core(self._settings['core_size'], gui=gui)
+        core.load_bytes(memoryview(self._map)[position:position + self._core_bytes])
+        position += self._core_bytes
+        for warrior, count in zip(warriors, counts):
+            queue = array(PROCESS_TYPE)
+            queue.frombytes(self._map[position:position + count * queue.itemsize])
+            position += self._queue_bytes
+            warrior.clear_processes()
+            warrior.set_max_processes(self._settings['max_processes'])
+            for process in queue:
+                warrior.add_process(process)
+        round_obj = Round(warriors, core=core, init_warriors=False, gui=gui, number=round_number,
+                          max_cycles=self._settings['max_cycles'], max_processes=self._settings['max_processes'],
+                          hooks=RoundHooks(checkpoint=self))
+        round_obj.set_cycles(cycles)
+        return round_obj
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def remove(self):
+        """
+        Close and delete checkpoint file; called when game is finished
+        """
+        self.close()
+        os.remove(self._path)
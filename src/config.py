@@ -4,7 +4,29 @@ os.environ['PYGAME_HIDE_SUPPORT_PROMPT'] = "hide"  # Hide pygame welcome message
 
 DEFAULT_WARRIORS_DIRECTORY = "warriors/"
 DEFAULT_WARRIOR_COUNT = 3
+WARRIOR_CACHE_DIRECTORY = ".warrior_cache/"  # Parsed warriors cache used by tournament
+HILL_DATABASE = "hill.sqlite3"  # Stored results of hill pairings
+
+# Limits of command line arguments
+MAX_WARRIORS = 64
+MAX_CORE_SIZE = 1000000
+MAX_ROUNDS = 100000
+MAX_CYCLES = 10000000
 WARRIOR_DEFAULT_NAME = "Warrior"
+MAX_PROCESSES = 8000  # ICWS'94 MAXPROCESSES
+TIE_CHECK_WINDOW = 500  # Simulation steps between checks of early tie detection
+EVENT_BUFFER_SIZE = 4096  # Core events buffered by RecordingSink before they are flushed
+TRACE_SNAPSHOT_INTERVAL = 1000  # Cycles between core snapshots of battle traces
+TRACE_BUFFER_SIZE = 65536  # Bytes of trace records buffered before they are written to file
+CHECKPOINT_INTERVAL = 10000  # Simulation steps between checkpoints of a round
+MIN_SEED = -2 ** 63  # Seeds are saved in checkpoints as signed 64-bit integers
+MAX_SEED = 2 ** 63 - 1
+
+# Battle server
+SERVER_HOST = "127.0.0.1"
+SERVER_PORT = 7700
+SERVER_QUEUE_SIZE = 64  # Jobs waiting for a worker; requests aren't read from clients while queue is full
+MAX_REQUEST_SIZE = 1048576  # Bytes of single request line
 
 # GUI
 BLOCKS_X = 100  # Blocks in x-axis
@@ -13,6 +35,9 @@ BLOCKS_X = 100  # Blocks in x-axis
 SCREEN_X = 1200  # Window width
 SCREEN_Y = 800  # Window height
 FONT_LOCATION = "font/font.ttf"
-CLOCK_TICKS = 250
-BLOCK_SIZE = 10
+CLOCK_TICKS = 250  # Default simulation steps per second
+FRAMES_PER_SECOND = 60
+TEXT_CACHE_SIZE = 256  # Rendered text surfaces kept in cache
+BLOCK_SIZE = 10  # Max block size; blocks are smaller when core doesn't fit in window
+MIN_DECORATED_BLOCK_SIZE = 5
 WINDOW_TITLE = "Corewars"
@@ -1,17 +1,85 @@
+from array import array
 from enum import Enum
 
 from src.enum.event import CoreEvent
 from src.enum.mode import Mode
-from src.instructions import DAT
+from src.enum.modifier import Modifier
+from src.instructions import DAT, MOV, ADD, SUB, MUL, DIV, MOD, JMP, JMZ, JMN, DJN, SEQ, SNE, SLT, SPL, NOP
+from src.instructions import Instruction, compile_instruction
+from src.sinks import NULL_SINK
 
+# Field encodings used by the core arrays; index in tuple is the stored code
+OPCODES = (DAT, MOV, ADD, SUB, MUL, DIV, MOD, JMP, JMZ, JMN, DJN, SEQ, SNE, SLT, SPL, NOP)
+MODIFIERS = tuple(Modifier)
+MODES = tuple(Mode)
 
-def prepare_core(size):
+OPCODE_CODES = {instruction_class: code for code, instruction_class in enumerate(OPCODES)}
+MODIFIER_CODES = {modifier: code for code, modifier in enumerate(MODIFIERS)}
+MODE_CODES = {mode: code for code, mode in enumerate(MODES)}
+
+
+def encode_instruction(instruction):
+    """
+    Encode instruction into core array codes
+    :param instruction: Instruction object
+    :return: Tuple (opcode, modifier, a_mode, a_value, b_mode, b_value) of ints
+    """
+    return (
+        OPCODE_CODES[type(instruction)],
+        MODIFIER_CODES[instruction.modifier()],
+        MODE_CODES[instruction.a_mode()],
+        instruction.a_value(),
+        MODE_CODES[instruction.b_mode()],
+        instruction.b_value()
+    )
+
+
+def compile_cell(instruction, folding=False, events=False):
     """
-    Generate data with single instruction
+    Get compiled execute function for instruction stored in core
+    :param instruction: Instruction object
+    :param folding: Compile for core with read/write limits
+    :param events: Compile for core with event sink
+    :return: Function (core, position, a_value, b_value, warrior)
+    """
+    return compile_instruction(type(instruction), instruction.modifier(), instruction.a_mode(), instruction.b_mode(),
+                               folding, events)
+
+
+def prepare_core(size, folding=False, events=False):
+    """
+    Generate core buffers filled with single instruction
+    Values are kept mod core size, so they are stored as fixed width unsigned ints.
     :param size: Core size
-    :return: Core data
+    :param folding: Compile handlers for core with read/write limits
+    :param events: Compile handlers for core with event sink
+    :return: Tuple of opcode, modifier, A-mode, A-value, B-mode, B-value arrays and compiled handlers list
     """
-    return [DAT('F', '$', 0, '$', 0) for _ in range(size)]
+    instruction = DAT('F', '$', 0, '$', 0)
+    opcode, modifier, a_mode, a_value, b_mode, b_value = encode_instruction(instruction)
+    return (
+        array('B', [opcode]) * size,
+        array('B', [modifier]) * size,
+        array('B', [a_mode]) * size,
+        array('I', [a_value]) * size,
+        array('B', [b_mode]) * size,
+        array('I', [b_value]) * size,
+        [compile_cell(instruction, folding, events)] * size
+    )
+
+
+def fold(pointer, limit, size):
+    """
+    ICWS'94 read/write limit folding
+    :param pointer: Pointer relative to instruction; 0 <= pointer < size
+    :param limit: Read or write limit; divisor of size
+    :param size: Core size
+    :return: Pointer in range (-limit / 2, limit / 2] stored mod size
+    """
+    pointer %= limit
+    if pointer > limit // 2:
+        pointer += size - limit
+    return pointer
 
 
 class FieldLetter(Enum):
@@ -19,35 +87,263 @@ class FieldLetter(Enum):
     B = 'B'
 
 
+# Field used by indirect modes
+INDIRECT_FIELDS = {
+    Mode.A_INDIRECT: FieldLetter.A,
+    Mode.A_PRE_DEC_INDIRECT: FieldLetter.A,
+    Mode.A_POST_INC_INDIRECT: FieldLetter.A,
+    Mode.B_INDIRECT: FieldLetter.B,
+    Mode.B_PRE_DEC_INDIRECT: FieldLetter.B,
+    Mode.B_POST_INC_INDIRECT: FieldLetter.B,
+}
+PREDECREMENT_MODES = frozenset((Mode.A_PRE_DEC_INDIRECT, Mode.B_PRE_DEC_INDIRECT))
+POSTINCREMENT_MODES = frozenset((Mode.A_POST_INC_INDIRECT, Mode.B_POST_INC_INDIRECT))
+
+
+class CoreCell:
+    """
+    Lightweight view of a single core address; reads and writes go straight to the core arrays
+    """
+    __slots__ = ('_core', '_address')
+
+    def __init__(self, core, address):
+        self._core = core
+        self._address = address
+
+    def opcode(self):
+        return OPCODES[self._core.opcodes()[self._address]]
+
+    def modifier(self):
+        return MODIFIERS[self._core.modifiers()[self._address]]
+
+    def a_mode(self):
+        return MODES[self._core.a_modes()[self._address]]
+
+    def a_value(self):
+        return self._core.a_values()[self._address]
+
+    def b_mode(self):
+        return MODES[self._core.b_modes()[self._address]]
+
+    def b_value(self):
+        return self._core.b_values()[self._address]
+
+    def set_a_value(self, a_value):
+        self._core.set_a_value(self._address, a_value)
+
+    def set_b_value(self, b_value):
+        self._core.set_b_value(self._address, b_value)
+
+    def instruction(self):
+        """
+        Decode cell into standalone Instruction object
+        :return: Instruction which is a copy of cell content
+        """
+        return self._core.instruction(self._address)
+
+    def execute(self, core, position, warrior):
+        self.instruction().execute(core, position, warrior)
+
+    def __str__(self):
+        return str(self.instruction())
+
+    def __eq__(self, other):
+        if isinstance(other, CoreCell):
+            other = other.instruction()
+        elif isinstance(other, Instruction):
+            # Core stores values mod core size
+            size = self._core.size()
+            other = type(other).from_fields(other.modifier(), other.a_mode(), other.a_value() % size, other.b_mode(),
+                                            other.b_value() % size)
+        return self.instruction() == other
+
+
 class Core:
-    def __init__(self, size=250, data=None, gui=None):
+    def __init__(self, size=250, data=None, gui=None, read_limit=None, write_limit=None, sink=None):
         """
+        All field values are stored mod core size
         :param size: Optional for custom core size
         :param data: Optional param Use predefined core data; Useful for testing
+        :param gui: Optional GUI; events are sent to its event sink when sink isn't given
+        :param read_limit: Optional ICWS'94 read limit; divisor of core size, default is core size (no folding)
+        :param write_limit: Optional ICWS'94 write limit; divisor of core size, default is core size (no folding)
+        :param sink: Optional EventSink of core events; default ignores events
         """
         self._size = size if not data else len(data)
-        self._data = data if data else prepare_core(size)
-        self._gui = gui
+        self._read_limit = read_limit or self._size
+        self._write_limit = write_limit or self._size
+        if self._size % self._read_limit or self._size % self._write_limit:
+            raise ValueError('Read and write limits must be divisors of core size')
+        # Handlers which fold pointers are used only when limits are set, so default core isn't slowed down
+        self._folding = self._read_limit != self._size or self._write_limit != self._size
+        # Sink is chosen once; handlers of core without events are compiled without event calls
+        self._sink = sink or (gui.event_sink() if gui else NULL_SINK)
+        self._events = not self._sink.is_null()
+        (self._opcodes, self._modifiers, self._a_modes, self._a_values,
+         self._b_modes, self._b_values, self._handlers) = prepare_core(self._size, self._folding, self._events)
+        if data:
+            for address, instruction in enumerate(data):
+                self[address] = instruction
 
     def __getitem__(self, item):
         address = self.get_address_mod_core_size(item)
-        return self._data[address]
+        return CoreCell(self, address)
 
     def __setitem__(self, key, value):
         address = self.get_address_mod_core_size(key)
-        self._data[address] = value
+        if isinstance(value, CoreCell):
+            value = value.instruction()
+        opcode, modifier, a_mode, a_value, b_mode, b_value = encode_instruction(value)
+        self._opcodes[address] = opcode
+        self._modifiers[address] = modifier
+        self._a_modes[address] = a_mode
+        self._a_values[address] = a_value % self._size
+        self._b_modes[address] = b_mode
+        self._b_values[address] = b_value % self._size
+        self._handlers[address] = compile_cell(value, self._folding, self._events)
+
+    def execute(self, position, warrior):
+        """
+        Execute instruction at position with its compiled handler
+        :param position: Instruction position
+        :param warrior: Warrior which executes instruction
+        """
+        address = position % self._size
+        self._handlers[address](self, address, self._a_values[address], self._b_values[address], warrior)
+
+    def instruction(self, address):
+        """
+        Decode instruction stored at address
+        :param address: Core address
+        :return: New Instruction object; changes to it don't affect core
+        """
+        address = self.get_address_mod_core_size(address)
+        instruction_class = OPCODES[self._opcodes[address]]
+        return instruction_class.from_fields(
+            MODIFIERS[self._modifiers[address]],
+            MODES[self._a_modes[address]],
+            self._a_values[address],
+            MODES[self._b_modes[address]],
+            self._b_values[address]
+        )
+
+    def values(self, address):
+        """
+        :param address: Core address
+        :return: Tuple (a_value, b_value)
+        """
+        address %= self._size
+        return self._a_values[address], self._b_values[address]
+
+    def cell(self, address):
+        """
+        Copy whole cell into plain tuple
+        :param address: Core address
+        :return: Tuple (a_value, b_value, opcode, modifier, a_mode, b_mode) with encoded fields
+        """
+        address %= self._size
+        return (self._a_values[address], self._b_values[address], self._opcodes[address],
+                self._modifiers[address], self._a_modes[address], self._b_modes[address])
+
+    def set_cell(self, address, cell):
+        """
+        Write cell copied with cell()
+        :param address: Core address
+        :param cell: Tuple (a_value, b_value, opcode, modifier, a_mode, b_mode)
+        """
+        address %= self._size
+        a_value, b_value, opcode, modifier, a_mode, b_mode = cell
+        self._a_values[address] = a_value % self._size
+        self._b_values[address] = b_value % self._size
+        self._opcodes[address] = opcode
+        self._modifiers[address] = modifier
+        self._a_modes[address] = a_mode
+        self._b_modes[address] = b_mode
+        self._handlers[address] = compile_instruction(OPCODES[opcode], MODIFIERS[modifier], MODES[a_mode],
+                                                      MODES[b_mode], self._folding, self._events)
+
+    def fields(self):
+        """
+        :return: Tuple of core arrays in to_bytes() order
+        """
+        return self._opcodes, self._modifiers, self._a_modes, self._b_modes, self._a_values, self._b_values
+
+    def to_bytes(self):
+        """
+        Copy whole core with bulk copies of its arrays
+        :return: bytes of length bytes_size(); restore with load_bytes()
+        """
+        return b''.join(field.tobytes() for field in self.fields())
+
+    def bytes_size(self):
+        return sum(field.itemsize * len(field) for field in self.fields())
+
+    def load_bytes(self, data):
+        """
+        Restore core saved with to_bytes() of core with the same size; handlers are compiled again
+        :param data: bytes-like object of length bytes_size()
+        """
+        if len(data) != self.bytes_size():
+            raise ValueError('Core data doesn\'t match core size')
+        offset = 0
+        data = memoryview(data).cast('B')
+        for field in self.fields():
+            length = field.itemsize * len(field)
+            memoryview(field).cast('B')[:] = data[offset:offset + length]
+            offset += length
+        # Handlers are the same for cells with the same opcode, modifier and modes
+        handlers = {}
+        for address, key in enumerate(zip(self._opcodes, self._modifiers, self._a_modes, self._b_modes)):
+            handler = handlers.get(key)
+            if handler is None:
+                opcode, modifier, a_mode, b_mode = key
+                handler = handlers[key] = compile_instruction(OPCODES[opcode], MODIFIERS[modifier], MODES[a_mode],
+                                                              MODES[b_mode], self._folding, self._events)
+            self._handlers[address] = handler
+
+    def a_value(self, address):
+        return self._a_values[address % self._size]
+
+    def b_value(self, address):
+        return self._b_values[address % self._size]
+
+    def set_a_value(self, address, value):
+        self._a_values[address % self._size] = value % self._size
+
+    def set_b_value(self, address, value):
+        self._b_values[address % self._size] = value % self._size
+
+    def set_fields(self, address, a_value, b_value):
+        address %= self._size
+        self._a_values[address] = a_value % self._size
+        self._b_values[address] = b_value % self._size
+
+    def fold_read(self, pointer):
+        """
+        :param pointer: Pointer relative to instruction
+        :return: Pointer folded with read limit
+        """
+        return fold(pointer % self._size, self._read_limit, self._size)
+
+    def fold_write(self, pointer):
+        """
+        :param pointer: Pointer relative to instruction
+        :return: Pointer folded with write limit
+        """
+        return fold(pointer % self._size, self._write_limit, self._size)
 
     def get_address_mod_core_size(self, address):
         """
         Get cycled address
-        :param address: 
+        :param address:
         :return: Address which fit in core
         """
         return address % self._size
 
     def get_core_address_mode_value(self, mode, value, instruction_pos, warrior):
         """
-        Get indirect pointer to referenced instruction
+        Get indirect pointer to referenced instruction; generic version of resolvers from src/resolvers.py
+        which also folds pointers when core has read/write limits
         :param mode: Address mode
         :param value: Address value
         :param instruction_pos:
@@ -61,28 +357,17 @@ class Core:
             # Direct address to current position
             return value
 
-        position = instruction_pos + value
-        # Predecrement (if necessary)
-        self._check_predecrement(mode, value, warrior)
-        # Indirect addressing
-        if mode in (Mode.A_INDIRECT, Mode.A_PRE_DEC_INDIRECT, Mode.A_POST_INC_INDIRECT):
-            return self[position].a_value() + value
-        elif mode in (Mode.B_INDIRECT, Mode.B_PRE_DEC_INDIRECT, Mode.B_POST_INC_INDIRECT):
-            return self[position].b_value() + value
-
-    def _check_predecrement(self, mode, position, warrior):
-        """
-        Private method; checks if mode is predecrement and perform predecrement if necessary
-        :param mode: Instruction mode
-        :param position: Instruction position
-        :param warrior: Warrior which executed this instruction
-        """
-        if mode == Mode.A_PRE_DEC_INDIRECT:
-            self._add_value_to_core_instruction_field(position, FieldLetter.A, -1)
-            self.update_core_gui(position, warrior, CoreEvent.WRITE)
-        elif mode == Mode.B_PRE_DEC_INDIRECT:
-            self._add_value_to_core_instruction_field(position, FieldLetter.B, -1)
-            self.update_core_gui(position, warrior, CoreEvent.WRITE)
+        field_letter = INDIRECT_FIELDS[mode]
+        read_value = value
+        if self._folding:
+            # Indirect field is read within read limit and decremented within write limit
+            read_value = self.fold_read(value)
+            value = self.fold_write(value)
+        if mode in PREDECREMENT_MODES:
+            self._add_value_to_core_instruction_field(instruction_pos + value, field_letter, -1)
+            self.emit_event(instruction_pos + value, warrior, CoreEvent.WRITE)
+        values = self._a_values if field_letter == FieldLetter.A else self._b_values
+        return values[self.get_address_mod_core_size(instruction_pos + read_value)] + read_value
 
     def check_postincrement(self, mode, value, instruction_pos, warrior):
         """
@@ -92,13 +377,13 @@ class Core:
             :param instruction_pos: Instruction position
             :param warrior: Warrior which executed this instruction
         """
+        if mode not in POSTINCREMENT_MODES:
+            return
+        if self._folding:
+            value = self.fold_write(value)
         position = instruction_pos + value
-        if mode == Mode.A_POST_INC_INDIRECT:
-            self._add_value_to_core_instruction_field(position, FieldLetter.A, 1)
-            self.update_core_gui(position, warrior, CoreEvent.WRITE)
-        elif mode == Mode.B_POST_INC_INDIRECT:
-            self._add_value_to_core_instruction_field(position, FieldLetter.B, 1)
-            self.update_core_gui(position, warrior, CoreEvent.WRITE)
+        self._add_value_to_core_instruction_field(position, INDIRECT_FIELDS[mode], 1)
+        self.emit_event(position, warrior, CoreEvent.WRITE)
 
     def _add_value_to_core_instruction_field(self, position, field_letter, change):
         """
@@ -107,26 +392,59 @@ class Core:
         :param field_letter: FieldLetter.A or FieldLetter.B; adds to first field or second
         :param change: Value to add
         """
-        instruction = self[position]
+        address = self.get_address_mod_core_size(position)
         if field_letter == FieldLetter.A:
             # Adds change to instruction field A
-            value = instruction.a_value() + change
-            instruction.set_a_value(value)
+            self._a_values[address] = (self._a_values[address] + change) % self._size
         elif field_letter == FieldLetter.B:
             # Adds change to instruction field B
-            value = instruction.b_value() + change
-            instruction.set_b_value(value)
+            self._b_values[address] = (self._b_values[address] + change) % self._size
 
-    def update_core_gui(self, block_number, warrior, event):
+    def emit_event(self, address, warrior, event):
         """
-        Sends event to core to update block at block_number
-        :param block_number: Block number to be updated
-        :param warrior: Warrior which executes event
-        :param event: Event type
+        Send event to core event sink
+        :param address: Core address; any int
+        :param warrior: Warrior which caused event
+        :param event: CoreEvent
         """
-        if self._gui:
-            block_number = self.get_address_mod_core_size(block_number)
-            self._gui.set_block_color(block_number, warrior.color(), event)
+        if self._events:
+            self._sink.emit(address % self._size, warrior, event)
 
     def size(self):
         return self._size
+
+    def read_limit(self):
+        return self._read_limit
+
+    def write_limit(self):
+        return self._write_limit
+
+    def sink(self):
+        return self._sink
+
+    def has_events(self):
+        """
+        :return: True when events are sent to sink; see emit_event()
+        """
+        return self._events
+
+    def is_folding(self):
+        return self._folding
+
+    def opcodes(self):
+        return self._opcodes
+
+    def modifiers(self):
+        return self._modifiers
+
+    def a_modes(self):
+        return self._a_modes
+
+    def a_values(self):
+        return self._a_values
+
+    def b_modes(self):
+        return self._b_modes
+
+    def b_values(self):
+        return self._b_values
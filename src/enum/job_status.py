@@ -0,0 +1,8 @@
+from enum import Enum
+
+
+class JobStatus(Enum):
+    QUEUED = "queued"
+    FINISHED = "finished"
+    TIMEOUT = "timeout"  # Cycle limit of the job was reached
+    ERROR = "error"
@@ -1,9 +1,19 @@
 import glob
+import hashlib
 import os
 import random
+import struct
 
 from src.config import DEFAULT_WARRIORS_DIRECTORY, DEFAULT_WARRIOR_COUNT
+from src.core import OPCODES, MODIFIERS, MODES, encode_instruction
 from src.parser import parse_warrior
+from src.warrior import Warrior
+
+# Binary format of cached warriors: header, UTF-8 name, then fixed size records of encoded instructions
+CACHE_MAGIC = b'CWAR'
+CACHE_VERSION = 2  # Increase when format or parsing changes, so old cache files are ignored
+CACHE_HEADER = struct.Struct('<4sBHIq')  # Magic, version, name length, instruction count, start offset
+CACHE_INSTRUCTION = struct.Struct('<BBBqBq')  # Opcode, modifier, A-mode, A-value, B-mode, B-value
 
 
 def get_warrior_files(directory=DEFAULT_WARRIORS_DIRECTORY):
@@ -15,10 +25,85 @@ def get_warrior_files(directory=DEFAULT_WARRIORS_DIRECTORY):
     return glob.glob(directory + "*.red")
 
 
-def get_warrior_list(warrior_files):
+def warrior_to_bytes(warrior):
+    """
+    Serialize parsed warrior into cache format
+    :param warrior: Warrior object
+    :return: bytes
+    """
+    name = warrior.warrior_info().name().encode()
+    instructions = warrior.instructions()
+    data = [CACHE_HEADER.pack(CACHE_MAGIC, CACHE_VERSION, len(name), len(instructions), warrior.start()),
+            name]
+    data.extend(CACHE_INSTRUCTION.pack(*encode_instruction(instruction)) for instruction in instructions)
+    return b''.join(data)
+
+
+def warrior_from_bytes(data):
+    """
+    Deserialize warrior saved with warrior_to_bytes()
+    :param data: bytes
+    :return: Warrior object
+    :raises ValueError: When data isn't valid cache of current version
+    """
+    try:
+        magic, version, name_length, count, start = CACHE_HEADER.unpack_from(data)
+    except struct.error:
+        raise ValueError('Truncated warrior cache header')
+    offset = CACHE_HEADER.size + name_length
+    if magic != CACHE_MAGIC or version != CACHE_VERSION or len(data) != offset + count * CACHE_INSTRUCTION.size:
+        raise ValueError('Invalid warrior cache')
+    name = data[CACHE_HEADER.size:offset].decode()
+    try:
+        instructions = [
+            OPCODES[opcode].from_fields(MODIFIERS[modifier], MODES[a_mode], a_value, MODES[b_mode], b_value)
+            for opcode, modifier, a_mode, a_value, b_mode, b_value in CACHE_INSTRUCTION.iter_unpack(data[offset:])
+        ]
+    except IndexError:
+        raise ValueError('Invalid instruction in warrior cache')
+    return Warrior(instructions, name=name, start=start)
+
+
+def load_warrior(path, cache_directory=None, core_size=None):
+    """
+    Parse warrior file; with cache_directory parsed warrior is saved there and loaded next time instead of parsing
+    Cache files are named by SHA-256 of the source and core size, so changed files are parsed again.
+    :param path: Warrior file path
+    :param cache_directory: Optional cache directory path
+    :param core_size: Optional value of CORESIZE constant used in warrior expressions
+    :return: Warrior object
+    """
+    with open(path, 'rb') as file_handle:
+        source = file_handle.read()
+    constants = {'CORESIZE': core_size} if core_size else None
+    if cache_directory is None:
+        return parse_warrior(source.decode().splitlines(), constants=constants)
+
+    # Assembled warrior depends on CORESIZE, so it is part of the key
+    key = hashlib.sha256(source + f'\0{core_size or ""}'.encode()).hexdigest()
+    cache_path = os.path.join(cache_directory, key + '.bin')
+    try:
+        with open(cache_path, 'rb') as file_handle:
+            return warrior_from_bytes(file_handle.read())
+    except (OSError, ValueError):
+        # Not cached yet or cache file is broken; parse and (over)write it
+        pass
+    warrior = parse_warrior(source.decode().splitlines(), constants=constants)
+    os.makedirs(cache_directory, exist_ok=True)
+    # Write to temporary file first so other processes never read partially written cache
+    temporary_path = f'{cache_path}.{os.getpid()}.tmp'
+    with open(temporary_path, 'wb') as file_handle:
+        file_handle.write(warrior_to_bytes(warrior))
+    os.replace(temporary_path, cache_path)
+    return warrior
+
+
+def get_warrior_list(warrior_files, cache_directory=None, core_size=None):
     """
     Parse warriors from specified files or use default warriors directory
     :param warrior_files: List of warrior file paths
+    :param cache_directory: Optional directory of parsed warriors cache; see load_warrior()
+    :param core_size: Optional value of CORESIZE constant; see load_warrior()
     :return: Warrior objects list
     """
     if warrior_files:
@@ -32,7 +117,5 @@ def get_warrior_list(warrior_files):
     warriors = []
     for path in paths:
         if os.path.isfile(path):
-            with open(path, 'r') as file_handle:
-                warrior = parse_warrior(file_handle)
-                warriors.append(warrior)
+            warriors.append(load_warrior(path, cache_directory, core_size))
     return warriors
@@ -1,47 +1,203 @@
-from src.gui.colors import Color
-from src.round import Round
+import random
+
+from src.config import MAX_PROCESSES
+from src.gui.colors import get_warrior_color
+from src.gui.gui import SimulationAbortedException
+from src.round import Round, RoundHooks, draw_record
+from src.trace import TraceRecorder
+from src.warrior import Warrior
 
 
 class Game:
-    def __init__(self, warriors, core_size=8000, gui=None, rounds=10, max_cycles=80000):
+    def __init__(self, warriors, core_size=8000, gui=None, rounds=10, max_cycles=80000, max_processes=MAX_PROCESSES,
+                 seed=None, profiler=None, trace=None, checkpoint=None, cycle_limit=None):
         """
         Game constructor
         :param warriors: Warriors list
         :param core_size:  Optional core size
         :param gui: Optional Gui
         :param rounds: Number of rounds to play
+        :param max_processes: Max processes of single warrior
+        :param seed: Optional seed; seeds of rounds are drawn from it, so the game and every its round can be replayed
+        :param profiler: Optional Profiler shared by all rounds
+        :param trace: Optional path prefix; every round is recorded to binary trace; see trace_path()
+        :param checkpoint: Optional Checkpoint; played rounds are saved into it, see resume()
+        :param cycle_limit: Optional limit of cycles executed by the whole game; see is_timed_out()
         """
         self._core_size = core_size
         self._warriors = warriors
         self._rounds = rounds
         self._max_cycles = max_cycles
+        self._max_processes = max_processes
         self._gui = gui
+        self._seed = seed
+        self._profiler = profiler
+        self._trace = trace
+        self._checkpoint = checkpoint
+        self._resumed = False
+        self._cycle_limit = cycle_limit
+        self._cycles = 0
+        self._played_rounds = 0
+        self._timed_out = False
+        self._aborted = False
+        self._records = []
         if gui:
             self._gui.init_game_screen()
             self._set_warriors_colors()
 
     def _set_warriors_colors(self):
         """
-        Sets warrior colors from Color.WARRIOR_COLORS
+        Sets warrior colors from Color.WARRIOR_COLORS and generated palette
         """
         for i, warrior in enumerate(self._warriors):
-            warrior.set_color(Color.WARRIOR_COLORS.value[i])
+            warrior.set_color(get_warrior_color(i))
+
+    def round_seeds(self):
+        """
+        :return: List of round seeds; None values (global random) when game has no seed
+        """
+        if self._seed is None:
+            return [None] * self._rounds
+        seeds = random.Random(self._seed)
+        return [seeds.randrange(2 ** 32) for _ in range(self._rounds)]
+
+    def records(self):
+        """
+        :return: List of RoundRecord of played rounds
+        """
+        return self._records
+
+    @classmethod
+    def resume(cls, checkpoint, gui=None):
+        """
+        Create game saved in checkpoint; play() continues its interrupted round and plays the remaining rounds
+        Records of rounds played before interruption aren't available.
+        :param checkpoint: Checkpoint from Checkpoint.open()
+        :param gui: Optional Gui
+        :return: Game
+        """
+        settings = checkpoint.settings()
+        game = cls(checkpoint.warriors(), settings['core_size'], gui, settings['rounds'], settings['max_cycles'],
+                   settings['max_processes'], settings['seed'], checkpoint=checkpoint)
+        game._resumed = True
+        return game
 
     def play(self):
         """
         Play rounds
         """
-        for round_num in range(1, self._rounds + 1):
-            round_obj = Round(self._warriors, core_size=self._core_size, gui=self._gui, number=round_num,
-                              max_cycles=self._max_cycles)
+        first_round = 1
+        if self._resumed and self._checkpoint.has_round():
+            round_obj = self._checkpoint.restore(self._gui)
+            self._play_or_abort(round_obj)
+            if self._aborted:
+                return
+            first_round = round_obj.number() + 1
+            self._played_rounds = round_obj.number()
+        elif self._checkpoint:
+            self._checkpoint.create(self._warriors, self._core_size, self._max_cycles, self._max_processes,
+                                    self._rounds, self._seed)
+        for round_num, seed in enumerate(self.round_seeds(), start=1):
+            if round_num < first_round:
+                continue
+            if self._trace:
+                with open(self.trace_path(round_num), 'wb') as file_handle:
+                    self._play_round(round_num, seed, TraceRecorder(file_handle))
+            else:
+                self._play_round(round_num, seed)
+            if self._timed_out or self._aborted:
+                break
+
+    def _play_round(self, round_num, seed, recorder=None):
+        cycle_limit = None if self._cycle_limit is None else self._cycle_limit - self._cycles
+        round_obj = Round(self._warriors, core_size=self._core_size, gui=self._gui, number=round_num,
+                          max_cycles=self._max_cycles, max_processes=self._max_processes, seed=seed,
+                          hooks=RoundHooks(profiler=self._profiler, recorder=recorder, checkpoint=self._checkpoint,
+                                           cycle_limit=cycle_limit))
+        self._play_or_abort(round_obj)
+        if recorder:
+            recorder.finish()
+        self._cycles += round_obj.cycles()
+        if self._aborted:
+            return
+        if round_obj.is_interrupted():
+            # Results of unfinished round aren't counted by Round
+            self._timed_out = True
+            return
+        self._played_rounds += 1
+        self._records.append(round_obj.record())
+
+    def _play_or_abort(self, round_obj):
+        """
+        Play round; closing GUI window aborts the game, see is_aborted()
+        """
+        try:
             round_obj.play()
+        except SimulationAbortedException:
+            self._aborted = True
+
+    def cycles(self):
+        """
+        :return: Cycles executed by played rounds
+        """
+        return self._cycles
+
+    def played_rounds(self):
+        """
+        :return: Number of finished rounds; also rounds finished before the game was resumed
+        """
+        return self._played_rounds
+
+    def is_timed_out(self):
+        """
+        :return: True when cycle limit was reached; the unfinished round and remaining rounds aren't counted
+        """
+        return self._timed_out
+
+    def is_aborted(self):
+        """
+        :return: True when GUI window was closed; the unfinished round is saved in checkpoint, so the game can be
+                 resumed
+        """
+        return self._aborted
+
+    def trace_path(self, round_num):
+        """
+        :param round_num: Round number; from 1
+        :return: Path of round trace; None when game isn't traced
+        """
+        return f'{self._trace}{round_num}.trace' if self._trace else None
+
+    def round_record(self, round_num):
+        """
+        Get record of a round of seeded game without playing earlier rounds
+        :param round_num: Round number; from 1
+        :return: RoundRecord
+        """
+        if self._seed is None:
+            raise ValueError('Rounds of game without seed can\'t be replayed')
+        return draw_record(len(self._warriors), self._core_size, self.round_seeds()[round_num - 1])
+
+    def replay_round(self, record, round_num=1):
+        """
+        Play round again from its record on warrior copies, so game results aren't changed
+        :param record: RoundRecord; from records() or Round.record()
+        :param round_num: Round number shown in gui
+        :return: Played Round
+        """
+        players = [Warrior(warrior.instructions(), color=warrior.color(), name=warrior.warrior_info().name(),
+                           start=warrior.start()) for warrior in self._warriors]
+        round_obj = Round(players, core_size=self._core_size, gui=self._gui, number=round_num,
+                          max_cycles=self._max_cycles, max_processes=self._max_processes, record=record)
+        round_obj.play()
+        return round_obj
 
     def get_results_string(self):
         """
         Get strings with results after finished game
         :return: Formatted string with warrior results
         """
-        text = f'****Won-Lost-Tied after {self._rounds} round/s****\n'
+        text = f'****Won-Lost-Tied after {self._played_rounds} round/s****\n'
         for warrior in self._warriors:
             info = warrior.warrior_info()
             text += f'{info.name()}: {info.wins()}-{info.loses()}-{info.ties()}\n'
@@ -1,3 +1,4 @@
+import colorsys
 from enum import Enum
 
 
@@ -8,3 +9,21 @@ class Color(Enum):
     CURRENT_INSTRUCTION = (255, 255, 255)
     WARRIOR_COLORS = [(255, 0, 0), (0, 255, 0), (255, 255, 0), (255, 0, 255), (255, 255, 255)]
     TEXT_COLOR = (255, 255, 255)
+
+
+GOLDEN_RATIO_CONJUGATE = 0.618033988749895
+
+
+def get_warrior_color(index):
+    """
+    Get color of warrior; first colors are taken from Color.WARRIOR_COLORS, next are generated
+    by rotating hue with golden ratio so neighbouring warriors have distinct colors
+    :param index: Warrior index
+    :return: RGB tuple
+    """
+    colors = Color.WARRIOR_COLORS.value
+    if index < len(colors):
+        return colors[index]
+    hue = (index * GOLDEN_RATIO_CONJUGATE) % 1
+    red, green, blue = colorsys.hsv_to_rgb(hue, 0.8, 1)
+    return int(red * 255), int(green * 255), int(blue * 255)
@@ -1,15 +1,43 @@
 import math
+import time
 from abc import abstractmethod, ABC
+from collections import OrderedDict
 
 import pygame
 
-from src.config import BLOCKS_X, FONT_LOCATION, CLOCK_TICKS, BLOCK_SIZE, WINDOW_TITLE
+from src.config import BLOCKS_X, FONT_LOCATION, CLOCK_TICKS, BLOCK_SIZE, WINDOW_TITLE, FRAMES_PER_SECOND, \
+    TEXT_CACHE_SIZE, MIN_DECORATED_BLOCK_SIZE
 from src.enum.event import CoreEvent
 from src.gui.colors import Color
+from src.sinks import GUISink, NULL_SINK
 
+WARRIOR_INFO_HEIGHT = 100  # Pixels of info panel for single warrior
+MIN_WARRIOR_DETAILS_HEIGHT = 45  # Smaller rows show one line summary instead of details
+MIN_FONT_SIZE = 8
 
-def divide_blocks(core_size):
-    return BLOCKS_X, math.ceil(core_size // BLOCKS_X)
+
+class SimulationAbortedException(Exception):
+    def __init__(self):
+        super().__init__('Simulation aborted')
+
+
+def divide_blocks(core_size, height):
+    """
+    Fit core into core view (BLOCKS_X * BLOCK_SIZE pixels wide); blocks get smaller for bigger cores
+    Cores which don't fit even with one pixel blocks show several neighbouring cells in one block.
+    :param core_size: Core size
+    :param height: Core view height in pixels
+    :return: Tuple (blocks_x, blocks_y, block_size, cells_per_block)
+    """
+    core_view_width = BLOCKS_X * BLOCK_SIZE
+    block_size = BLOCK_SIZE
+    while block_size > 1 and math.ceil(core_size / (core_view_width // block_size)) * block_size > height:
+        block_size -= 1
+    blocks_x = core_view_width // block_size
+    rows = height // block_size
+    # View without height (MockGUI) draws nothing
+    cells_per_block = max(1, math.ceil(core_size / (blocks_x * rows))) if rows else 1
+    return blocks_x, math.ceil(core_size / (blocks_x * cells_per_block)), block_size, cells_per_block
 
 
 class GUI(ABC):
@@ -22,15 +50,28 @@ class GUI(ABC):
         """
         self._width = width
         self._height = height
-        self._blocks_x, self._blocks_y = divide_blocks(core_size)
+        self._blocks_x, self._blocks_y, self._block_size, self._cells_per_block = divide_blocks(core_size, height)
         self._core_size = core_size
+        self._block_count = math.ceil(core_size / self._cells_per_block)
+        self._events_methods = {
+            CoreEvent.READ: self._set_block_read,
+            CoreEvent.WRITE: self._set_block_written,
+            CoreEvent.EXECUTE: self._set_block_executed,
+        }
+
+    def event_sink(self):
+        """
+        :return: EventSink which sends core events to this GUI
+        """
+        return GUISink(self)
 
     def get_block_position(self, block_number):
         """
         Get block in core position
-        :param block_number: Block number to get position
+        :param block_number: Block number to get position; core address of the cell
         :return: A tuple with block position (column,row)
         """
+        block_number //= self._cells_per_block
         row = block_number // self._blocks_x
         column = block_number % self._blocks_x
         return column, row
@@ -64,12 +105,7 @@ class GUI(ABC):
         :param color: New color
         :param event: Event type
         """
-        events_method = {
-            CoreEvent.READ: self._set_block_read,
-            CoreEvent.WRITE: self._set_block_written,
-            CoreEvent.EXECUTE: self._set_block_executed,
-        }
-        events_method[event](block_number, color)
+        self._events_methods[event](block_number, color)
 
     @abstractmethod
     def _set_block_read(self, block_number, color):
@@ -127,6 +163,7 @@ class GUI(ABC):
     def handle_events(self):
         """
         Handle gui events such a window closed, window resized etc.
+        :raises SimulationAbortedException: When window is closed
         """
         pass
 
@@ -139,63 +176,137 @@ class GUI(ABC):
 
 
 class PyGameGUI(GUI):
-    def __init__(self, width, height, core_size):
+    def __init__(self, width, height, core_size, speed=CLOCK_TICKS, fps=FRAMES_PER_SECOND):
+        """
+        :param speed: Simulation steps per second; 0 for unlimited
+        :param fps: Frames per second; core events are collected and drawn once per frame
+        """
         super().__init__(width, height, core_size)
         pygame.init()
         pygame.display.set_caption(WINDOW_TITLE)
         self._screen = pygame.display.set_mode((width, height))
         self._clock = pygame.time.Clock()
         self._screen.fill(Color.BACKGROUND.value)
+        self._speed = speed
+        self._frame_time = 1 / fps
+        self._next_frame = 0
+        self._poll_events = False
+        # Last event of every block changed since last frame: {block_number: (color, event)}
+        self._dirty_blocks = {}
+        self._game_info = None
+        self._fonts = {}
+        # Rendered text surfaces: {(text, font_size, color): surface}; least recently used first
+        self._text_surfaces = OrderedDict()
 
     def clock_tick(self):
-        self._clock.tick(CLOCK_TICKS)
+        if self._speed:
+            self._clock.tick(self._speed)
+
+    def set_block_color(self, block_number, color, event):
+        self._dirty_blocks[block_number] = (color, event)
+
+    def _frame_due(self):
+        """
+        Check if next frame should be rendered and schedule the following one
+        :return: True or False
+        """
+        now = time.perf_counter()
+        if now < self._next_frame:
+            return False
+        self._next_frame = now + self._frame_time
+        return True
+
+    def render(self):
+        """
+        Draw blocks changed since last frame with game info and push only changed rects to display
+        """
+        rects = [self._events_methods[event](block_number, color)
+                 for block_number, (color, event) in self._dirty_blocks.items()]
+        self._dirty_blocks.clear()
+        if self._game_info:
+            rects.extend(self._draw_game_info(*self._game_info))
+        pygame.display.update(rects)
+        self._poll_events = True
 
     def _draw_rect_with_border(self, x, y, width, height, color, border=1, border_color=(0, 0, 0)):
         back = pygame.Rect(x, y, width, height)
         front = pygame.Rect(x + border, y + border, width - border, height - border)
         pygame.draw.rect(self._screen, border_color, back)
         pygame.draw.rect(self._screen, color, front)
+        return back
 
     def _draw_circle_with_border(self, x, y, width, height, color):
-        self._draw_rect_with_border(x, y, width, height, Color.CORE_DEFAULT.value)
-        pygame.draw.circle(self._screen, color, (x + BLOCK_SIZE // 2, y + BLOCK_SIZE // 2), 3)
+        rect = self._draw_rect_with_border(x, y, width, height, Color.CORE_DEFAULT.value)
+        radius = max(1, width * 3 // 10)
+        pygame.draw.circle(self._screen, color, (x + width // 2, y + height // 2), radius)
+        return rect
 
     def _draw_x(self, x, y, width, height, color, border=1):
-        self._draw_rect_with_border(x, y, width, height, Color.CORE_DEFAULT.value)
+        rect = self._draw_rect_with_border(x, y, width, height, Color.CORE_DEFAULT.value)
+        line_width = max(1, width * 3 // 10)
         pygame.draw.line(self._screen, color, (x + border, y + border),
-                         (x + BLOCK_SIZE - border, y + BLOCK_SIZE - border), width=3)
-        pygame.draw.line(self._screen, color, (x + BLOCK_SIZE - border, y + border),
-                         (x + border, y + BLOCK_SIZE - border), width=3)
+                         (x + width - border, y + height - border), width=line_width)
+        pygame.draw.line(self._screen, color, (x + width - border, y + border),
+                         (x + border, y + height - border), width=line_width)
+        return rect
 
     def _get_position_in_pixels(self, block_number):
         x, y = self.get_block_position(block_number)
-        x *= BLOCK_SIZE
-        y *= BLOCK_SIZE
+        x *= self._block_size
+        y *= self._block_size
         return x, y
 
+    def _is_block_decorated(self):
+        """
+        Small blocks are too small for border, circle and X; they are filled with color only
+        """
+        return self._block_size >= MIN_DECORATED_BLOCK_SIZE
+
+    def _fill_block(self, block_number, color):
+        x, y = self._get_position_in_pixels(block_number)
+        rect = pygame.Rect(x, y, self._block_size, self._block_size)
+        pygame.draw.rect(self._screen, color, rect)
+        return rect
+
     def _set_block_read(self, block_number, color):
+        if not self._is_block_decorated():
+            return self._fill_block(block_number, color)
         x, y = self._get_position_in_pixels(block_number)
-        self._draw_circle_with_border(x, y, BLOCK_SIZE, BLOCK_SIZE, color)
+        return self._draw_circle_with_border(x, y, self._block_size, self._block_size, color)
 
     def _set_block_written(self, block_number, color):
+        if not self._is_block_decorated():
+            return self._fill_block(block_number, color)
         x, y = self._get_position_in_pixels(block_number)
-        self._draw_x(x, y, BLOCK_SIZE, BLOCK_SIZE, color)
+        return self._draw_x(x, y, self._block_size, self._block_size, color)
 
     def _set_block_executed(self, block_number, color):
+        if not self._is_block_decorated():
+            return self._fill_block(block_number, color)
         x, y = self._get_position_in_pixels(block_number)
-        self._draw_rect_with_border(x, y, BLOCK_SIZE, BLOCK_SIZE, color)
+        return self._draw_rect_with_border(x, y, self._block_size, self._block_size, color)
 
     def _init_core_view(self):
-        for i in range(self._core_size):
-            self.set_block_color(i, Color.CORE_DEFAULT.value, CoreEvent.EXECUTE)
+        self._dirty_blocks.clear()
+        if self._is_block_decorated():
+            for i in range(self._core_size):
+                self._set_block_executed(i, Color.CORE_DEFAULT.value)
+        else:
+            # Fill full rows and the last, partial row with two rects instead of drawing every block
+            full_rows, last_row = divmod(self._block_count, self._blocks_x)
+            width = self._blocks_x * self._block_size
+            pygame.draw.rect(self._screen, Color.CORE_DEFAULT.value,
+                             pygame.Rect(0, 0, width, full_rows * self._block_size))
+            pygame.draw.rect(self._screen, Color.CORE_DEFAULT.value,
+                             pygame.Rect(0, full_rows * self._block_size, last_row * self._block_size,
+                                         self._block_size))
         pygame.display.flip()
 
     def _init_info_view(self):
         pass
 
-    @staticmethod
-    def _get_start_info_position():
-        return BLOCKS_X * BLOCK_SIZE
+    def _get_start_info_position(self):
+        return self._blocks_x * self._block_size
 
     def _get_info_x_center(self):
         info_block_start_position = self._get_start_info_position()
@@ -206,12 +317,39 @@ class PyGameGUI(GUI):
         offset_x = self._get_info_x_center()
         offset_y = 20
         self._print_standard_info_text(text, 20, offset_x, offset_y, center=True)
-        pygame.display.update()
+        self.render()
+
+    def _get_font(self, font_size):
+        """
+        Get font loaded once for every size
+        :param font_size: Font size
+        :return: pygame Font
+        """
+        font = self._fonts.get(font_size)
+        if font is None:
+            font = self._fonts[font_size] = pygame.font.Font(FONT_LOCATION, font_size)
+        return font
+
+    def _render_text(self, text_str, font_size, text_color):
+        """
+        Get rendered text surface from LRU cache; render only when it isn't cached
+        :return: pygame Surface
+        """
+        key = (text_str, font_size, text_color)
+        text = self._text_surfaces.get(key)
+        if text is None:
+            text = self._get_font(font_size).render(text_str, True, text_color, Color.BACKGROUND.value)
+            self._text_surfaces[key] = text
+            if len(self._text_surfaces) > TEXT_CACHE_SIZE:
+                # Remove least recently used surface
+                self._text_surfaces.popitem(last=False)
+        else:
+            self._text_surfaces.move_to_end(key)
+        return text
 
     def _print_standard_info_text(self, text_str, font_size, offset_x, offset_y, text_color=Color.TEXT_COLOR.value,
                                   center=False):
-        font = pygame.font.Font(FONT_LOCATION, font_size)
-        text = font.render(text_str, True, text_color, Color.BACKGROUND.value)
+        text = self._render_text(text_str, font_size, text_color)
         text_rect = text.get_rect()
         info_block_start_x_position = self._get_start_info_position()
         text_position = (offset_x + info_block_start_x_position, offset_y)
@@ -220,45 +358,73 @@ class PyGameGUI(GUI):
         else:
             text_rect.topleft = text_position
         self._screen.blit(text, text_rect)
+        return text_rect
 
-    def _print_warrior_name(self, warrior_number, warrior):
+    def _print_warrior_name(self, warrior_number, warrior, row_height):
         name = warrior.warrior_info().name()
         offset_x = self._get_info_x_center()
-        offset_y = 100 + warrior_number * 100
-        self._print_standard_info_text(name, 13, offset_x, offset_y, warrior.color(), center=True)
+        offset_y = 100 + warrior_number * row_height
+        return self._print_standard_info_text(name, 13, offset_x, offset_y, warrior.color(), center=True)
 
-    def _print_warrior_details(self, warrior_number, warrior):
+    def _print_warrior_details(self, warrior_number, warrior, row_height):
         offset_x = 10
-        offset_y = 110 + warrior_number * 100
+        offset_y = 110 + warrior_number * row_height
         # Print Won-Lost-Tied
         info = warrior.warrior_info()
         wlt = f'W-L-T: {info.wins()}-{info.loses()}-{info.ties()}\t'
-        self._print_standard_info_text(wlt, 12, offset_x, offset_y)
+        wlt_rect = self._print_standard_info_text(wlt, 12, offset_x, offset_y)
         # Print Processes
         offset_y += 15
-        processes = f'Processes: {len(warrior.processes()): 4}\t'
-        self._print_standard_info_text(processes, 12, offset_x, offset_y)
+        processes = f'Processes: {warrior.process_count(): 4}\t'
+        processes_rect = self._print_standard_info_text(processes, 12, offset_x, offset_y)
+        return wlt_rect, processes_rect
+
+    def _print_warrior_summary(self, warrior_number, warrior, row_height):
+        """
+        Print warrior info in a single line; used when there are too many warriors for full details
+        """
+        info = warrior.warrior_info()
+        text = f'{info.name()} {info.wins()}-{info.loses()}-{info.ties()} P:{warrior.process_count(): 4}\t'
+        font_size = max(MIN_FONT_SIZE, min(12, row_height - 2))
+        offset_y = 90 + warrior_number * row_height
+        return self._print_standard_info_text(text, font_size, 10, offset_y, warrior.color())
 
     def _print_cycles(self, cycles):
         text = f'Cycles: {cycles:5}'
         offset_x = 10
         offset_y = 40
-        self._print_standard_info_text(text, 14, offset_x, offset_y)
+        return self._print_standard_info_text(text, 14, offset_x, offset_y)
 
-    def print_game_info(self, warriors, cycles):
+    def _draw_game_info(self, warriors, cycles):
+        """
+        Draw game info
+        :return: List of changed rects
+        """
+        rects = [self._print_cycles(cycles)]
+        row_height = min(WARRIOR_INFO_HEIGHT, (self._height - 100) // max(1, len(warriors)))
         for i, warrior in enumerate(warriors):
-            self._print_warrior_name(i, warrior)
-            self._print_warrior_details(i, warrior)
-            self._print_cycles(cycles)
+            if row_height >= MIN_WARRIOR_DETAILS_HEIGHT:
+                rects.append(self._print_warrior_name(i, warrior, row_height))
+                rects.extend(self._print_warrior_details(i, warrior, row_height))
+            else:
+                rects.append(self._print_warrior_summary(i, warrior, row_height))
+        return rects
 
-        pygame.display.update()
+    def print_game_info(self, warriors, cycles):
+        # Game info is drawn with next frame
+        self._game_info = (warriors, cycles)
+        if self._frame_due():
+            self.render()
 
     def handle_events(self):
+        if not self._poll_events:
+            # Poll window events only once per rendered frame
+            return
+        self._poll_events = False
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
-                # Abort simulation and close window on close button pressed
-                print("Simulation aborted!")
-                pygame.quit()
+                # Close button pressed; window is closed by owner of GUI with close()
+                raise SimulationAbortedException()
 
     def close(self):
         pygame.quit()
@@ -268,6 +434,10 @@ class MockGUI(GUI):
     def __init__(self, core_size):
         super().__init__(0, 0, core_size)
 
+    def event_sink(self):
+        # Nothing is drawn, so core doesn't emit events at all
+        return NULL_SINK
+
     def _init_core_view(self):
         pass
 
@@ -0,0 +1,177 @@
+import hashlib
+import sqlite3
+import struct
+from collections import namedtuple
+
+from src.config import MAX_PROCESSES, HILL_DATABASE
+from src.core import encode_instruction
+from src.file import CACHE_INSTRUCTION, warrior_to_bytes, warrior_from_bytes
+from src.game import Game
+from src.warrior import Warrior
+
+# Ranking row of a hill warrior; results are summed over all pairings with other hill warriors
+HillEntry = namedtuple('HillEntry', ['name', 'warrior_hash', 'wins', 'loses', 'ties', 'score'])
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS warriors (
+    warrior_hash TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    data BLOB NOT NULL
+);
+CREATE TABLE IF NOT EXISTS results (
+    warrior_a TEXT NOT NULL,
+    warrior_b TEXT NOT NULL,
+    core_size INTEGER NOT NULL,
+    max_cycles INTEGER NOT NULL,
+    rounds INTEGER NOT NULL,
+    max_processes INTEGER NOT NULL,
+    wins_a INTEGER NOT NULL,
+    wins_b INTEGER NOT NULL,
+    ties INTEGER NOT NULL,
+    PRIMARY KEY (warrior_a, warrior_b, core_size, max_cycles, rounds, max_processes)
+);
+"""
+
+# Results of pairings between hill warriors with current settings, as (warrior, own wins, opponent wins, ties) rows
+RANKING_QUERY = """
+WITH hill_results AS (
+    SELECT * FROM results
+    WHERE core_size = :core_size AND max_cycles = :max_cycles AND rounds = :rounds AND max_processes = :max_processes
+    AND warrior_a IN (SELECT warrior_hash FROM warriors) AND warrior_b IN (SELECT warrior_hash FROM warriors)
+), sides (warrior_hash, wins, loses, ties) AS (
+    SELECT warrior_a, wins_a, wins_b, ties FROM hill_results
+    UNION ALL
+    SELECT warrior_b, wins_b, wins_a, ties FROM hill_results
+)
+SELECT warriors.name, warriors.warrior_hash, COALESCE(SUM(sides.wins), 0) AS wins,
+       COALESCE(SUM(sides.loses), 0), COALESCE(SUM(sides.ties), 0) AS ties
+FROM warriors LEFT JOIN sides ON sides.warrior_hash = warriors.warrior_hash
+GROUP BY warriors.warrior_hash
+ORDER BY 3 * wins + ties DESC, warriors.name
+"""
+
+
+def warrior_hash(warrior):
+    """
+    Hash of warrior code; name isn't included, so renamed warrior keeps its results
+    :param warrior: Warrior object
+    :return: Hex SHA-256 digest
+    """
+    digest = hashlib.sha256(struct.pack('<q', warrior.start()))
+    for instruction in warrior.instructions():
+        digest.update(CACHE_INSTRUCTION.pack(*encode_instruction(instruction)))
+    return digest.hexdigest()
+
+
+def pairing_seed(hash_a, hash_b):
+    """
+    Seed of pairing game derived from warrior hashes, so stored results can be reproduced
+    :param hash_a: Hash of the first warrior of pairing; see warrior_hash()
+    :param hash_b: Hash of the second warrior
+    :return: Non-negative int
+    """
+    return int(hashlib.sha256(f'{hash_a}:{hash_b}'.encode()).hexdigest()[:15], 16)
+
+
+class Hill:
+    def __init__(self, database=HILL_DATABASE, core_size=8000, max_cycles=80000, rounds=100,
+                 max_processes=MAX_PROCESSES):
+        """
+        Warriors hill; every warrior plays against every other warrior once, results of pairings are stored in
+        SQLite database, so a new warrior plays only its own pairings and ranking is computed from stored results
+        Results are kept for every combination of settings, the same database may be used with other settings.
+        :param database: SQLite database path; ":memory:" for temporary hill
+        :param core_size: Core size
+        :param max_cycles: Max cycles of single round
+        :param rounds: Rounds of every pairing
+        :param max_processes: Max processes of single warrior
+        """
+        self._settings = {'core_size': core_size, 'max_cycles': max_cycles, 'rounds': rounds,
+                          'max_processes': max_processes}
+        self._connection = sqlite3.connect(database)
+        self._connection.executescript(SCHEMA)
+
+    def close(self):
+        self._connection.close()
+
+    def warriors(self):
+        """
+        :return: Dict warrior hash -> Warrior loaded from database
+        """
+        rows = self._connection.execute('SELECT warrior_hash, data FROM warriors')
+        return {hash_value: warrior_from_bytes(data) for hash_value, data in rows}
+
+    def submit(self, warrior):
+        """
+        Add warrior to the hill and play pairings with other hill warriors which aren't stored yet
+        :param warrior: Warrior object
+        :return: Number of played pairings
+        """
+        new_hash = warrior_hash(warrior)
+        with self._connection:
+            self._connection.execute('INSERT OR IGNORE INTO warriors VALUES (?, ?, ?)',
+                                     (new_hash, warrior.warrior_info().name(), warrior_to_bytes(warrior)))
+        played = 0
+        for other_hash, other in self.warriors().items():
+            if other_hash == new_hash:
+                continue
+            # Pairing is stored once, with hashes in order
+            (hash_a, warrior_a), (hash_b, warrior_b) = sorted(((new_hash, warrior), (other_hash, other)),
+                                                              key=lambda item: item[0])
+            if self._has_results(hash_a, hash_b):
+                continue
+            wins_a, wins_b, ties = self._play(warrior_a, warrior_b, pairing_seed(hash_a, hash_b))
+            with self._connection:
+                self._connection.execute(
+                    'INSERT INTO results VALUES (:warrior_a, :warrior_b, :core_size, :max_cycles, :rounds, '
+                    ':max_processes, :wins_a, :wins_b, :ties)',
+                    dict(self._settings, warrior_a=hash_a, warrior_b=hash_b, wins_a=wins_a, wins_b=wins_b, ties=ties))
+            played += 1
+        return played
+
+    def remove(self, hash_value):
+        """
+        Remove warrior from the hill; its stored results are kept, so it isn't played again when resubmitted
+        :param hash_value: Warrior hash; see warrior_hash()
+        """
+        with self._connection:
+            self._connection.execute('DELETE FROM warriors WHERE warrior_hash = ?', (hash_value,))
+
+    def _has_results(self, hash_a, hash_b):
+        row = self._connection.execute(
+            'SELECT 1 FROM results WHERE warrior_a = :a AND warrior_b = :b AND core_size = :core_size AND '
+            'max_cycles = :max_cycles AND rounds = :rounds AND max_processes = :max_processes',
+            dict(self._settings, a=hash_a, b=hash_b)).fetchone()
+        return row is not None
+
+    def _play(self, warrior_a, warrior_b, seed):
+        """
+        Play pairing with Game on warrior copies
+        :param seed: Seed of the game; see pairing_seed()
+        :return: Tuple (wins of warrior_a, wins of warrior_b, ties)
+        """
+        players = [Warrior(warrior.instructions(), name=warrior.warrior_info().name(), start=warrior.start())
+                   for warrior in (warrior_a, warrior_b)]
+        game = Game(players, self._settings['core_size'], rounds=self._settings['rounds'],
+                    max_cycles=self._settings['max_cycles'], max_processes=self._settings['max_processes'], seed=seed)
+        game.play()
+        info_a, info_b = (player.warrior_info() for player in players)
+        return info_a.wins(), info_b.wins(), info_a.ties()
+
+    def ranking(self):
+        """
+        Rank hill warriors from stored results; nothing is played
+        :return: List of HillEntry sorted by score; score is 3 points for win and 1 for tie
+        """
+        rows = self._connection.execute(RANKING_QUERY, self._settings)
+        return [HillEntry(name, hash_value, wins, loses, ties, 3 * wins + ties)
+                for name, hash_value, wins, loses, ties in rows]
+
+    def get_results_string(self):
+        """
+        :return: Formatted string with hill ranking
+        """
+        text = f'****Hill ranking after {self._settings["rounds"]} round/s per pairing****\n'
+        for place, entry in enumerate(self.ranking(), start=1):
+            text += f'{place}. {entry.name}: {entry.wins}-{entry.loses}-{entry.ties} score {entry.score}\n'
+        return text
@@ -1,13 +1,23 @@
 from abc import abstractmethod, ABC
-from copy import copy
 from enum import Enum
+from functools import lru_cache
+from operator import add, sub, mul, floordiv, mod, eq, ne, lt
 
 from src.enum.event import CoreEvent
 from src.enum.mode import Mode
 from src.enum.modifier import Modifier
+from src.resolvers import get_resolvers
+
+
+# Indexes of values in operand snapshot tuples
+A_VALUE = 0
+B_VALUE = 1
 
 
 class Instruction(ABC):
+    # Operation writes at A pointer; with read/write limits it gets A pointer folded with write limit too
+    WRITES_A_TARGET = False
+
     def __init__(self, modifier, a_mode, a_value, b_mode, b_value):
         """
         Instruction constructor
@@ -17,11 +27,32 @@ class Instruction(ABC):
         :param b_mode: String b_mode; for example "#"
         :param b_value: String b_value; for example "-1"
         """
-        self._modifier = Modifier(modifier.upper()) if modifier else get_default_modifier(type(self))
         self._a_mode = Mode(a_mode.upper()) if a_mode else Mode.DIRECT
         self._a_value = int(a_value) if a_value else 0
         self._b_mode = Mode(b_mode.upper()) if b_mode else Mode.DIRECT
         self._b_value = int(b_value) if b_value else 0
+        # Default modifier depends on modes, so it is set after them
+        self._modifier = Modifier(modifier.upper()) if modifier else get_default_modifier(type(self), self._a_mode,
+                                                                                         self._b_mode)
+
+    @classmethod
+    def from_fields(cls, modifier, a_mode, a_value, b_mode, b_value):
+        """
+        Create instruction from already decoded fields without parsing strings
+        :param modifier: Modifier
+        :param a_mode: Mode
+        :param a_value: int
+        :param b_mode: Mode
+        :param b_value: int
+        :return: Instruction of class cls
+        """
+        instruction = cls.__new__(cls)
+        instruction._modifier = modifier
+        instruction._a_mode = a_mode
+        instruction._a_value = a_value
+        instruction._b_mode = b_mode
+        instruction._b_value = b_value
+        return instruction
 
     def modifier(self):
         return self._modifier
@@ -51,35 +82,128 @@ class Instruction(ABC):
         :param position: Instruction position in core addressing mode
         :param warrior: Warrior object to queue next task
         """
-        a_pointer = core.get_core_address_mode_value(self._a_mode, self._a_value, position, warrior)
-        a = copy(core[a_pointer + position])
-        core.check_postincrement(self._a_mode, self._a_value, position, warrior)
-
-        b_pointer = core.get_core_address_mode_value(self._b_mode, self._b_value, position, warrior)
-        b = copy(core[b_pointer + position])
-        core.check_postincrement(self._b_mode, self._b_value, position, warrior)
-
-        result = self.instruction(a, b, a_pointer, b_pointer, position, core, warrior)
-        core.update_core_gui(position + a_pointer, warrior, CoreEvent.EXECUTE)
-        if result is not None:
-            event_a, event_b = result
-            if event_a:
-                core.update_core_gui(position + a_pointer, warrior, event_a)
-            if event_b:
-                core.update_core_gui(position + b_pointer, warrior, event_b)
+        handler = compile_instruction(type(self), self._modifier, self._a_mode, self._b_mode, core.is_folding(),
+                                      core.has_events())
+        handler(core, position, self._a_value % core.size(), self._b_value % core.size(), warrior)
+
+    @classmethod
+    def compile(cls, modifier, a_mode, b_mode, folding=False, events=False):
+        """
+        Build execute function specialized for modifier and modes; use compile_instruction() to get cached one
+        :param modifier: Modifier
+        :param a_mode: A Mode
+        :param b_mode: B Mode
+        :param folding: Fold pointers with core read/write limits; reads use read limit, written targets use write limit
+        :param events: Emit core events; without events function doesn't call core.emit_event() at all
+        :return: Function (core, position, a_value, b_value, warrior)
+        """
+        operation = cls.operation(modifier)
+        snapshot_a, snapshot_b = cls.snapshot(modifier)
+        resolve_a, postincrement_a = get_resolvers(a_mode, folding, events)
+        resolve_b, postincrement_b = get_resolvers(b_mode, folding, events)
+
+        if folding:
+            return cls._compile_folding(operation, snapshot_a, snapshot_b, resolve_a, postincrement_a, resolve_b,
+                                        postincrement_b, events, cls.WRITES_A_TARGET)
+        if not events:
+            def execute(core, position, a_value, b_value, warrior):
+                a_pointer = resolve_a(core, position, a_value, warrior)
+                a = snapshot_a(core, a_pointer + position) if snapshot_a else None
+                if postincrement_a:
+                    postincrement_a(core, position, a_value, warrior)
+
+                b_pointer = resolve_b(core, position, b_value, warrior)
+                b = snapshot_b(core, b_pointer + position) if snapshot_b else None
+                if postincrement_b:
+                    postincrement_b(core, position, b_value, warrior)
+
+                operation(a, b, a_pointer, b_pointer, position, core, warrior)
+
+            return execute
+
+        def execute(core, position, a_value, b_value, warrior):
+            a_pointer = resolve_a(core, position, a_value, warrior)
+            a = snapshot_a(core, a_pointer + position) if snapshot_a else None
+            if postincrement_a:
+                postincrement_a(core, position, a_value, warrior)
+
+            b_pointer = resolve_b(core, position, b_value, warrior)
+            b = snapshot_b(core, b_pointer + position) if snapshot_b else None
+            if postincrement_b:
+                postincrement_b(core, position, b_value, warrior)
+
+            result = operation(a, b, a_pointer, b_pointer, position, core, warrior)
+            core.emit_event(position + a_pointer, warrior, CoreEvent.EXECUTE)
+            if result is not None:
+                event_a, event_b = result
+                if event_a:
+                    core.emit_event(position + a_pointer, warrior, event_a)
+                if event_b:
+                    core.emit_event(position + b_pointer, warrior, event_b)
+
+        return execute
+
+    @staticmethod
+    def _compile_folding(operation, snapshot_a, snapshot_b, resolve_a, postincrement_a, resolve_b, postincrement_b,
+                         events, writes_a_target=False):
+        """
+        Execute function of compile() for core with read/write limits
+        :param writes_a_target: Pass A pointer folded with write limit to operation as its last argument
+        """
+        def execute(core, position, a_value, b_value, warrior):
+            a_pointer = resolve_a(core, position, a_value, warrior)
+            a_write_pointer = core.fold_write(a_pointer)
+            a_pointer = core.fold_read(a_pointer)
+            a = snapshot_a(core, a_pointer + position) if snapshot_a else None
+            if postincrement_a:
+                postincrement_a(core, position, a_value, warrior)
+
+            b_pointer = resolve_b(core, position, b_value, warrior)
+            b = snapshot_b(core, core.fold_read(b_pointer) + position) if snapshot_b else None
+            if postincrement_b:
+                postincrement_b(core, position, b_value, warrior)
+
+            b_pointer = core.fold_write(b_pointer)
+            if writes_a_target:
+                result = operation(a, b, a_pointer, b_pointer, position, core, warrior, a_write_pointer)
+            else:
+                result = operation(a, b, a_pointer, b_pointer, position, core, warrior)
+            if not events:
+                return
+            core.emit_event(position + a_pointer, warrior, CoreEvent.EXECUTE)
+            if result is not None:
+                event_a, event_b = result
+                if event_a:
+                    core.emit_event(position + (a_write_pointer if writes_a_target else a_pointer), warrior, event_a)
+                if event_b:
+                    core.emit_event(position + b_pointer, warrior, event_b)
+
+        return execute
+
+    @classmethod
+    def snapshot(cls, modifier):
+        """
+        Select which operands are copied before operation is executed; override to skip unused operands
+        :param modifier: Modifier
+        :return: Tuple (snapshot_a, snapshot_b); snapshot_values, snapshot_cell or None for each operand
+        """
+        return snapshot_values, snapshot_values
 
+    @classmethod
     @abstractmethod
-    def instruction(self, a, b, a_pointer, b_pointer, position, core, warrior):
+    def operation(cls, modifier):
         """
-        Instruction to override in subclasses
-        :param a: A instruction
-        :param b: B instruction
-        :param a_pointer: A instruction pointer relative to position
-        :param b_pointer: B instruction pointer relative to position
-        :param position: Position of current instruction in core
-        :param core: Core object
-        :param warrior: Warrior object to queue next task
-        :return:
+        Operation to override in subclasses
+        :param modifier: Modifier to specialize operation for
+        :return: Function (a, b, a_pointer, b_pointer, position, core, warrior) which returns optional
+                 (event_a, event_b) tuple; where:
+                 a: A operand snapshot tuple (see snapshot()),
+                 b: B operand snapshot tuple (see snapshot()),
+                 a_pointer: A instruction pointer relative to position,
+                 b_pointer: B instruction pointer relative to position,
+                 position: Position of current instruction in core,
+                 core: Core object,
+                 warrior: Warrior object to queue next task
         """
         # Override when extending
         pass
@@ -94,6 +218,8 @@ class Instruction(ABC):
         return f'{name}.{modifier} {a_mode}{a_value}, {b_mode}{b_value}'
 
     def __eq__(self, other):
+        if not isinstance(other, Instruction):
+            return NotImplemented
         return (
                 self.__class__ == other.__class__ and self.modifier() == other.modifier() and
                 self.a_mode() == other.a_mode() and self.a_value() == other.a_value() and
@@ -113,8 +239,16 @@ class DAT(Instruction):
             # When only one operand given it should be parsed as b operand
             super(DAT, self).__init__(modifier, Mode.DIRECT.value, 0, a_mode, a_value)
 
-    def instruction(self, a, b, a_pointer, b_pointer, position, core, warrior):
-        pass
+    @classmethod
+    def snapshot(cls, modifier):
+        return None, None
+
+    @classmethod
+    def operation(cls, modifier):
+        def dat(a, b, a_pointer, b_pointer, position, core, warrior):
+            pass
+
+        return dat
 
 
 class MOV(Instruction):
@@ -122,25 +256,35 @@ class MOV(Instruction):
     Move (copies data from one address to another)
     """
 
-    def instruction(self, a, b, a_pointer, b_pointer, position, core, warrior):
-        modify_position = position + b_pointer
-        if self._modifier == Modifier.A:
-            core[modify_position].set_a_value(a.a_value())
-        elif self._modifier == Modifier.B:
-            core[modify_position].set_b_value(a.b_value())
-        elif self._modifier == Modifier.AB:
-            core[modify_position].set_b_value(a.a_value())
-        elif self._modifier == Modifier.BA:
-            core[modify_position].set_a_value(a.b_value())
-        elif self._modifier == Modifier.F:
-            core[modify_position].set_a_value(a.a_value())
-            core[modify_position].set_b_value(a.b_value())
-        elif self._modifier == Modifier.X:
-            core[modify_position].set_a_value(a.b_value())
-            core[modify_position].set_b_value(a.a_value())
-        elif self._modifier == Modifier.I:
-            core[modify_position] = a
-        warrior.add_process(position + 1)
+    @classmethod
+    def snapshot(cls, modifier):
+        return snapshot_cell if modifier == Modifier.I else snapshot_values, None
+
+    @classmethod
+    def operation(cls, modifier):
+        if modifier == Modifier.I:
+            def mov_i(a, b, a_pointer, b_pointer, position, core, warrior):
+                core.set_cell(position + b_pointer, a)
+                warrior.add_process(position + 1)
+                return CoreEvent.READ, CoreEvent.WRITE
+
+            return mov_i
+
+        move = {
+            Modifier.A: lambda core, address, a: core.set_a_value(address, a[A_VALUE]),
+            Modifier.B: lambda core, address, a: core.set_b_value(address, a[B_VALUE]),
+            Modifier.AB: lambda core, address, a: core.set_b_value(address, a[A_VALUE]),
+            Modifier.BA: lambda core, address, a: core.set_a_value(address, a[B_VALUE]),
+            Modifier.F: lambda core, address, a: core.set_fields(address, a[A_VALUE], a[B_VALUE]),
+            Modifier.X: lambda core, address, a: core.set_fields(address, a[B_VALUE], a[A_VALUE]),
+        }[modifier]
+
+        def mov(a, b, a_pointer, b_pointer, position, core, warrior):
+            move(core, position + b_pointer, a)
+            warrior.add_process(position + 1)
+            return CoreEvent.READ, CoreEvent.WRITE
+
+        return mov
 
 
 class ArithmeticOperator(Enum):
@@ -157,15 +301,19 @@ class ComparisonOperator(Enum):
     LOWER_THAN = "<"
 
 
-def eval_expression(a, operator, b):
-    """
-    Evaluate mathematical or compare expression; for example 2 / 3
-    :param a: A value
-    :param operator: ArithmeticOperator
-    :param b: B value
-    :return: Result of A op B
-    """
-    return eval(str(a) + operator.value + str(b))
+ARITHMETIC_OPERATIONS = {
+    ArithmeticOperator.ADD: add,
+    ArithmeticOperator.SUBTRACT: sub,
+    ArithmeticOperator.MULTIPLY: mul,
+    ArithmeticOperator.DIVIDE: floordiv,  # Operands are non-negative so it is ICWS'94 division
+    ArithmeticOperator.MODULO: mod,
+}
+
+COMPARISON_OPERATIONS = {
+    ComparisonOperator.EQUAL: eq,
+    ComparisonOperator.NOT_EQUAL: ne,
+    ComparisonOperator.LOWER_THAN: lt,
+}
 
 
 class ArithmeticInstruction(Instruction):
@@ -173,31 +321,41 @@ class ArithmeticInstruction(Instruction):
     Base class for arithmetic expressions
     """
 
-    def instruction(self, a, b, a_pointer, b_pointer, position, core, warrior):
-        try:
-            modify_position = position + b_pointer
-            instruction_to_modify = core[modify_position]
-            operator = self.get_operator()
-            if self._modifier == Modifier.A:
-                instruction_to_modify.set_a_value(eval_expression(b.a_value(), operator, a.a_value()))
-            elif self._modifier == Modifier.B:
-                instruction_to_modify.set_b_value(eval_expression(b.b_value(), operator, a.b_value()))
-            elif self._modifier == Modifier.AB:
-                instruction_to_modify.set_b_value(eval_expression(b.b_value(), operator, a.a_value()))
-            elif self._modifier == Modifier.BA:
-                instruction_to_modify.set_a_value(eval_expression(b.b_value(), operator, a.a_value()))
-            elif self._modifier in (Modifier.F, Modifier.I):
-                instruction_to_modify.set_a_value(eval_expression(b.a_value(), operator, a.a_value()))
-                instruction_to_modify.set_b_value(eval_expression(b.b_value(), operator, a.b_value()))
-            elif self._modifier == Modifier.X:
-                instruction_to_modify.set_a_value(eval_expression(b.a_value(), operator, a.b_value()))
-                instruction_to_modify.set_b_value(eval_expression(b.b_value(), operator, a.a_value()))
-
-            warrior.add_process(position + 1)
-            return CoreEvent.READ, CoreEvent.WRITE
-        except ZeroDivisionError:
-            # Kill warrior process
-            pass
+    @classmethod
+    def operation(cls, modifier):
+        # Core values are kept mod core size and core normalizes the result on write
+        operation = ARITHMETIC_OPERATIONS[cls.get_operator()]
+        modify = {
+            Modifier.A: lambda core, address, a, b: core.set_a_value(address, operation(b[A_VALUE], a[A_VALUE])),
+            Modifier.B: lambda core, address, a, b: core.set_b_value(address, operation(b[B_VALUE], a[B_VALUE])),
+            Modifier.AB: lambda core, address, a, b: core.set_b_value(address, operation(b[B_VALUE], a[A_VALUE])),
+            Modifier.BA: lambda core, address, a, b: core.set_a_value(address, operation(b[B_VALUE], a[A_VALUE])),
+            Modifier.F: lambda core, address, a, b: (
+                core.set_a_value(address, operation(b[A_VALUE], a[A_VALUE])),
+                core.set_b_value(address, operation(b[B_VALUE], a[B_VALUE]))
+            ),
+            Modifier.X: lambda core, address, a, b: (
+                core.set_a_value(address, operation(b[A_VALUE], a[B_VALUE])),
+                core.set_b_value(address, operation(b[B_VALUE], a[A_VALUE]))
+            ),
+        }
+        modify[Modifier.I] = modify[Modifier.F]
+        modify = modify[modifier]
+        # With two fields the first one is written before the second one divides by zero
+        first_divisor = {Modifier.F: A_VALUE, Modifier.X: B_VALUE, Modifier.I: A_VALUE}.get(modifier)
+
+        def arithmetic(a, b, a_pointer, b_pointer, position, core, warrior):
+            try:
+                modify(core, position + b_pointer, a, b)
+                warrior.add_process(position + 1)
+                return CoreEvent.READ, CoreEvent.WRITE
+            except ZeroDivisionError:
+                # Kill warrior process; report write only when the first field is already written
+                if first_divisor is not None and a[first_divisor]:
+                    return CoreEvent.READ, CoreEvent.WRITE
+                return None
+
+        return arithmetic
 
     @staticmethod
     def get_operator():
@@ -210,7 +368,8 @@ class ADD(ArithmeticInstruction):
     Add (adds one number to another)
     """
 
-    def get_operator(self):
+    @staticmethod
+    def get_operator():
         return ArithmeticOperator.ADD
 
 
@@ -219,7 +378,8 @@ class SUB(ArithmeticInstruction):
     Subtract (subtracts one number from another)
     """
 
-    def get_operator(self):
+    @staticmethod
+    def get_operator():
         return ArithmeticOperator.SUBTRACT
 
 
@@ -228,7 +388,8 @@ class MUL(ArithmeticInstruction):
        Multiply (multiplies one number with another)
     """
 
-    def get_operator(self):
+    @staticmethod
+    def get_operator():
         return ArithmeticOperator.MULTIPLY
 
 
@@ -237,7 +398,8 @@ class DIV(ArithmeticInstruction):
        Divide (divides one number with another)
     """
 
-    def get_operator(self):
+    @staticmethod
+    def get_operator():
         return ArithmeticOperator.DIVIDE
 
 
@@ -246,7 +408,8 @@ class MOD(ArithmeticInstruction):
        Modulus (divides one number with another and gives the remainder)
     """
 
-    def get_operator(self):
+    @staticmethod
+    def get_operator():
         return ArithmeticOperator.MODULO
 
 
@@ -255,8 +418,16 @@ class JMP(Instruction):
     Jump (continues execution from another address)
     """
 
-    def instruction(self, a, b, a_pointer, b_pointer, position, core, warrior):
-        warrior.add_process(position + a_pointer)
+    @classmethod
+    def snapshot(cls, modifier):
+        return None, None
+
+    @classmethod
+    def operation(cls, modifier):
+        def jmp(a, b, a_pointer, b_pointer, position, core, warrior):
+            warrior.add_process(position + a_pointer)
+
+        return jmp
 
 
 class JMZ(Instruction):
@@ -264,16 +435,24 @@ class JMZ(Instruction):
     Jump if zero (tests a number and jumps to an address if it's 0)
     """
 
-    def instruction(self, a, b, a_pointer, b_pointer, position, core, warrior):
-        jump = 1
-        if self._modifier in (Modifier.A, Modifier.BA):
-            jump = a_pointer if a.a_value() == 0 else 1
-        elif self._modifier in (Modifier.B, Modifier.AB):
-            jump = a_pointer if a.b_value() == 0 else 1
-        elif self._modifier in (Modifier.F, Modifier.X, Modifier.I):
-            jump = a_pointer if a.a_value() == 0 and a.b_value() == 0 else 1
-        warrior.add_process(position + jump)
-        return None, CoreEvent.READ
+    @classmethod
+    def snapshot(cls, modifier):
+        return snapshot_values, None
+
+    @classmethod
+    def operation(cls, modifier):
+        if modifier in (Modifier.A, Modifier.BA):
+            is_zero = lambda a, b: a[A_VALUE] == 0
+        elif modifier in (Modifier.B, Modifier.AB):
+            is_zero = lambda a, b: a[B_VALUE] == 0
+        else:
+            is_zero = lambda a, b: a[A_VALUE] == 0 and a[B_VALUE] == 0
+
+        def jmz(a, b, a_pointer, b_pointer, position, core, warrior):
+            warrior.add_process(position + (a_pointer if is_zero(a, b) else 1))
+            return None, CoreEvent.READ
+
+        return jmz
 
 
 class JMN(Instruction):
@@ -281,46 +460,62 @@ class JMN(Instruction):
     Jump if not zero (tests a number and jumps if it isn't 0)
     """
 
-    def instruction(self, a, b, a_pointer, b_pointer, position, core, warrior):
-        jump = 1
-        if self._modifier in (Modifier.A, Modifier.BA):
-            jump = a_pointer if a.a_value() != 0 else 1
-        elif self._modifier in (Modifier.B, Modifier.AB):
-            jump = a_pointer if a.b_value() != 0 else 1
-        elif self._modifier in (Modifier.F, Modifier.X, Modifier.I):
-            jump = a_pointer if a.a_value() != 0 or b.b_value() != 0 else 1
-        warrior.add_process(position + jump)
-        return None, CoreEvent.READ
+    @classmethod
+    def snapshot(cls, modifier):
+        if modifier in (Modifier.F, Modifier.X, Modifier.I):
+            return snapshot_values, snapshot_values
+        return snapshot_values, None
+
+    @classmethod
+    def operation(cls, modifier):
+        if modifier in (Modifier.A, Modifier.BA):
+            is_not_zero = lambda a, b: a[A_VALUE] != 0
+        elif modifier in (Modifier.B, Modifier.AB):
+            is_not_zero = lambda a, b: a[B_VALUE] != 0
+        else:
+            is_not_zero = lambda a, b: a[A_VALUE] != 0 or b[B_VALUE] != 0
+
+        def jmn(a, b, a_pointer, b_pointer, position, core, warrior):
+            warrior.add_process(position + (a_pointer if is_not_zero(a, b) else 1))
+            return None, CoreEvent.READ
+
+        return jmn
 
 
 class DJN(JMN):
     """
     Decrement and jump if not zero (decrements a number by one, and jumps unless the result is 0)
     """
+    WRITES_A_TARGET = True
+
+    @classmethod
+    def operation(cls, modifier):
+        jmn = super(DJN, cls).operation(modifier)
+        if modifier in (Modifier.A, Modifier.BA):
+            def decrement(core, address, a, b):
+                decremented_a = core.a_value(address) - 1
+                core.set_a_value(address, decremented_a)
+                return (decremented_a, a[B_VALUE]), b
+        elif modifier in (Modifier.B, Modifier.AB):
+            def decrement(core, address, a, b):
+                # B operand snapshot isn't used by JMN.B/JMN.AB
+                core.set_a_value(address, core.a_value(address) - 1)
+                return a, b
+        else:
+            def decrement(core, address, a, b):
+                decremented_a = core.a_value(address) - 1
+                decremented_b = core.b_value(address) - 1
+                core.set_a_value(address, decremented_b)
+                return (decremented_a, decremented_b), b
 
-    @staticmethod
-    def _decrement_a(instruction, a):
-        decremented_a = instruction.a_value() - 1
-        instruction.set_a_value(decremented_a)
-        a.set_a_value(decremented_a)
+        def djn(a, b, a_pointer, b_pointer, position, core, warrior, a_write_pointer=None):
+            # With read/write limits jump uses read folded A pointer and decrement uses write folded one
+            a, b = decrement(core, position + (a_pointer if a_write_pointer is None else a_write_pointer), a, b)
+            jmn(a, b, a_pointer, b_pointer, position, core, warrior)
+            # Decremented field is at A pointer
+            return CoreEvent.WRITE, None
 
-    @staticmethod
-    def _decrement_b(instruction, a):
-        decremented_b = instruction.b_value() - 1
-        instruction.set_a_value(decremented_b)
-        a.set_b_value(decremented_b)
-
-    def instruction(self, a, b, a_pointer, b_pointer, position, core, warrior):
-        instruction_to_decrement = core[position + a_pointer]
-        if self._modifier in (Modifier.A, Modifier.BA):
-            self._decrement_a(instruction_to_decrement, a)
-        elif self._modifier in (Modifier.B, Modifier.AB):
-            self._decrement_a(instruction_to_decrement, b)
-        elif self._modifier in (Modifier.F, Modifier.X, Modifier.I):
-            self._decrement_a(instruction_to_decrement, a)
-            self._decrement_b(instruction_to_decrement, a)
-        super(DJN, self).instruction(a, b, a_pointer, b_pointer, position, core, warrior)
-        return None, CoreEvent.WRITE
+        return djn
 
 
 class SPL(Instruction):
@@ -328,38 +523,47 @@ class SPL(Instruction):
     Split (starts a second process at another address)
     """
 
-    def instruction(self, a, b, a_pointer, b_pointer, position, core, warrior):
-        warrior.add_process(position + 1)
-        warrior.add_process(position + a_pointer)
+    @classmethod
+    def snapshot(cls, modifier):
+        return None, None
+
+    @classmethod
+    def operation(cls, modifier):
+        def spl(a, b, a_pointer, b_pointer, position, core, warrior):
+            warrior.add_process(position + 1)
+            warrior.add_process(position + a_pointer)
+
+        return spl
 
 
 class CompareAndSkipInstruction(Instruction):
-    def instruction(self, a, b, a_pointer, b_pointer, position, core, warrior):
-        operator = self.get_operator()
-        skip = False
-        if self._modifier == Modifier.A:
-            skip = eval_expression(a.a_value(), operator, b.a_value())
-        elif self._modifier == Modifier.B:
-            skip = eval_expression(a.b_value(), operator, b.b_value())
-        elif self._modifier == Modifier.AB:
-            skip = eval_expression(a.a_value(), operator, b.b_value())
-        elif self._modifier == Modifier.BA:
-            skip = eval_expression(a.b_value(), operator, b.a_value())
-        elif self._modifier == Modifier.F:
-            first = eval_expression(a.a_value(), operator, b.a_value())
-            second = eval_expression(a.b_value(), operator, b.b_value())
-            skip = first and second
-        elif self._modifier == Modifier.X:
-            first = eval_expression(a.a_value(), operator, b.b_value())
-            second = eval_expression(a.b_value(), operator, b.a_value())
-            skip = first and second
-        elif self._modifier == Modifier.I:
-            skip = a == b
-        next_instruction = position + (2 if skip else 1)
-        warrior.add_process(next_instruction)
-        return CoreEvent.READ, CoreEvent.WRITE
-
-    def get_operator(self):
+    @classmethod
+    def snapshot(cls, modifier):
+        if modifier == Modifier.I:
+            return snapshot_cell, snapshot_cell
+        return snapshot_values, snapshot_values
+
+    @classmethod
+    def operation(cls, modifier):
+        compare = COMPARISON_OPERATIONS[cls.get_operator()]
+        skip = {
+            Modifier.A: lambda a, b: compare(a[A_VALUE], b[A_VALUE]),
+            Modifier.B: lambda a, b: compare(a[B_VALUE], b[B_VALUE]),
+            Modifier.AB: lambda a, b: compare(a[A_VALUE], b[B_VALUE]),
+            Modifier.BA: lambda a, b: compare(a[B_VALUE], b[A_VALUE]),
+            Modifier.F: lambda a, b: compare(a[A_VALUE], b[A_VALUE]) and compare(a[B_VALUE], b[B_VALUE]),
+            Modifier.X: lambda a, b: compare(a[A_VALUE], b[B_VALUE]) and compare(a[B_VALUE], b[A_VALUE]),
+            Modifier.I: lambda a, b: a == b,
+        }[modifier]
+
+        def compare_and_skip(a, b, a_pointer, b_pointer, position, core, warrior):
+            warrior.add_process(position + (2 if skip(a, b) else 1))
+            return CoreEvent.READ, CoreEvent.READ
+
+        return compare_and_skip
+
+    @staticmethod
+    def get_operator():
         # Implemented in extending classes
         return ComparisonOperator.EQUAL  # Set default to fix linter errors
 
@@ -369,7 +573,8 @@ class SEQ(CompareAndSkipInstruction):
     Skip if equal (compares two instructions, and skips the next instruction if they are equal)
     """
 
-    def get_operator(self):
+    @staticmethod
+    def get_operator():
         return ComparisonOperator.EQUAL
 
 
@@ -378,7 +583,8 @@ class SNE(CompareAndSkipInstruction):
     Skip if not equal (compares two instructions, and skips the next instruction if they aren't equal)
     """
 
-    def get_operator(self):
+    @staticmethod
+    def get_operator():
         return ComparisonOperator.NOT_EQUAL
 
 
@@ -387,7 +593,8 @@ class SLT(CompareAndSkipInstruction):
     Skip if lower than (compares two values, and skips the next instruction if the first is lower than the second)
     """
 
-    def get_operator(self):
+    @staticmethod
+    def get_operator():
         return ComparisonOperator.LOWER_THAN
 
 
@@ -396,31 +603,66 @@ class NOP(Instruction):
     No operation (does nothing)
     """
 
-    def instruction(self, a, b, a_pointer, b_pointer, position, core, warrior):
-        warrior.add_process(position + 1)
+    @classmethod
+    def snapshot(cls, modifier):
+        return None, None
+
+    @classmethod
+    def operation(cls, modifier):
+        def nop(a, b, a_pointer, b_pointer, position, core, warrior):
+            warrior.add_process(position + 1)
+
+        return nop
+
+
+def snapshot_values(core, address):
+    """
+    Copy operand values; indexed with A_VALUE and B_VALUE
+    :return: Tuple (a_value, b_value)
+    """
+    return core.values(address)
+
+
+def snapshot_cell(core, address):
+    """
+    Copy whole operand instruction; indexed with A_VALUE and B_VALUE, can be written with core.set_cell()
+    :return: Tuple (a_value, b_value, opcode, modifier, a_mode, b_mode)
+    """
+    return core.cell(address)
+
+
+@lru_cache(maxsize=None)
+def compile_instruction(instruction_class, modifier, a_mode, b_mode, folding=False, events=False):
+    """
+    Get execute function specialized for given instruction; built once for every combination
+    :param instruction_class: Class which extends Instruction
+    :param modifier: Modifier
+    :param a_mode: A Mode
+    :param b_mode: B Mode
+    :param folding: Fold pointers with core read/write limits
+    :param events: Emit core events
+    :return: Function (core, position, a_value, b_value, warrior)
+    """
+    return instruction_class.compile(modifier, a_mode, b_mode, folding, events)
 
 
-def get_default_modifier(instruction_class):
+def get_default_modifier(instruction_class, a_mode=Mode.DIRECT, b_mode=Mode.DIRECT):
     """
+    Default modifier as defined by ICWS'94 standard; depends on opcode and immediate operands
     :param instruction_class: Instruction class
+    :param a_mode: A Mode
+    :param b_mode: B Mode
     :return: Default Modifier for instruction_class
     """
-    default_modifiers = {
-        DAT: Modifier.F,
-        MOV: Modifier.I,
-        ADD: Modifier.AB,
-        SUB: Modifier.AB,
-        MUL: Modifier.AB,
-        DIV: Modifier.AB,
-        MOD: Modifier.AB,
-        JMP: Modifier.B,
-        JMZ: Modifier.B,
-        JMN: Modifier.B,
-        DJN: Modifier.B,
-        SEQ: Modifier.I,
-        SNE: Modifier.I,
-        SLT: Modifier.B,
-        SPL: Modifier.B,
-        NOP: Modifier.F
-    }
-    return default_modifiers[instruction_class] if instruction_class in default_modifiers else Modifier.AB
+    if instruction_class in (DAT, NOP):
+        return Modifier.F
+    if instruction_class in (MOV, SEQ, SNE, ADD, SUB, MUL, DIV, MOD):
+        if a_mode == Mode.IMMEDIATE:
+            return Modifier.AB
+        if b_mode == Mode.IMMEDIATE:
+            return Modifier.B
+        return Modifier.I if instruction_class in (MOV, SEQ, SNE) else Modifier.F
+    if instruction_class == SLT:
+        return Modifier.AB if a_mode == Mode.IMMEDIATE else Modifier.B
+    # JMP, JMZ, JMN, DJN, SPL
+    return Modifier.B
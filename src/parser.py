@@ -1,5 +1,11 @@
+import io
+import os
 import re
+import tarfile
+import zipfile
+from collections import namedtuple
 
+from src.config import MAX_PROCESSES
 from src.instructions import *
 from src.warrior import Warrior
 
@@ -14,13 +20,62 @@ class InvalidInstructionSyntaxException(Exception):
         super().__init__(f'Invalid syntax in line {line_number}: {line}')
 
 
-INSTRUCTION_PATTERN = re.compile(r'^([A-Z]{3})'  # INSTRUCTION
-                                 r'(?:\.(AB|BA|[ABFXI]))?'  # MODIFIER
-                                 r'(?:\s+([#$*@{<}>])?([^\s,;]+))'  # A-MODE, A-VALUE
-                                 r'(?:\s*,\s*([#$*@{<}>])?([^\s]+)\s*)?'  # B-MODE, B-VALUE
-                                 r'(?:\s*;.*)?$'  # Non capturing optional comment
-                                 )
+class InvalidExpressionException(Exception):
+    def __init__(self, expression, line_number, reason):
+        super().__init__(f'Invalid expression in line {line_number}: {expression} ({reason})')
+
+
+class EmptyWarriorException(Exception):
+    def __init__(self, origin):
+        super().__init__(f'No warrior instructions in {origin}')
+
+
 NAME_PATTERN = re.compile(r'^(?:;name\s*(.*))$')
+END_PATTERN = re.compile(r'^END(?:[\s;]|$)', re.IGNORECASE)
+REDCODE_PATTERN = re.compile(r'^;redcode', re.IGNORECASE)
+WARRIOR_FILE_EXTENSION = '.red'
+
+# Assembler patterns
+LINE_WORD_PATTERN = re.compile(r'\s*([A-Za-z_][A-Za-z0-9_]*)(?:\.(\w*))?(:?)')
+IDENTIFIER_PATTERN = re.compile(r'[A-Za-z_]')
+EXPRESSION_TOKEN_PATTERN = re.compile(r'\s*(?:(\d+)|([A-Za-z_][A-Za-z0-9_]*)|(&&|\|\||==|!=|<=|>=|[-+*/%()<>!]))')
+MODE_CHARACTERS = '#$*@{}<>'
+PSEUDO_OPCODES = ('EQU', 'FOR', 'ROF', 'ORG', 'END', 'PIN')
+
+# Values of predefined constants; CORESIZE should be overridden when warrior is loaded for other core size
+DEFAULT_CONSTANTS = {
+    'CORESIZE': 8000,
+    'MAXPROCESSES': MAX_PROCESSES,
+    'MAXCYCLES': 80000,
+    'MAXLENGTH': 100,
+    'MINDISTANCE': 100,
+    'WARRIORS': 2,
+    'ROUNDS': 1,
+}
+
+# Binary operators by precedence, lowest first; division and modulo truncate toward zero like in C
+BINARY_OPERATORS = (
+    {'||': lambda a, b: int(bool(a) or bool(b))},
+    {'&&': lambda a, b: int(bool(a) and bool(b))},
+    {'==': lambda a, b: int(a == b), '!=': lambda a, b: int(a != b)},
+    {'<': lambda a, b: int(a < b), '>': lambda a, b: int(a > b), '<=': lambda a, b: int(a <= b),
+     '>=': lambda a, b: int(a >= b)},
+    {'+': lambda a, b: a + b, '-': lambda a, b: a - b},
+    {'*': lambda a, b: a * b, '/': lambda a, b: _truncated_division(a, b),
+     '%': lambda a, b: a - b * _truncated_division(a, b)},
+)
+UNARY_OPERATORS = {
+    '-': lambda a: -a,
+    '+': lambda a: a,
+    '!': lambda a: int(not a),
+}
+
+# Parse errors reported by streaming API instead of being raised
+PARSE_ERRORS = (InvalidInstructionCodeException, InvalidInstructionSyntaxException, InvalidExpressionException,
+                EmptyWarriorException, ValueError)
+
+# Item yielded by streaming API; warrior is None when error is set
+ParsedWarrior = namedtuple('ParsedWarrior', ['origin', 'index', 'warrior', 'error'])
 
 INSTRUCTION_CODES = {
     "DAT": DAT,
@@ -35,6 +90,7 @@ INSTRUCTION_CODES = {
     "JMN": JMN,
     "DJN": DJN,
     "SEQ": SEQ,
+    "CMP": SEQ,  # ICWS'88 name of SEQ
     "SNE": SNE,
     "SLT": SLT,
     "SPL": SPL,
@@ -42,6 +98,253 @@ INSTRUCTION_CODES = {
 }
 
 
+def _truncated_division(a, b):
+    if b == 0:
+        raise ZeroDivisionError
+    quotient = abs(a) // abs(b)
+    return quotient if (a < 0) == (b < 0) else -quotient
+
+
+class Assembler:
+    """
+    Two-pass ICWS'94 assembler
+    First pass reads lines: expands FOR/ROF blocks, collects EQU definitions, label addresses and instruction
+    operands as expression text. Second pass evaluates operands; label value is its address relative to instruction.
+    """
+
+    def __init__(self, constants=None):
+        """
+        :param constants: Optional values of predefined constants overriding DEFAULT_CONSTANTS; e.g. {'CORESIZE': 800}
+        """
+        self._constants = dict(DEFAULT_CONSTANTS, **(constants or {}))
+        self._equs = {}
+        self._labels = {}
+        self._pending_labels = []
+        # Tuples (instruction_class, modifier, a_mode, a_expression, b_mode, b_expression, line, line_number)
+        self._lines = []
+        self._start = None
+        self._name = None
+        self._ended = False
+        self._tokens = {}
+
+    def read(self, numbered_lines):
+        """
+        First pass
+        :param numbered_lines: Iterable of (line_number, line) tuples
+        """
+        numbered_lines = iter(numbered_lines)
+        for line_number, line in numbered_lines:
+            if self._ended:
+                # Everything after END is ignored
+                return
+            self._read_line(line, line_number, numbered_lines)
+
+    def _read_line(self, line, line_number, numbered_lines):
+        code = line.split(';', 1)[0]
+        if not code.strip():
+            parsed_name = try_parse_name(line.strip())
+            if parsed_name:
+                self._name = parsed_name
+            return
+
+        labels = []
+        position = 0
+        opcode = modifier = None
+        while True:
+            match = LINE_WORD_PATTERN.match(code, position)
+            if not match:
+                break
+            word, word_modifier, colon = match.groups()
+            position = match.end()
+            if word.upper() in INSTRUCTION_CODES or word.upper() in PSEUDO_OPCODES:
+                opcode, modifier = word.upper(), word_modifier
+                break
+            rest = code[position:].strip()
+            if word_modifier is not None or not colon and rest and not IDENTIFIER_PATTERN.match(rest):
+                # Word is in opcode position
+                if len(word) == 3:
+                    raise InvalidInstructionCodeException(word.upper())
+                raise InvalidInstructionSyntaxException(line.strip(), line_number)
+            labels.append(word)
+        operands = code[position:].strip()
+
+        if opcode is None:
+            if operands:
+                raise InvalidInstructionSyntaxException(line.strip(), line_number)
+            # Labels without instruction point to the next instruction
+            self._pending_labels.extend(labels)
+        elif opcode == 'EQU':
+            if not labels or not operands:
+                raise InvalidInstructionSyntaxException(line.strip(), line_number)
+            for label in labels:
+                self._equs[label] = (operands, line_number)
+        elif opcode == 'FOR':
+            self._read_for(labels, operands, line, line_number, numbered_lines)
+        elif opcode == 'ROF':
+            raise InvalidInstructionSyntaxException(line.strip(), line_number)
+        elif opcode in ('ORG', 'END', 'PIN'):
+            self._pending_labels.extend(labels)
+            if opcode != 'PIN' and operands:
+                self._start = (operands, line_number)
+            if opcode == 'END':
+                self._define_labels(line_number)
+                self._ended = True
+        else:
+            self._pending_labels.extend(labels)
+            self._define_labels(line_number)
+            self._read_instruction(INSTRUCTION_CODES[opcode], modifier, operands, line, line_number)
+
+    def _define_labels(self, line_number):
+        for label in self._pending_labels:
+            if label in self._labels or label in self._equs:
+                raise InvalidExpressionException(label, line_number, 'label defined twice')
+            self._labels[label] = len(self._lines)
+        self._pending_labels = []
+
+    def _read_instruction(self, instruction_class, modifier, operands, line, line_number):
+        if modifier is not None and modifier.upper() not in Modifier.__members__:
+            raise InvalidInstructionSyntaxException(line.strip(), line_number)
+        fields = []
+        for operand in operands.split(',') if operands else []:
+            operand = operand.strip()
+            mode = operand[0] if operand and operand[0] in MODE_CHARACTERS else None
+            expression = operand[1:] if mode else operand
+            if not expression.strip():
+                raise InvalidInstructionSyntaxException(line.strip(), line_number)
+            fields.append((mode, expression))
+        if not fields or len(fields) > 2:
+            raise InvalidInstructionSyntaxException(line.strip(), line_number)
+        a_mode, a_expression = fields[0]
+        b_mode, b_expression = fields[1] if len(fields) == 2 else (None, None)
+        self._lines.append((instruction_class, modifier, a_mode, a_expression, b_mode, b_expression, line.strip(),
+                            line_number))
+
+    def _read_for(self, labels, count_expression, line, line_number, numbered_lines):
+        """
+        Read block until matching ROF and read it count times; last label is the counter, &counter in the block
+        is replaced with two digit counter value and counter with its value
+        """
+        count = self.evaluate(count_expression, len(self._lines), line_number)
+        counter = labels.pop() if labels else None
+        self._pending_labels.extend(labels)
+        block = []
+        depth = 1
+        for block_line_number, block_line in numbered_lines:
+            code = block_line.split(';', 1)[0].split()
+            words = [word.upper() for word in code[:2]]
+            if 'FOR' in words:
+                depth += 1
+            elif 'ROF' in words:
+                depth -= 1
+                if not depth:
+                    break
+            block.append((block_line_number, block_line))
+        else:
+            raise InvalidInstructionSyntaxException(line.strip(), line_number)
+        for value in range(1, count + 1):
+            if counter:
+                pattern = re.compile(rf'&{counter}\b|\b{counter}\b')
+                self.read((number, pattern.sub(lambda match: f'{value:02}' if match.group(0)[0] == '&' else
+                                               str(value), block_line)) for number, block_line in block)
+            else:
+                self.read(block)
+
+    def _tokenize(self, expression, line_number):
+        tokens = self._tokens.get(expression)
+        if tokens is None:
+            tokens = []
+            position = 0
+            expression_end = len(expression.rstrip())
+            while position < expression_end:
+                match = EXPRESSION_TOKEN_PATTERN.match(expression, position)
+                if not match:
+                    raise InvalidExpressionException(expression, line_number, 'unexpected character')
+                number, identifier, operator = match.groups()
+                tokens.append(('number', int(number)) if number else ('identifier', identifier) if identifier
+                              else ('operator', operator))
+                position = match.end()
+            self._tokens[expression] = tokens
+        return tokens
+
+    def evaluate(self, expression, address, line_number, expanding=()):
+        """
+        Evaluate expression of instruction at address
+        :param expression: Expression string
+        :param address: Address of instruction in warrior; labels are relative to it
+        :param line_number: Line number for error reporting
+        :param expanding: EQU names which are being evaluated; to detect recursive definitions
+        :return: int
+        """
+        tokens = self._tokenize(expression, line_number)
+        try:
+            value, position = self._evaluate_binary(tokens, 0, 0, address, line_number, expanding)
+        except IndexError:
+            raise InvalidExpressionException(expression, line_number, 'unexpected end')
+        except ZeroDivisionError:
+            raise InvalidExpressionException(expression, line_number, 'division by zero')
+        if position != len(tokens):
+            raise InvalidExpressionException(expression, line_number, 'unexpected token')
+        return value
+
+    def _evaluate_binary(self, tokens, position, level, address, line_number, expanding):
+        if level == len(BINARY_OPERATORS):
+            return self._evaluate_unary(tokens, position, address, line_number, expanding)
+        operators = BINARY_OPERATORS[level]
+        value, position = self._evaluate_binary(tokens, position, level + 1, address, line_number, expanding)
+        while position < len(tokens) and tokens[position][0] == 'operator' and tokens[position][1] in operators:
+            operation = operators[tokens[position][1]]
+            right, position = self._evaluate_binary(tokens, position + 1, level + 1, address, line_number, expanding)
+            value = operation(value, right)
+        return value, position
+
+    def _evaluate_unary(self, tokens, position, address, line_number, expanding):
+        kind, token = tokens[position]
+        if kind == 'number':
+            return token, position + 1
+        if kind == 'identifier':
+            return self._symbol_value(token, address, line_number, expanding), position + 1
+        if token in UNARY_OPERATORS:
+            value, position = self._evaluate_unary(tokens, position + 1, address, line_number, expanding)
+            return UNARY_OPERATORS[token](value), position
+        if token == '(':
+            value, position = self._evaluate_binary(tokens, position + 1, 0, address, line_number, expanding)
+            if tokens[position] != ('operator', ')'):
+                raise InvalidExpressionException(token, line_number, 'missing )')
+            return value, position + 1
+        raise InvalidExpressionException(token, line_number, 'unexpected token')
+
+    def _symbol_value(self, symbol, address, line_number, expanding):
+        if symbol in self._labels:
+            return self._labels[symbol] - address
+        if symbol in self._equs:
+            if symbol in expanding:
+                raise InvalidExpressionException(symbol, line_number, 'recursive EQU')
+            expression, equ_line_number = self._equs[symbol]
+            return self.evaluate(expression, address, equ_line_number, expanding + (symbol,))
+        if symbol.upper() == 'CURLINE':
+            return address
+        if symbol.upper() in self._constants:
+            return self._constants[symbol.upper()]
+        raise InvalidExpressionException(symbol, line_number, 'undefined symbol')
+
+    def warrior(self):
+        """
+        Second pass
+        :return: Warrior with assembled instructions and start offset
+        """
+        instructions = []
+        for address, (instruction_class, modifier, a_mode, a_expression, b_mode, b_expression, line,
+                      line_number) in enumerate(self._lines):
+            a_value = self.evaluate(a_expression, address, line_number)
+            b_value = self.evaluate(b_expression, address, line_number) if b_expression is not None else None
+            instructions.append(instruction_class(modifier, a_mode, a_value, b_mode, b_value))
+        start = 0
+        if self._start:
+            expression, line_number = self._start
+            start = self.evaluate(expression, 0, line_number)
+        return Warrior(instructions, name=self._name, start=start)
+
+
 def parse_instruction(line, line_number=1):
     """
     Parses single warrior instruction
@@ -49,22 +352,12 @@ def parse_instruction(line, line_number=1):
     :param line_number: Line number for error reporting
     :return: A class which extends Instruction abstract class
     """
-
-    match = re.search(INSTRUCTION_PATTERN, line.upper())
-    if not match:
-        # Regex doesn't match; it isn't an instruction at all
+    assembler = Assembler()
+    assembler.read([(line_number, line)])
+    instructions = assembler.warrior().instructions()
+    if len(instructions) != 1:
         raise InvalidInstructionSyntaxException(line, line_number)
-    groups = list(match.groups())
-    instruction_code = groups[0]
-    instruction_values = groups[1:]
-    if instruction_code in INSTRUCTION_CODES:
-        # It is a valid instruction; create corresponding instruction class
-        instruction_class = INSTRUCTION_CODES[instruction_code]
-        instruction = instruction_class(*instruction_values)
-        return instruction
-    else:
-        # It is instruction but with invalid instruction code
-        raise InvalidInstructionCodeException(instruction_code)
+    return instructions[0]
 
 
 def try_parse_name(line):
@@ -77,27 +370,97 @@ def try_parse_name(line):
     return list(match.groups())[0] if match else None
 
 
-def parse_warrior(file_handle):
+def parse_warrior(file_handle, first_line_number=0, constants=None):
     """
-    Parses warrior instructions from file_handle
+    Assemble warrior from file_handle; supports labels, EQU, FOR/ROF, ORG/END and expressions
     :param file_handle: file_handle stream
+    :param first_line_number: Number of the first line for error reporting
+    :param constants: Optional values of predefined constants; see Assembler
     :return: warrior object
     """
-    instructions = []
-    name = None
-    for line_number, line in enumerate(file_handle):
-        line = line.strip()
-        if line:
-            if line.startswith(';'):
-                # It is a comment
-                # Try to parse it as name comment
-                parsed_name = try_parse_name(line)
-                if parsed_name:
-                    # Set warrior name
-                    name = parsed_name
-            else:
-                # It isn't a comment and should be parsed as instruction
-                instruction = parse_instruction(line, line_number)
-                instructions.append(instruction)
+    assembler = Assembler(constants)
+    assembler.read(enumerate(file_handle, first_line_number))
+    return assembler.warrior()
+
+
+def _parse_warrior_lines(origin, index, lines, first_line_number):
+    try:
+        return ParsedWarrior(origin, index, parse_warrior(lines, first_line_number), None)
+    except PARSE_ERRORS as error:
+        return ParsedWarrior(origin, index, None, error)
 
-    return Warrior(instructions, name=name)
+
+def parse_warriors(lines, origin=''):
+    """
+    Lazily parse warriors from a stream which may contain many warriors; a warrior ends with END line
+    or when next one starts with ;redcode line. Only one warrior is kept in memory.
+    :param lines: Iterable of lines; for example file handle
+    :param origin: Name of the source for error reporting
+    :return: Generator of ParsedWarrior; index is position of the warrior in the stream
+    """
+    index = 0
+    current = []
+    first_line_number = 0
+    has_instructions = False
+    for line_number, line in enumerate(lines):
+        stripped = line.strip()
+        is_end = bool(END_PATTERN.match(stripped))
+        if is_end or has_instructions and REDCODE_PATTERN.match(stripped):
+            if has_instructions:
+                # END line is the last line of the warrior, it may give start address
+                yield _parse_warrior_lines(origin, index, current + [line] if is_end else current, first_line_number)
+                index += 1
+            # ;redcode line is the first line of the next one
+            current = [] if is_end else [line]
+            first_line_number = line_number + 1 if is_end else line_number
+            has_instructions = False
+            continue
+        current.append(line)
+        has_instructions = has_instructions or bool(stripped) and not stripped.startswith(';')
+    if has_instructions:
+        yield _parse_warrior_lines(origin, index, current, first_line_number)
+    elif not index:
+        yield ParsedWarrior(origin, index, None, EmptyWarriorException(origin))
+
+
+def _is_warrior_file(name):
+    return name.lower().endswith(WARRIOR_FILE_EXTENSION)
+
+
+def _text_lines(binary_file):
+    # Undecodable bytes are replaced, so binary garbage is reported as syntax error instead of stopping the stream
+    return io.TextIOWrapper(binary_file, encoding='utf-8', errors='replace')
+
+
+def stream_warriors(path):
+    """
+    Lazily parse all warriors from directory tree, tar or zip archive, or single (multi-warrior) file
+    In directories and archives only *.red files are parsed.
+    :param path: Path of directory, archive or file
+    :return: Generator of ParsedWarrior; origin is file path (with member name for archives)
+    """
+    if os.path.isdir(path):
+        for directory, directories, files in os.walk(path):
+            directories.sort()
+            for name in sorted(filter(_is_warrior_file, files)):
+                file_path = os.path.join(directory, name)
+                with open(file_path, 'rb') as file_handle:
+                    yield from parse_warriors(_text_lines(file_handle), file_path)
+    elif tarfile.is_tarfile(path):
+        with tarfile.open(path, 'r:*') as archive:
+            member = archive.next()
+            while member is not None:
+                if member.isfile() and _is_warrior_file(member.name):
+                    yield from parse_warriors(_text_lines(archive.extractfile(member)), f'{path}:{member.name}')
+                # TarFile keeps every read member; they are dropped so memory doesn't grow with archive size
+                archive.members = []
+                member = archive.next()
+    elif zipfile.is_zipfile(path):
+        with zipfile.ZipFile(path) as archive:
+            for info in archive.infolist():
+                if not info.is_dir() and _is_warrior_file(info.filename):
+                    with archive.open(info) as file_handle:
+                        yield from parse_warriors(_text_lines(file_handle), f'{path}:{info.filename}')
+    else:
+        with open(path, 'rb') as file_handle:
+            yield from parse_warriors(_text_lines(file_handle), path)
@@ -0,0 +1,208 @@
+"""
+Execution profiler; counts executions, wall time and core accesses of executed instructions
+
+Profiler is passed to Round (or Game, Tournament) and wraps execution of every instruction, so rounds without profiler
+run exactly the same code as before. Reads and writes are measured: they are READ and WRITE core events of executed
+instructions (the ones GUI shows), counted by sink() which Round adds to the core event sink. Skipped writes, e.g. of
+division by zero, aren't counted.
+"""
+import csv
+import json
+from time import perf_counter
+
+from src.core import OPCODES, MODIFIERS, MODES, OPCODE_CODES, MODIFIER_CODES, MODE_CODES
+from src.enum.event import CoreEvent
+from src.sinks import EventSink
+
+# Report categories; every executed instruction is counted once in every category
+CATEGORIES = ('opcodes', 'modifiers', 'a_modes', 'b_modes', 'warriors')
+CSV_FIELDS = ('category', 'name', 'executions', 'seconds', 'reads', 'writes')
+
+# Fields of statistics entry
+EXECUTIONS, SECONDS, READS, WRITES = range(4)
+
+
+def warrior_label(index, name):
+    """
+    :return: Name of warrior in reports; warriors with the same name are told apart by index
+    """
+    return f'{index}:{name}'
+
+
+class AccessCountingSink(EventSink):
+    def __init__(self):
+        """
+        Count READ and WRITE events into statistics entry of currently executed instruction; see Profiler.sink()
+        """
+        self._entry = None
+
+    def set_entry(self, entry):
+        self._entry = entry
+
+    def emit(self, address, warrior, event):
+        entry = self._entry
+        if entry is None:
+            return
+        if event is CoreEvent.READ:
+            entry[READS] += 1
+        elif event is CoreEvent.WRITE:
+            entry[WRITES] += 1
+
+
+class Profiler:
+    def __init__(self):
+        """
+        Collects statistics of executed instructions; one profiler may be shared by many rounds
+        """
+        # (opcode code, modifier code, a_mode code, b_mode code, warrior index) -> [executions, seconds, reads, writes]
+        self._stats = {}
+        # Warrior index -> name
+        self._names = {}
+        self._sink = AccessCountingSink()
+
+    def sink(self):
+        """
+        :return: EventSink which counts core accesses of profiled instructions; without it in core sink reads and
+                 writes aren't counted
+        """
+        return self._sink
+
+    def _entry(self, key):
+        entry = self._stats.get(key)
+        if entry is None:
+            entry = self._stats[key] = [0, 0.0, 0, 0]
+        return entry
+
+    def wrap(self, core, execute=None, warriors=()):
+        """
+        Profile core execution
+        :param core: Core object
+        :param execute: Optional function (position, warrior) to profile instead of core.execute
+        :param warriors: Warriors list of the round; statistics of warriors are kept by their index in it
+        :return: Function (position, warrior) to use instead of execute
+        """
+        execute = execute or core.execute
+        size = core.size()
+        opcodes, modifiers, a_modes, b_modes = core.opcodes(), core.modifiers(), core.a_modes(), core.b_modes()
+        indexes = {warrior: index for index, warrior in enumerate(warriors)}
+        for warrior, index in indexes.items():
+            self._names[index] = warrior.warrior_info().name()
+        get_entry = self._entry
+        set_entry = self._sink.set_entry
+
+        def profiled_execute(position, warrior):
+            address = position % size
+            entry = get_entry((opcodes[address], modifiers[address], a_modes[address], b_modes[address],
+                               indexes.get(warrior, 0)))
+            set_entry(entry)
+            start = perf_counter()
+            execute(address, warrior)
+            entry[SECONDS] += perf_counter() - start
+            entry[EXECUTIONS] += 1
+            set_entry(None)
+
+        return profiled_execute
+
+    def execute_instruction(self, instruction, core, position, warrior, warrior_index=0):
+        """
+        Profile Instruction.execute of instruction which isn't stored in core
+        :param instruction: Instruction object
+        :param core: Core object
+        :param position: Instruction position
+        :param warrior: Warrior which executes instruction
+        :param warrior_index: Index of warrior in reports
+        """
+        self._names[warrior_index] = warrior.warrior_info().name()
+        entry = self._entry((OPCODE_CODES[type(instruction)], MODIFIER_CODES[instruction.modifier()],
+                             MODE_CODES[instruction.a_mode()], MODE_CODES[instruction.b_mode()], warrior_index))
+        self._sink.set_entry(entry)
+        start = perf_counter()
+        instruction.execute(core, position, warrior)
+        entry[SECONDS] += perf_counter() - start
+        entry[EXECUTIONS] += 1
+        self._sink.set_entry(None)
+
+    def merge(self, other, warrior_indexes=None):
+        """
+        Add statistics of other profiler; used to collect profiles of tournament workers
+        :param other: Profiler
+        :param warrior_indexes: Optional list of indexes in this profiler of warriors of other profiler; e.g. pairing
+                                of tournament task
+        """
+        for index, name in other._names.items():
+            self._names[warrior_indexes[index] if warrior_indexes else index] = name
+        for (*instruction, index), values in other._stats.items():
+            entry = self._entry((*instruction, warrior_indexes[index] if warrior_indexes else index))
+            for field, value in enumerate(values):
+                entry[field] += value
+
+    def executions(self):
+        """
+        :return: Number of profiled executions
+        """
+        return sum(entry[EXECUTIONS] for entry in self._stats.values())
+
+    def _rows(self):
+        """
+        Decode collected statistics
+        :return: Generator of (instruction class, modifier, a_mode, b_mode, warrior label, executions, seconds, reads,
+                 writes) tuples
+        """
+        for (opcode, modifier, a_mode, b_mode, index), (executions, seconds, reads, writes) in self._stats.items():
+            label = warrior_label(index, self._names.get(index, ''))
+            yield (OPCODES[opcode], MODIFIERS[modifier], MODES[a_mode], MODES[b_mode], label, executions, seconds,
+                   reads, writes)
+
+    def report(self):
+        """
+        Summarize statistics by opcode, modifier, address modes and warrior
+        :return: Dict with 'total' and CATEGORIES keys; every category is dict name -> dict with executions, seconds,
+                 reads and writes; warriors are named with warrior_label()
+        """
+        report = {category: {} for category in CATEGORIES}
+        total = {'executions': 0, 'seconds': 0.0, 'reads': 0, 'writes': 0}
+        for instruction_class, modifier, a_mode, b_mode, name, executions, seconds, reads, writes in self._rows():
+            names = (instruction_class.__name__, modifier.value, a_mode.value, b_mode.value, name)
+            for category, category_name in zip(CATEGORIES, names):
+                item = report[category].setdefault(category_name, dict.fromkeys(total, 0))
+                item['executions'] += executions
+                item['seconds'] += seconds
+                item['reads'] += reads
+                item['writes'] += writes
+            total['executions'] += executions
+            total['seconds'] += seconds
+            total['reads'] += reads
+            total['writes'] += writes
+        report['total'] = total
+        return report
+
+    def write_json(self, file_handle):
+        json.dump(self.report(), file_handle, indent=2)
+
+    def write_csv(self, file_handle):
+        """
+        Write report as CSV; one row for every name of every category and 'total' row
+        """
+        report = self.report()
+        writer = csv.writer(file_handle)
+        writer.writerow(CSV_FIELDS)
+        for category in CATEGORIES:
+            for name, item in sorted(report[category].items(), key=lambda pair: -pair[1]['seconds']):
+                writer.writerow((category, name) + tuple(item[field] for field in CSV_FIELDS[2:]))
+        total = report['total']
+        writer.writerow(('total', '') + tuple(total[field] for field in CSV_FIELDS[2:]))
+
+    def write_folded(self, file_handle, by_time=True):
+        """
+        Write folded stacks for flame graph tools (e.g. flamegraph.pl); one line "warrior;opcode;instruction count"
+        :param by_time: Weight stacks with microseconds; executions otherwise
+        """
+        lines = {}
+        for instruction_class, modifier, a_mode, b_mode, name, executions, seconds, _, _ in self._rows():
+            opcode = instruction_class.__name__
+            # Semicolons separate frames
+            instruction = f'{opcode}.{modifier.value} {a_mode.value} {b_mode.value}'
+            stack = ';'.join((name.replace(';', ','), opcode, instruction))
+            lines[stack] = lines.get(stack, 0) + (seconds * 1e6 if by_time else executions)
+        for stack, weight in sorted(lines.items()):
+            file_handle.write(f'{stack} {round(weight)}\n')
@@ -0,0 +1,119 @@
+"""
+Operand resolution; every address mode has its own resolver selected once when instruction is compiled
+
+Resolver computes pointer of the operand relative to instruction position and performs predecrement in one pass
+with a single modulo. Postincrement is separate, because it happens after operand is copied.
+Core values are kept mod core size, so decremented and incremented fields are wrapped without modulo.
+Resolvers don't emit events; EMITTING_RESOLVERS add WRITE events of changed fields for cores with event sink.
+"""
+from src.enum.event import CoreEvent
+from src.enum.mode import Mode
+
+
+def resolve_immediate(core, position, value, warrior):
+    # Pointer is 0
+    return 0
+
+
+def resolve_direct(core, position, value, warrior):
+    # Direct address to current position
+    return value
+
+
+def resolve_a_indirect(core, position, value, warrior):
+    return core.a_values()[(position + value) % core.size()] + value
+
+
+def resolve_b_indirect(core, position, value, warrior):
+    return core.b_values()[(position + value) % core.size()] + value
+
+
+def resolve_a_predecrement(core, position, value, warrior):
+    size = core.size()
+    address = (position + value) % size
+    values = core.a_values()
+    field = (values[address] or size) - 1
+    values[address] = field
+    return field + value
+
+
+def resolve_b_predecrement(core, position, value, warrior):
+    size = core.size()
+    address = (position + value) % size
+    values = core.b_values()
+    field = (values[address] or size) - 1
+    values[address] = field
+    return field + value
+
+
+def postincrement_a(core, position, value, warrior):
+    size = core.size()
+    address = (position + value) % size
+    values = core.a_values()
+    field = values[address] + 1
+    values[address] = field if field < size else 0
+
+
+def postincrement_b(core, position, value, warrior):
+    size = core.size()
+    address = (position + value) % size
+    values = core.b_values()
+    field = values[address] + 1
+    values[address] = field if field < size else 0
+
+
+def emitting(change):
+    """
+    Add WRITE event of changed field to predecrement or postincrement
+    :param change: Resolver or postincrement function
+    :return: Function with the same arguments and result
+    """
+    def change_and_emit(core, position, value, warrior):
+        result = change(core, position, value, warrior)
+        core.emit_event(position + value, warrior, CoreEvent.WRITE)
+        return result
+
+    return change_and_emit
+
+
+# Mode -> (resolve, postincrement); functions (core, position, value, warrior), postincrement may be None
+RESOLVERS = {
+    Mode.IMMEDIATE: (resolve_immediate, None),
+    Mode.DIRECT: (resolve_direct, None),
+    Mode.A_INDIRECT: (resolve_a_indirect, None),
+    Mode.B_INDIRECT: (resolve_b_indirect, None),
+    Mode.A_PRE_DEC_INDIRECT: (resolve_a_predecrement, None),
+    Mode.B_PRE_DEC_INDIRECT: (resolve_b_predecrement, None),
+    Mode.A_POST_INC_INDIRECT: (resolve_a_indirect, postincrement_a),
+    Mode.B_POST_INC_INDIRECT: (resolve_b_indirect, postincrement_b),
+}
+
+# The same with WRITE events of changed fields; used when core has event sink
+EMITTING_RESOLVERS = {
+    **RESOLVERS,
+    Mode.A_PRE_DEC_INDIRECT: (emitting(resolve_a_predecrement), None),
+    Mode.B_PRE_DEC_INDIRECT: (emitting(resolve_b_predecrement), None),
+    Mode.A_POST_INC_INDIRECT: (resolve_a_indirect, emitting(postincrement_a)),
+    Mode.B_POST_INC_INDIRECT: (resolve_b_indirect, emitting(postincrement_b)),
+}
+
+
+def get_resolvers(mode, folding=False, events=False):
+    """
+    Select operand resolution for address mode
+    :param mode: Address mode
+    :param folding: Resolve for core with read/write limits; uses generic Core methods which fold pointers
+    :param events: Emit WRITE events of decremented and incremented fields
+    :return: Tuple (resolve, postincrement); functions (core, position, value, warrior), postincrement may be None
+    """
+    if not folding or mode in (Mode.IMMEDIATE, Mode.DIRECT):
+        return (EMITTING_RESOLVERS if events else RESOLVERS)[mode]
+
+    def resolve(core, position, value, warrior):
+        return core.get_core_address_mode_value(mode, value, position, warrior)
+
+    postincrement = None
+    if RESOLVERS[mode][1]:
+        def postincrement(core, position, value, warrior):
+            core.check_postincrement(mode, value, position, warrior)
+    return resolve, postincrement
@@ -1,32 +1,102 @@
-import copy
-from random import randrange, sample
+import random
+from collections import namedtuple
 
+from src.config import MAX_PROCESSES
 from src.core import Core
 from src.enum.event import CoreEvent
-from src.gui.gui import MockGUI
+from src.gui.gui import MockGUI, SimulationAbortedException
+from src.sinks import TeeSink
+
+# Placement of warriors in a round; positions are core addresses in warriors order, order is loading order
+RoundRecord = namedtuple('RoundRecord', ['seed', 'positions', 'order'])
+
+# Optional hooks of a round; every field defaults to None
+#   tie_detector: TieDetector to end round with a tie before max_cycles
+#   profiler: Profiler to collect statistics of executed instructions; also receives core events to count accesses
+#   sink: EventSink of core events; default is gui's sink, or no events without gui
+#   recorder: TraceRecorder; receives core events together with sink
+#   checkpoint: Checkpoint; round is saved into it every checkpoint interval simulation steps
+#   cycle_limit: play() stops after this many cycles without any results, see Round.is_interrupted()
+RoundHooks = namedtuple('RoundHooks', ['tie_detector', 'profiler', 'sink', 'recorder', 'checkpoint', 'cycle_limit'],
+                        defaults=(None,) * 6)
+NO_HOOKS = RoundHooks()
+
+
+def draw_record(warrior_count, core_size, seed=None):
+    """
+    Draw random placement of warriors; first warrior is placed at random address and the others follow in random
+    order with equal spaces
+    :param warrior_count: Number of warriors
+    :param core_size: Core size
+    :param seed: Optional seed; without seed global random is used (so random.seed() still works)
+    :return: RoundRecord
+    """
+    generator = random.Random(seed) if seed is not None else random
+    start_position = generator.randrange(core_size)
+    space_between_warriors = core_size // warrior_count
+    order = generator.sample(range(warrior_count), warrior_count)
+    positions = [0] * warrior_count
+    for i, warrior_index in enumerate(order):
+        positions[warrior_index] = (start_position + i * space_between_warriors) % core_size
+    return RoundRecord(seed, positions, order)
 
 
 class Round:
-    def __init__(self, warriors, core=None, core_size=8000, init_warriors=True, gui=None, number=0, max_cycles=80000):
+    def __init__(self, warriors, core=None, core_size=8000, init_warriors=True, gui=None, number=0, max_cycles=80000,
+                 max_processes=MAX_PROCESSES, read_limit=None, write_limit=None, seed=None, record=None,
+                 hooks=NO_HOOKS):
         """
         Round constructor
         :param warriors: Required warriors list
         :param core: Optional core for testing purposes
         :param core_size: Other core size than default
         :param init_warriors: Execute init_warriors() for testing purposes
-        """
-        self._core = core if core else Core(core_size, gui=gui)
+        :param max_processes: Max processes of single warrior
+        :param read_limit: Optional ICWS'94 read limit of the core; see Core
+        :param write_limit: Optional ICWS'94 write limit of the core; see Core
+        :param seed: Optional seed of warriors placement; the same seed gives the same round
+        :param record: Optional RoundRecord of earlier round to replay it; seed is ignored
+        :param hooks: RoundHooks with optional tie detector, profiler, event sink, trace recorder, checkpoint and
+                      cycle limit
+        """
+        sink, recorder, profiler = hooks.sink, hooks.recorder, hooks.profiler
+        # Recorder and profiler receive core events together with sink
+        extra_sinks = [extra_sink for extra_sink in (recorder, profiler and profiler.sink()) if extra_sink]
+        if extra_sinks:
+            sink = sink or (gui.event_sink() if gui else None)
+            if sink and not sink.is_null():
+                extra_sinks.insert(0, sink)
+            sink = TeeSink(*extra_sinks) if len(extra_sinks) > 1 else extra_sinks[0]
+        self._core = core if core else Core(core_size, gui=gui, read_limit=read_limit, write_limit=write_limit,
+                                                sink=sink)
+        # Without profiler and recorder instructions are executed directly by core
+        self._execute = self._core.execute
+        if recorder:
+            self._execute = recorder.wrap(self._core, self._execute, warriors)
+        if profiler:
+            self._execute = profiler.wrap(self._core, self._execute, warriors)
         self._warriors = warriors
+        self._max_processes = max_processes
         if gui:
             self._gui = gui
             self._gui.init_game_screen()
         else:
             self._gui = MockGUI(core_size)
+        self._alive_warriors = []
+        self._seed = seed
+        self._record = record
         if init_warriors:
             self.init_warriors()
+        else:
+            self._update_alive_warriors()
         self._number = number
         self._cycles = 0
         self._max_cycles = max_cycles
+        self._tie_detector = hooks.tie_detector
+        self._saved_cycles = 0
+        self._checkpoint = hooks.checkpoint
+        self._cycle_limit = hooks.cycle_limit
+        self._interrupted = False
 
     def core(self):
         return self._core
@@ -37,49 +107,90 @@ class Round:
     def cycles(self):
         return self._cycles
 
+    def set_cycles(self, cycles):
+        """
+        Continue round from cycles executed earlier; used when round is restored from Checkpoint
+        """
+        self._cycles = cycles
+
+    def number(self):
+        return self._number
+
+    def is_interrupted(self):
+        """
+        :return: True when play() was stopped by cycle limit before the round ended
+        """
+        return self._interrupted
+
+    def saved_cycles(self):
+        """
+        :return: Cycles which were not executed because round was ended early with a tie
+        """
+        return self._saved_cycles
+
     def _init_warrior(self, warrior, starting_core_address):
         """
         Load a warrior into the core
         :param warrior: Warrior to be loaded
         :param starting_core_address: Core address where first instruction will be loaded
         """
-        self._core[starting_core_address] = copy.copy(warrior.instructions())
         for offset, instruction in enumerate(warrior.instructions()):
             address = starting_core_address + offset
-            self._core[address] = copy.copy(instruction)
-            self._core.update_core_gui(address, warrior, CoreEvent.EXECUTE)
-        warrior.add_process(starting_core_address)
+            self._core[address] = instruction
+            self._core.emit_event(address, warrior, CoreEvent.EXECUTE)
+        warrior.clear_processes()
+        warrior.set_max_processes(self._max_processes)
+        # Warrior starts at its ORG/END offset
+        warrior.add_process(starting_core_address + warrior.start())
 
     def init_warriors(self):
         """
-        Iterate all warriors and load them into the core
+        Iterate all warriors and load them into the core; placement is drawn unless round is replayed
+        """
+        if self._record is None:
+            self._record = draw_record(len(self._warriors), self._core.size(), self._seed)
+        for warrior_index in self._record.order:
+            self._init_warrior(self._warriors[warrior_index], self._record.positions[warrior_index])
+        self._update_alive_warriors()
+
+    def record(self):
+        """
+        :return: RoundRecord to replay the round; None when warriors weren't loaded by init_warriors()
         """
-        core_size = self._core.size()
-        start_position = randrange(core_size)
-        space_between_warriors = core_size // len(self._warriors)
+        return self._record
 
-        shuffled_warriors = sample(self._warriors, len(self._warriors))
-        for i, warrior in enumerate(shuffled_warriors):
-            self._init_warrior(warrior, start_position + i * space_between_warriors)
+    def _update_alive_warriors(self):
+        """
+        Rebuild list of alive warriors; called only when a warrior may have died, not every cycle
+        """
+        self._alive_warriors = [warrior for warrior in self._warriors if warrior.process_count()]
 
     def is_ended(self):
         """
         Check if the round is ended
         :return: True or False
         """
-        return len(self.get_alive_warriors()) <= 1 or self._cycles > self._max_cycles
+        if len(self._alive_warriors) <= 1 or self._cycles > self._max_cycles:
+            return True
+        if self._tie_detector and self._tie_detector.is_tied(self):
+            self._saved_cycles = self._max_cycles - self._cycles
+            return True
+        return False
 
     def get_alive_warriors(self):
         """
         Return list of warriors which have at least one process
-        :return: Alive warrior count
+        :return: Alive warriors list in execution order
         """
-        return [warrior for warrior in self._warriors if warrior.processes()]
+        return list(self._alive_warriors)
 
     def update_warriors_results(self):
         """
-        Update alive warrior results after the round ended
+        Update warrior results after the round ended; warriors without processes lost the round
         """
+        for warrior in self._warriors:
+            if not warrior.process_count():
+                warrior.warrior_info().inc_loses()
         alive_warriors = self.get_alive_warriors()
         if len(alive_warriors) == 1:
             # Only one alive warrior remained; increment its wins
@@ -93,28 +204,41 @@ class Round:
 
     def simulation_step(self):
         """
-        Iterate all warriors and execute one queued instruction for each warrior
-        """
-        for warrior in self._warriors:
-            if warrior.processes():
-                instruction_pos = warrior.processes().pop(0)
-                instruction = self._core[instruction_pos]
-                instruction.execute(self._core, instruction_pos, warrior)
-                self._cycles += 1
-                if len(warrior.processes()) == 0:
-                    # If warrior doesn't have processes it lost in this round
-                    warrior.warrior_info().inc_loses()
+        Iterate alive warriors and execute one queued instruction for each warrior; dead warriors are skipped
+        """
+        died = False
+        for warrior in self._alive_warriors:
+            instruction_pos = warrior.next_process()
+            self._execute(instruction_pos, warrior)
+            self._cycles += 1
+            if not warrior.process_count():
+                # Warrior lost this round; loses are counted when the round ends
+                died = True
+        if died:
+            self._update_alive_warriors()
 
     def play(self):
         """
         Execute the simulation step and update GUI until the round is not ended
+        :raises SimulationAbortedException: When GUI window is closed; results of the round aren't updated
         """
         self._gui.print_round_text(self._number)
         # Play game
         while not self.is_ended():
+            if self._cycle_limit is not None and self._cycles >= self._cycle_limit:
+                self._interrupted = True
+                return
             self.simulation_step()
+            if self._checkpoint:
+                self._checkpoint.update(self)
             self._gui.print_game_info(self._warriors, self._cycles)
-            self._gui.handle_events()
+            try:
+                self._gui.handle_events()
+            except SimulationAbortedException:
+                # Round is between simulation steps, so it is saved to be resumed
+                if self._checkpoint:
+                    self._checkpoint.save(self)
+                raise
             self._gui.clock_tick()
         # Update results
         self.update_warriors_results()
@@ -0,0 +1,246 @@
+"""
+Headless battle server; long-running asyncio server which plays games submitted by other tools
+
+Protocol is JSON lines over TCP or Unix socket. Every request line is a job:
+    {"id": 1, "warriors": ["<redcode source>", ...], "rounds": 10, "core_size": 8000, "max_cycles": 80000,
+     "max_processes": 8000, "seed": null, "cycle_limit": null}
+Only warriors are required; id is assigned by server when it's missing. Server answers with "queued" line when the job
+is accepted and with "finished", "timeout" or "error" line when it's done; results of jobs are sent as they complete,
+not in order of requests:
+    {"id": 1, "status": "finished", "rounds": 10, "cycles": 123456, "results": [{"name": "Imp", "wins": 0, ...}, ...]}
+cycle_limit is a timeout of the job measured in cycles executed by the whole game; a job which reaches it is stopped
+with "timeout" status and results of rounds finished before.
+
+Games are played by worker processes. Queue of jobs waiting for a worker is bounded; while it is full, requests aren't
+read from clients, so clients are slowed down by the socket (backpressure) instead of filling server memory.
+"""
+import asyncio
+import itertools
+import json
+import multiprocessing
+import os
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from src.config import MAX_PROCESSES, MAX_CORE_SIZE, MAX_ROUNDS, MAX_CYCLES, MAX_WARRIORS, SERVER_HOST, SERVER_PORT, \
+    SERVER_QUEUE_SIZE, MAX_REQUEST_SIZE
+from src.enum.job_status import JobStatus
+from src.game import Game
+from src.parser import parse_warrior, PARSE_ERRORS
+
+# Optional request field -> (default, minimum, maximum); the same limits as command line arguments
+JOB_SETTINGS = {
+    'rounds': (10, 1, MAX_ROUNDS),
+    'core_size': (8000, 100, MAX_CORE_SIZE),
+    'max_cycles': (80000, 100, MAX_CYCLES),
+    'max_processes': (MAX_PROCESSES, 1, MAX_CORE_SIZE),
+}
+
+# Accepted job; done is resolved when its result is sent
+Job = namedtuple('Job', ['id', 'args', 'writer', 'done'])
+
+
+def job_args(request):
+    """
+    Validate job request
+    :param request: Decoded JSON request
+    :return: Tuple of play_job() arguments
+    :raises ValueError: When request is invalid
+    """
+    if not isinstance(request, dict):
+        raise ValueError('Request must be JSON object')
+    sources = request.get('warriors')
+    if not isinstance(sources, list) or not all(isinstance(source, str) for source in sources):
+        raise ValueError('warriors must be list of warrior sources')
+    if not 2 <= len(sources) <= MAX_WARRIORS:
+        raise ValueError(f'Number of warriors should be in range [2,{MAX_WARRIORS}]')
+    settings = []
+    for name, (default, minimum, maximum) in JOB_SETTINGS.items():
+        value = request.get(name, default)
+        # bool is int too
+        if type(value) is not int or not minimum <= value <= maximum:
+            raise ValueError(f'{name} must be an integer in range [{minimum},{maximum}]')
+        settings.append(value)
+    seed = request.get('seed')
+    if seed is not None and type(seed) is not int:
+        raise ValueError('seed must be an integer')
+    cycle_limit = request.get('cycle_limit')
+    if cycle_limit is not None and (type(cycle_limit) is not int or cycle_limit < 1):
+        raise ValueError('cycle_limit must be a positive integer')
+    return (sources, *settings, seed, cycle_limit)
+
+
+def play_job(sources, rounds, core_size, max_cycles, max_processes, seed, cycle_limit):
+    """
+    Parse warriors and play the game; executed in worker process
+    :param sources: List of warrior sources
+    :param rounds: Rounds of the game
+    :param core_size: Core size; also value of CORESIZE constant in warrior expressions
+    :param max_cycles: Max cycles of single round
+    :param max_processes: Max processes of single warrior
+    :param seed: Optional seed of the game
+    :param cycle_limit: Optional limit of cycles executed by the whole game; see Game
+    :return: Dict with result message of the job, without id
+    """
+    try:
+        warriors = [parse_warrior(source.splitlines(), constants={'CORESIZE': core_size}) for source in sources]
+    except PARSE_ERRORS as error:
+        return {'status': JobStatus.ERROR.value, 'error': str(error)}
+    game = Game(warriors, core_size, None, rounds, max_cycles, max_processes, seed, cycle_limit=cycle_limit)
+    game.play()
+    status = JobStatus.TIMEOUT if game.is_timed_out() else JobStatus.FINISHED
+    results = [{'name': info.name(), 'wins': info.wins(), 'loses': info.loses(), 'ties': info.ties()}
+               for info in (warrior.warrior_info() for warrior in warriors)]
+    return {'status': status.value, 'rounds': game.played_rounds(), 'cycles': game.cycles(), 'results': results}
+
+
+async def send(writer, message):
+    """
+    Write message as JSON line; messages to disconnected clients are dropped
+    :param writer: asyncio StreamWriter
+    :param message: JSON serializable dict
+    """
+    if writer.is_closing():
+        return
+    writer.write(json.dumps(message).encode() + b'\n')
+    try:
+        # Waits while client doesn't read its results
+        await writer.drain()
+    except ConnectionError:
+        pass
+
+
+class BattleServer:
+    def __init__(self, workers=None, queue_size=SERVER_QUEUE_SIZE):
+        """
+        Battle server; start() it in running event loop
+        :param workers: Number of worker processes and jobs played at once; None for CPU count
+        :param queue_size: Max jobs waiting for a worker
+        """
+        self._workers = workers or os.cpu_count() or 1
+        self._queue_size = queue_size
+        self._queue = None
+        self._executor = None
+        self._executor_lock = None
+        self._server = None
+        self._dispatchers = []
+        self._ids = itertools.count(1)
+
+    async def start(self, host=SERVER_HOST, port=SERVER_PORT, path=None):
+        """
+        Start worker processes and listen for clients
+        :param host: TCP host
+        :param port: TCP port; 0 to choose free port, see addresses()
+        :param path: Optional Unix socket path; used instead of TCP
+        """
+        self._queue = asyncio.Queue(self._queue_size)
+        self._executor = self._create_executor()
+        self._executor_lock = asyncio.Lock()
+        self._dispatchers = [asyncio.create_task(self._dispatch()) for _ in range(self._workers)]
+        if path:
+            self._server = await asyncio.start_unix_server(self._handle_client, path, limit=MAX_REQUEST_SIZE)
+        else:
+            self._server = await asyncio.start_server(self._handle_client, host, port, limit=MAX_REQUEST_SIZE)
+
+    def _create_executor(self):
+        # Forked workers would inherit sockets of connected clients and keep them open after the server closes them
+        return ProcessPoolExecutor(max_workers=self._workers, mp_context=multiprocessing.get_context('spawn'))
+
+    def addresses(self):
+        """
+        :return: List of listening socket addresses
+        """
+        return [sock.getsockname() for sock in self._server.sockets]
+
+    async def serve_forever(self):
+        await self._server.serve_forever()
+
+    async def close(self):
+        """
+        Stop listening and playing; queued and running jobs are dropped
+        """
+        self._server.close()
+        await self._server.wait_closed()
+        for dispatcher in self._dispatchers:
+            dispatcher.cancel()
+        await asyncio.gather(*self._dispatchers, return_exceptions=True)
+        # Waiting for running games would block the event loop for the length of a battle; their workers are stopped,
+        # otherwise interpreter exit would wait for them
+        for process in list(self._executor._processes.values()):
+            process.terminate()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    async def _handle_client(self, reader, writer):
+        """
+        Read jobs of one client until it closes its side, then wait for their results
+        """
+        loop = asyncio.get_running_loop()
+        pending = []
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except ConnectionError:
+                    # Client is gone; results of its queued jobs are dropped by send()
+                    break
+                except ValueError:
+                    # Request is longer than MAX_REQUEST_SIZE; rest of the stream can't be parsed
+                    await send(writer, {'id': None, 'status': JobStatus.ERROR.value, 'error': 'Request is too long'})
+                    break
+                if not line:
+                    break
+                if not line.strip():
+                    continue
+                job_id = None
+                try:
+                    request = json.loads(line)
+                    if isinstance(request, dict):
+                        job_id = request.get('id')
+                    args = job_args(request)
+                except (ValueError, RecursionError) as error:
+                    # RecursionError is raised by json for deeply nested requests
+                    await send(writer, {'id': job_id, 'status': JobStatus.ERROR.value, 'error': str(error)})
+                    continue
+                if job_id is None:
+                    job_id = next(self._ids)
+                done = loop.create_future()
+                # Waits while queue is full, so next requests of the client aren't read
+                await self._queue.put(Job(job_id, args, writer, done))
+                pending.append(done)
+                await send(writer, {'id': job_id, 'status': JobStatus.QUEUED.value})
+            await asyncio.gather(*pending)
+        finally:
+            writer.close()
+
+    async def _dispatch(self):
+        """
+        Play queued jobs in worker process one by one and send their results
+        """
+        while True:
+            job = await self._queue.get()
+            try:
+                result = await self._play(job)
+            except Exception as error:
+                # Failure of single job is reported to its client; server keeps running
+                result = {'status': JobStatus.ERROR.value, 'error': f'{type(error).__name__}: {error}'}
+            await send(job.writer, {'id': job.id, **result})
+            job.done.set_result(None)
+            self._queue.task_done()
+
+    async def _play(self, job):
+        """
+        Play job in worker process; pool broken by a dead worker (e.g. killed when out of memory) is replaced
+        :param job: Job
+        :return: Dict with result message of the job, without id
+        """
+        executor = self._executor
+        try:
+            return await asyncio.get_running_loop().run_in_executor(executor, play_job, *job.args)
+        except BrokenProcessPool:
+            async with self._executor_lock:
+                # All dispatchers share the pool; only the first one which sees it broken replaces it
+                if self._executor is executor:
+                    executor.shutdown(wait=False, cancel_futures=True)
+                    self._executor = self._create_executor()
+            return {'status': JobStatus.ERROR.value, 'error': 'Worker process died while playing the job'}
@@ -0,0 +1,100 @@
+"""
+Core event sinks; core sends READ/WRITE/EXECUTE events of executed instructions to a sink chosen once per round
+
+Instructions are compiled without event calls when core has the null sink, so headless rounds don't pay anything
+for events. Addresses passed to sinks are already mod core size.
+"""
+from abc import ABC, abstractmethod
+
+from src.config import EVENT_BUFFER_SIZE
+
+
+class EventSink(ABC):
+    def is_null(self):
+        """
+        :return: True when sink ignores events, so core can skip emitting them
+        """
+        return False
+
+    @abstractmethod
+    def emit(self, address, warrior, event):
+        """
+        Receive core event
+        :param address: Core address
+        :param warrior: Warrior which caused event
+        :param event: CoreEvent
+        """
+        pass
+
+
+class NullSink(EventSink):
+    """
+    Ignores events; handlers of core with this sink are compiled without event calls
+    """
+
+    def is_null(self):
+        return True
+
+    def emit(self, address, warrior, event):
+        pass
+
+
+# Shared instance; sink has no state
+NULL_SINK = NullSink()
+
+
+class GUISink(EventSink):
+    def __init__(self, gui):
+        """
+        Send events to GUI blocks colored by warrior
+        :param gui: GUI object
+        """
+        self._set_block_color = gui.set_block_color
+
+    def emit(self, address, warrior, event):
+        self._set_block_color(address, warrior.color(), event)
+
+
+class TeeSink(EventSink):
+    def __init__(self, *sinks):
+        """
+        Send events to all sinks; e.g. to GUI and trace recorder
+        :param sinks: EventSink objects
+        """
+        self._sinks = sinks
+
+    def emit(self, address, warrior, event):
+        for sink in self._sinks:
+            sink.emit(address, warrior, event)
+
+
+class RecordingSink(EventSink):
+    def __init__(self, buffer_size=EVENT_BUFFER_SIZE, on_flush=None):
+        """
+        Buffer events as (address, warrior, event) tuples
+        :param buffer_size: Number of events passed to on_flush at once
+        :param on_flush: Optional function called with list of buffered events when buffer is full and on flush();
+                         without it all events are kept in buffer
+        """
+        self._buffer_size = buffer_size
+        self._on_flush = on_flush
+        self._events = []
+
+    def emit(self, address, warrior, event):
+        self._events.append((address, warrior, event))
+        if self._on_flush and len(self._events) >= self._buffer_size:
+            self.flush()
+
+    def events(self):
+        """
+        :return: List of buffered events
+        """
+        return self._events
+
+    def flush(self):
+        """
+        Pass buffered events to on_flush and clear buffer
+        """
+        if self._on_flush and self._events:
+            self._on_flush(self._events)
+        self._events = []
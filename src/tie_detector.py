@@ -0,0 +1,59 @@
+from array import array
+from hashlib import blake2b
+
+from src.config import TIE_CHECK_WINDOW
+
+
+class TieDetector:
+    def __init__(self, window=TIE_CHECK_WINDOW, stall_checks=None):
+        """
+        Detects rounds which would end with a tie before reaching max cycles; create new detector for every round
+        State of the round (core and process queues of all warriors) is hashed every window simulation steps.
+        When the same state is seen again the round loops forever without losing any process, so it is a tie.
+        :param window: Simulation steps between checks
+        :param stall_checks: Optional; also declare a tie when core didn't change for this many checks in a row
+                             although processes didn't return to the same state; faster but not exact, warrior
+                             can still write to core later
+        """
+        self._window = window
+        self._stall_checks = stall_checks
+        self._steps = 0
+        self._states = set()
+        self._core_digest = None
+        self._unchanged_checks = 0
+
+    def is_tied(self, round_obj):
+        """
+        Called before every simulation step
+        :param round_obj: Round
+        :return: True if round can be ended with a tie
+        """
+        self._steps += 1
+        if self._steps % self._window:
+            return False
+        core_digest = self._get_core_digest(round_obj.core())
+        if self._stall_checks:
+            self._unchanged_checks = self._unchanged_checks + 1 if core_digest == self._core_digest else 0
+            if self._unchanged_checks >= self._stall_checks:
+                return True
+        self._core_digest = core_digest
+
+        state = blake2b(core_digest)
+        size = round_obj.core().size()
+        for warrior in round_obj.warriors():
+            state.update(array('q', [position % size for position in warrior.processes()]).tobytes())
+            # Separate queues, so processes moved from one warrior to another don't give the same state
+            state.update(b'|')
+        state = state.digest()
+        if state in self._states:
+            return True
+        self._states.add(state)
+        return False
+
+    @staticmethod
+    def _get_core_digest(core):
+        core_hash = blake2b()
+        for field in (core.opcodes(), core.modifiers(), core.a_modes(), core.a_values(), core.b_modes(),
+                      core.b_values()):
+            core_hash.update(field)
+        return core_hash.digest()
@@ -0,0 +1,176 @@
+import random
+from concurrent.futures import ProcessPoolExecutor
+from itertools import combinations
+
+from src.config import MAX_PROCESSES
+from src.profiler import Profiler
+from src.round import Round, RoundHooks
+from src.tie_detector import TieDetector
+from src.warrior import Warrior
+
+DEFAULT_CHUNK_SIZE = 10  # Rounds of single pairing played by worker in one task
+
+
+def play_rounds(warriors, rounds, core_size, max_cycles, max_processes, seed, batch=False, detect_ties=False,
+                stall_checks=None, profile=False):
+    """
+    Play rounds between warriors; executed in worker process
+    :param warriors: Warriors list
+    :param rounds: Number of rounds to play
+    :param core_size: Core size
+    :param max_cycles: Max cycles of single round
+    :param max_processes: Max processes of single warrior
+    :param seed: Seed from which placement seeds of rounds are drawn; see Round
+    :param batch: Play all rounds at once with BatchRound (requires numpy); results are the same
+    :param detect_ties: End looping rounds early with TieDetector; results are the same
+    :param stall_checks: Optional; passed to TieDetector, also end rounds where core doesn't change (not exact)
+    :param profile: Profile executed instructions; not supported with batch
+    :return: Tuple (list of (wins, loses, ties) tuples in warriors order, executed cycles, saved cycles, Profiler or
+             None)
+    """
+    # Rounds don't use global random, so results don't depend on which worker plays the task
+    seeds = random.Random(seed)
+    round_seeds = [seeds.randrange(2 ** 32) for _ in range(rounds)]
+    # Play on copies so results are counted once, also when executed in main process
+    players = [Warrior(warrior.instructions(), name=warrior.warrior_info().name(), start=warrior.start())
+               for warrior in warriors]
+    profiler = Profiler() if profile else None
+    if batch:
+        # Imported here because numpy is optional
+        from src.batch import BatchRound
+        batch_round = BatchRound(players, rounds, core_size=core_size, max_cycles=max_cycles,
+                                 max_processes=max_processes, seeds=round_seeds)
+        batch_round.play()
+        cycles = int(batch_round.cycles().sum())
+        saved_cycles = 0
+    else:
+        cycles = 0
+        saved_cycles = 0
+        for round_seed in round_seeds:
+            tie_detector = TieDetector(stall_checks=stall_checks) if detect_ties else None
+            round_obj = Round(players, core_size=core_size, max_cycles=max_cycles, max_processes=max_processes,
+                              seed=round_seed, hooks=RoundHooks(tie_detector=tie_detector, profiler=profiler))
+            round_obj.play()
+            cycles += round_obj.cycles()
+            saved_cycles += round_obj.saved_cycles()
+    results = [(info.wins(), info.loses(), info.ties()) for info in (player.warrior_info() for player in players)]
+    return results, cycles, saved_cycles, profiler
+
+
+class Tournament:
+    def __init__(self, warriors, rounds=100, core_size=8000, max_cycles=80000, max_processes=MAX_PROCESSES,
+                 workers=None, seed=None, chunk_size=DEFAULT_CHUNK_SIZE, batch=False, detect_ties=False,
+                 stall_checks=None, profile=False):
+        """
+        Round-robin tournament; every pair of warriors plays given number of rounds
+        :param warriors: Warriors list
+        :param rounds: Number of rounds of every pairing
+        :param core_size: Core size
+        :param max_cycles: Max cycles of single round
+        :param max_processes: Max processes of single warrior
+        :param workers: Number of worker processes; None for CPU count, 1 to play in current process
+        :param seed: Optional seed to make tournament reproducible
+        :param chunk_size: Rounds of single pairing played in one worker task
+        :param batch: Play rounds of every task at once with BatchRound (requires numpy)
+        :param detect_ties: End looping rounds early with TieDetector; not supported with batch
+        :param stall_checks: Optional; see TieDetector
+        :param profile: Profile executed instructions of all rounds; see profiler(); not supported with batch
+        """
+        if batch and detect_ties:
+            raise ValueError('Tie detection is not supported in batch mode')
+        if batch and profile:
+            raise ValueError('Profiling is not supported in batch mode')
+        self._warriors = warriors
+        self._rounds = rounds
+        self._core_size = core_size
+        self._max_cycles = max_cycles
+        self._max_processes = max_processes
+        self._workers = workers
+        self._seed = seed
+        self._chunk_size = chunk_size
+        self._batch = batch
+        self._detect_ties = detect_ties
+        self._stall_checks = stall_checks
+        self._cycles = 0
+        self._saved_cycles = 0
+        self._profiler = Profiler() if profile else None
+
+    def pairings(self):
+        """
+        :return: List of warriors indexes pairs
+        """
+        return list(combinations(range(len(self._warriors)), 2))
+
+    def _tasks(self):
+        """
+        Split pairings into tasks with rounds chunks; seeds are drawn here so results don't depend on scheduling
+        :return: List of (pairing, rounds, seed) tuples
+        """
+        seeds = random.Random(self._seed)
+        tasks = []
+        for pairing in self.pairings():
+            for played in range(0, self._rounds, self._chunk_size):
+                rounds = min(self._chunk_size, self._rounds - played)
+                tasks.append((pairing, rounds, seeds.randrange(2 ** 32)))
+        return tasks
+
+    def _task_args(self, task):
+        pairing, rounds, seed = task
+        warriors = [self._warriors[i] for i in pairing]
+        return (warriors, rounds, self._core_size, self._max_cycles, self._max_processes, seed, self._batch,
+                self._detect_ties, self._stall_checks, self._profiler is not None)
+
+    def cycles(self):
+        """
+        :return: Cycles executed in all rounds
+        """
+        return self._cycles
+
+    def saved_cycles(self):
+        """
+        :return: Cycles not executed thanks to early tie detection
+        """
+        return self._saved_cycles
+
+    def profiler(self):
+        """
+        :return: Profiler with statistics merged from all tasks; None when tournament isn't profiled
+        """
+        return self._profiler
+
+    def play(self):
+        """
+        Play all pairings and add results to warriors' WarriorInfo
+        """
+        tasks = self._tasks()
+        if self._workers == 1:
+            results = [play_rounds(*self._task_args(task)) for task in tasks]
+        else:
+            with ProcessPoolExecutor(max_workers=self._workers) as executor:
+                futures = [executor.submit(play_rounds, *self._task_args(task)) for task in tasks]
+                results = [future.result() for future in futures]
+
+        for (pairing, _, _), (pairing_results, cycles, saved_cycles, profiler) in zip(tasks, results):
+            self._cycles += cycles
+            self._saved_cycles += saved_cycles
+            if profiler:
+                # Warriors of the task are indexed in its pairing
+                self._profiler.merge(profiler, pairing)
+            for warrior_index, (wins, loses, ties) in zip(pairing, pairing_results):
+                self._warriors[warrior_index].warrior_info().add_results(wins, loses, ties)
+
+    def get_results_string(self):
+        """
+        Get string with warriors ranking after finished tournament; score is 3 points for win and 1 for tie
+        :return: Formatted string with warrior results
+        """
+        infos = sorted((warrior.warrior_info() for warrior in self._warriors), key=lambda i: i.score(), reverse=True)
+        text = f'****Won-Lost-Tied after {self._rounds} round/s per pairing****\n'
+        for place, info in enumerate(infos, start=1):
+            text += f'{place}. {info.name()}: {info.wins()}-{info.loses()}-{info.ties()} score {info.score()}\n'
+        if self._detect_ties:
+            total_cycles = self._cycles + self._saved_cycles
+            saved_percent = 100 * self._saved_cycles / total_cycles if total_cycles else 0
+            text += f'Executed {self._cycles} cycles, {self._saved_cycles} ({saved_percent:.1f}%) saved by tie ' \
+                    f'detection\n'
+        return text
@@ -0,0 +1,414 @@
+"""
+Binary battle traces; recorder streams core events of a round into a file, reader replays them without simulation
+
+File format (little endian):
+    header: TRACE_HEADER (magic, version, core size, snapshot interval, warrior count), then warrior names as
+            NAME_LENGTH and UTF-8 bytes
+    records: every record starts with varint tag = warrior index << 2 | kind, kind is EVENT_CODES index or SNAPSHOT
+        event: varint cycle delta, varint zigzag address delta; WRITE events also have the written cell as varint
+               A-value, varint B-value and CELL_CODES (opcode, modifier, A-mode, B-mode)
+        snapshot: varint cycle, varint count of cells changed since the previous snapshot (the first one since empty
+                  core) and every cell as varint address delta, varint A-value, varint B-value and CELL_CODES; then
+                  for every warrior varint process count and varint process addresses; deltas of the following
+                  events are counted from the snapshot
+    footer: INDEX_ENTRY (cycle, offset) of every snapshot, then TRACE_TRAILER (index offset, recorded cycles,
+            snapshot count, magic); written by finish(), without it the index is rebuilt by reading records
+
+Snapshot is taken before the first cycle and then every snapshot interval cycles. Snapshots store only changed cells,
+so core at any cycle is rebuilt from snapshot records up to the nearest one and written cells of at most interval
+cycles.
+"""
+import struct
+from collections import namedtuple
+
+from src.config import TRACE_SNAPSHOT_INTERVAL, TRACE_BUFFER_SIZE
+from src.core import Core
+from src.enum.event import CoreEvent
+from src.gui.colors import get_warrior_color
+from src.sinks import EventSink
+from src.warrior import Warrior
+
+TRACE_MAGIC = b'CWTR'
+TRACE_VERSION = 2
+TRACE_HEADER = struct.Struct('<4sBIIH')  # Magic, version, core size, snapshot interval, warrior count
+NAME_LENGTH = struct.Struct('<H')
+CELL_CODES = struct.Struct('<BBBB')  # Opcode, modifier, A-mode, B-mode
+INDEX_ENTRY = struct.Struct('<QQ')  # Cycle, offset of snapshot record
+TRACE_TRAILER = struct.Struct('<QQI4s')  # Index offset, recorded cycles, snapshot count, magic
+INDEX_MAGIC = b'CWTI'
+
+EVENT_CODES = (CoreEvent.READ, CoreEvent.WRITE, CoreEvent.EXECUTE)
+EVENT_KINDS = {event: kind for kind, event in enumerate(EVENT_CODES)}
+WRITE_KIND = EVENT_KINDS[CoreEvent.WRITE]
+SNAPSHOT = 3
+
+# Event read from trace; cell is (a_value, b_value, opcode, modifier, a_mode, b_mode) of WRITE events, otherwise None
+TraceEvent = namedtuple('TraceEvent', ['cycle', 'warrior', 'address', 'event', 'cell'])
+# Snapshot read from trace; cells is list of (address, cell) changed since the previous snapshot, processes is list of
+# process address lists in warriors order
+TraceSnapshot = namedtuple('TraceSnapshot', ['cycle', 'cells', 'processes'])
+
+
+def append_varint(buffer, value):
+    """
+    Append unsigned int in LEB128 encoding
+    :param buffer: bytearray
+    :param value: Non-negative int
+    """
+    while value > 0x7f:
+        buffer.append(value & 0x7f | 0x80)
+        value >>= 7
+    buffer.append(value)
+
+
+def read_varint(data, offset):
+    """
+    :param data: bytes-like object
+    :param offset: Offset of encoded int
+    :return: Tuple (value, offset after encoded int)
+    """
+    value = 0
+    shift = 0
+    while True:
+        byte = data[offset]
+        offset += 1
+        value |= (byte & 0x7f) << shift
+        if byte < 0x80:
+            return value, offset
+        shift += 7
+
+
+class TraceRecorder(EventSink):
+    def __init__(self, file_handle, snapshot_interval=TRACE_SNAPSHOT_INTERVAL):
+        """
+        Record round into binary trace; pass to Round as recorder and call finish() after the round
+        :param file_handle: File opened for binary writing
+        :param snapshot_interval: Cycles between core snapshots
+        """
+        self._file = file_handle
+        self._snapshot_interval = snapshot_interval
+        self._buffer = bytearray()
+        self._written = 0
+        self._index = []
+        self._warriors = {}
+        self._core = None
+        self._cycle = 0
+        self._last_cycle = 0
+        self._last_address = 0
+        self._started = False
+        # Addresses written since the previous snapshot
+        self._changed = set()
+
+    def wrap(self, core, execute, warriors):
+        """
+        Start trace of round; events of loaded warriors aren't recorded, they are in the first snapshot
+        :param core: Core object of the round
+        :param execute: Function (position, warrior) which executes instruction; e.g. core.execute
+        :param warriors: Warriors list of the round
+        :return: Function (position, warrior) to use instead of execute
+        """
+        self._core = core
+        self._warriors = {warrior: index for index, warrior in enumerate(warriors)}
+        self._buffer += TRACE_HEADER.pack(TRACE_MAGIC, TRACE_VERSION, core.size(), self._snapshot_interval,
+                                          len(warriors))
+        for warrior in warriors:
+            name = warrior.warrior_info().name().encode()
+            self._buffer += NAME_LENGTH.pack(len(name))
+            self._buffer += name
+
+        def recorded_execute(position, warrior):
+            if self._cycle % self._snapshot_interval == 0:
+                self._started = True
+                self._snapshot(position, warrior)
+            execute(position, warrior)
+            self._cycle += 1
+
+        return recorded_execute
+
+    def _offset(self):
+        return self._written + len(self._buffer)
+
+    def _snapshot(self, position, executing_warrior):
+        """
+        Write snapshot of state before the cycle
+        :param position: Position of instruction executed in the cycle; already removed from process queue
+        :param executing_warrior: Warrior which executes the cycle
+        """
+        self._index.append((self._cycle, self._offset()))
+        buffer = self._buffer
+        size = self._core.size()
+        if len(self._index) == 1:
+            # Loaded warriors weren't recorded as writes; the first snapshot has cells which differ from empty core
+            empty_cell = Core(size).cell(0)
+            self._changed = {address for address in range(size) if self._core.cell(address) != empty_cell}
+        append_varint(buffer, SNAPSHOT)
+        append_varint(buffer, self._cycle)
+        append_varint(buffer, len(self._changed))
+        previous = 0
+        for address in sorted(self._changed):
+            a_value, b_value, opcode, modifier, a_mode, b_mode = self._core.cell(address)
+            append_varint(buffer, address - previous)
+            append_varint(buffer, a_value)
+            append_varint(buffer, b_value)
+            buffer += CELL_CODES.pack(opcode, modifier, a_mode, b_mode)
+            previous = address
+        self._changed.clear()
+        for warrior in self._warriors:
+            processes = warrior.processes()
+            if warrior is executing_warrior:
+                processes.insert(0, position)
+            append_varint(self._buffer, len(processes))
+            for process in processes:
+                append_varint(self._buffer, process % size)
+        self._last_cycle = self._cycle
+        self._last_address = 0
+        self._flush_full_buffer()
+
+    def emit(self, address, warrior, event):
+        if not self._started:
+            return
+        kind = EVENT_KINDS[event]
+        buffer = self._buffer
+        append_varint(buffer, self._warriors[warrior] << 2 | kind)
+        append_varint(buffer, self._cycle - self._last_cycle)
+        delta = address - self._last_address
+        # Zigzag encoding keeps small negative deltas short
+        append_varint(buffer, delta << 1 if delta >= 0 else (-delta << 1) - 1)
+        self._last_cycle = self._cycle
+        self._last_address = address
+        if kind == WRITE_KIND:
+            self._changed.add(address)
+            a_value, b_value, opcode, modifier, a_mode, b_mode = self._core.cell(address)
+            append_varint(buffer, a_value)
+            append_varint(buffer, b_value)
+            buffer += CELL_CODES.pack(opcode, modifier, a_mode, b_mode)
+        self._flush_full_buffer()
+
+    def _flush_full_buffer(self):
+        if len(self._buffer) >= TRACE_BUFFER_SIZE:
+            self._flush()
+
+    def _flush(self):
+        self._file.write(self._buffer)
+        self._written += len(self._buffer)
+        self._buffer = bytearray()
+
+    def cycles(self):
+        """
+        :return: Recorded cycles
+        """
+        return self._cycle
+
+    def finish(self):
+        """
+        Write buffered records and snapshot index; file isn't closed
+        """
+        index_offset = self._offset()
+        for cycle, offset in self._index:
+            self._buffer += INDEX_ENTRY.pack(cycle, offset)
+        self._buffer += TRACE_TRAILER.pack(index_offset, self._cycle, len(self._index), INDEX_MAGIC)
+        self._flush()
+
+
+class TraceReader:
+    def __init__(self, data):
+        """
+        Read trace recorded with TraceRecorder
+        :param data: bytes-like object with whole trace; e.g. file contents or mmap
+        :raises ValueError: When data isn't a valid trace
+        """
+        self._data = memoryview(data)
+        try:
+            magic, version, self._core_size, self._snapshot_interval, warrior_count = TRACE_HEADER.unpack_from(data)
+        except struct.error:
+            raise ValueError('Truncated trace header')
+        if magic != TRACE_MAGIC or version != TRACE_VERSION:
+            raise ValueError('Invalid trace')
+        offset = TRACE_HEADER.size
+        self._names = []
+        for _ in range(warrior_count):
+            length, = NAME_LENGTH.unpack_from(data, offset)
+            offset += NAME_LENGTH.size
+            self._names.append(bytes(self._data[offset:offset + length]).decode())
+            offset += length
+        self._records_offset = offset
+        self._read_index()
+
+    @classmethod
+    def from_file(cls, path):
+        with open(path, 'rb') as file_handle:
+            return cls(file_handle.read())
+
+    def _read_index(self):
+        """
+        Read snapshot index from footer; trace which wasn't finished is indexed by reading all records
+        """
+        if len(self._data) >= TRACE_TRAILER.size:
+            index_offset, cycles, count, magic = TRACE_TRAILER.unpack_from(self._data,
+                                                                           len(self._data) - TRACE_TRAILER.size)
+            if magic == INDEX_MAGIC:
+                self._index = [INDEX_ENTRY.unpack_from(self._data, index_offset + i * INDEX_ENTRY.size)
+                               for i in range(count)]
+                self._records_end = index_offset
+                self._cycles = cycles
+                return
+        self._index = []
+        self._records_end = len(self._data)
+        self._cycles = 0
+        for offset, record in self._records(self._records_offset, complete_only=True):
+            if isinstance(record, TraceSnapshot):
+                self._index.append((record.cycle, offset))
+            self._cycles = record.cycle
+
+    def _records(self, offset, complete_only=False):
+        """
+        Decode records
+        :param offset: Offset of a snapshot record or of the first record
+        :param complete_only: Stop at truncated record instead of raising IndexError; for unfinished traces
+        :return: Generator of (record offset, TraceEvent or TraceSnapshot) tuples
+        """
+        data = self._data
+        end = self._records_end
+        cycle = 0
+        address = 0
+        warrior_count = len(self._names)
+        while offset < end:
+            record_offset = offset
+            try:
+                tag, offset = read_varint(data, offset)
+                warrior, kind = tag >> 2, tag & 3
+                if kind == SNAPSHOT:
+                    cycle, offset = read_varint(data, offset)
+                    count, offset = read_varint(data, offset)
+                    cells = []
+                    cell_address = 0
+                    for _ in range(count):
+                        address_delta, offset = read_varint(data, offset)
+                        a_value, offset = read_varint(data, offset)
+                        b_value, offset = read_varint(data, offset)
+                        cell_address += address_delta
+                        cells.append((cell_address, (a_value, b_value) + CELL_CODES.unpack_from(data, offset)))
+                        offset += CELL_CODES.size
+                    processes = []
+                    for _ in range(warrior_count):
+                        count, offset = read_varint(data, offset)
+                        queue = []
+                        for _ in range(count):
+                            position, offset = read_varint(data, offset)
+                            queue.append(position)
+                        processes.append(queue)
+                    if offset > end:
+                        raise IndexError
+                    address = 0
+                    yield record_offset, TraceSnapshot(cycle, cells, processes)
+                    continue
+                cycle_delta, offset = read_varint(data, offset)
+                address_delta, offset = read_varint(data, offset)
+                cycle += cycle_delta
+                address += address_delta >> 1 if not address_delta & 1 else -((address_delta + 1) >> 1)
+                cell = None
+                if kind == WRITE_KIND:
+                    a_value, offset = read_varint(data, offset)
+                    b_value, offset = read_varint(data, offset)
+                    if offset + CELL_CODES.size > end:
+                        raise IndexError
+                    cell = (a_value, b_value) + CELL_CODES.unpack_from(data, offset)
+                    offset += CELL_CODES.size
+            except (IndexError, struct.error):
+                if complete_only:
+                    return
+                raise ValueError('Truncated trace')
+            yield record_offset, TraceEvent(cycle, warrior, address, EVENT_CODES[kind], cell)
+
+    def core_size(self):
+        return self._core_size
+
+    def warrior_names(self):
+        return list(self._names)
+
+    def cycles(self):
+        """
+        :return: Recorded cycles
+        """
+        return self._cycles
+
+    def snapshots(self):
+        """
+        :return: List of (cycle, offset) of snapshots
+        """
+        return list(self._index)
+
+    def _snapshot_offset(self, cycle):
+        """
+        :return: Offset of the last snapshot taken before or at cycle
+        """
+        if not self._index:
+            raise ValueError('Trace has no snapshots')
+        offset = self._index[0][1]
+        for snapshot_cycle, snapshot_offset in self._index:
+            if snapshot_cycle > cycle:
+                break
+            offset = snapshot_offset
+        return offset
+
+    def events(self, start_cycle=0):
+        """
+        Read events from cycle; seeks to the nearest snapshot before it
+        :param start_cycle: First cycle
+        :return: Generator of TraceEvent
+        """
+        for _, record in self._records(self._snapshot_offset(start_cycle)):
+            if isinstance(record, TraceEvent) and record.cycle >= start_cycle:
+                yield record
+
+    def state(self, cycle):
+        """
+        Reconstruct core before cycle was executed; process queues are exact only at snapshot cycles
+        :param cycle: Cycle; cycles() for state after the last recorded cycle
+        :return: Tuple (Core, list of process address lists of warriors at the nearest snapshot)
+        """
+        offset = self._snapshot_offset(cycle)
+        core = Core(self._core_size)
+        processes = None
+        # Only snapshot records are read up to the nearest snapshot
+        for _, snapshot_offset in self._index:
+            if snapshot_offset > offset:
+                break
+            _, snapshot = next(self._records(snapshot_offset))
+            for address, cell in snapshot.cells:
+                core.set_cell(address, cell)
+            processes = snapshot.processes
+        records = self._records(offset)
+        # The nearest snapshot is already applied
+        next(records)
+        for _, record in records:
+            if isinstance(record, TraceSnapshot) or record.cycle >= cycle:
+                break
+            if record.cell:
+                core.set_cell(record.address, record.cell)
+        return core, processes
+
+    def replay(self, gui, start_cycle=0):
+        """
+        Show recorded events in gui without simulation; speed is controlled by gui (e.g. PyGameGUI speed)
+        Events before start_cycle are painted at once, without clock ticks, so replay starts from the core view of
+        start_cycle instead of an empty core.
+        :param gui: GUI object
+        :param start_cycle: First shown cycle
+        """
+        warriors = [Warrior(name=name, color=get_warrior_color(index)) for index, name in enumerate(self._names)]
+        gui.init_game_screen()
+        cycle = None
+        for _, record in self._records(self._records_offset):
+            if isinstance(record, TraceSnapshot):
+                # Process counts of info panel are updated with every snapshot
+                warriors = [Warrior(processes=queue, name=name, color=get_warrior_color(index))
+                            for index, (name, queue) in enumerate(zip(self._names, record.processes))]
+                continue
+            if record.cycle >= start_cycle and record.cycle != cycle:
+                cycle = record.cycle
+                gui.print_game_info(warriors, cycle)
+                gui.handle_events()
+                gui.clock_tick()
+            gui.set_block_color(record.address, warriors[record.warrior].color(), record.event)
+        gui.print_game_info(warriors, self._cycles)
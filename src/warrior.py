@@ -1,28 +1,61 @@
-from src.config import WARRIOR_DEFAULT_NAME
+from collections import deque
+
+from src.config import WARRIOR_DEFAULT_NAME, MAX_PROCESSES
 from src.gui.colors import Color
 
 
 class Warrior:
-    def __init__(self, instructions=None, processes=None, color=Color.WARRIOR_DEFAULT.value, name=None):
+    def __init__(self, instructions=None, processes=None, color=Color.WARRIOR_DEFAULT.value, name=None,
+                 max_processes=MAX_PROCESSES, start=0):
         """
 
         :param instructions: Warrior instruction list; Optional to simplify testing
         :param processes: Init warrior with queued processes for testing purposes
+        :param max_processes: Max number of processes in queue (ICWS MAXPROCESSES)
+        :param start: Offset of the first executed instruction (ORG/END); relative to the first instruction
         """
         self._instructions = instructions if instructions else []
-        self._processes = processes if processes else []
+        self._processes = deque(processes if processes else [])
+        self._max_processes = max_processes
         self._color = color
         self._warrior_info = WarriorInfo(name if name else WARRIOR_DEFAULT_NAME)
+        self._start = start
 
     def add_process(self, position):
         """
-        Adds process to warrior processes queue list
+        Adds process to warrior processes queue; ignored when queue is full
         :param position:int: Address in core
         """
-        self._processes.append(position)
+        if len(self._processes) < self._max_processes:
+            self._processes.append(position)
+
+    def next_process(self):
+        """
+        Remove process from the front of the queue
+        :return: Address in core of the process to execute
+        """
+        return self._processes.popleft()
+
+    def clear_processes(self):
+        self._processes.clear()
 
     def processes(self):
-        return self._processes
+        """
+        :return: Copy of queued processes list
+        """
+        return list(self._processes)
+
+    def process_count(self):
+        return len(self._processes)
+
+    def max_processes(self):
+        return self._max_processes
+
+    def set_max_processes(self, max_processes):
+        self._max_processes = max_processes
+
+    def start(self):
+        return self._start
 
     def color(self):
         return self._color
@@ -57,6 +90,17 @@ class WarriorInfo:
     def inc_loses(self):
         self._loses += 1
 
+    def add_results(self, wins, loses, ties):
+        """
+        Add results played elsewhere; for example in tournament worker process
+        """
+        self._wins += wins
+        self._loses += loses
+        self._ties += ties
+
+    def score(self):
+        return 3 * self._wins + self._ties
+
     def wins(self):
         return self._wins
 
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Benchmark of BatchRound aggregate speed depending on number of rounds played in lockstep (requires numpy)
+
+Run from project's root directory:
+    $ python -m tests.benchmarks.bench_batch [warrior warrior] [--rounds 1 10 ...] [--cycles N]
+"""
+import argparse
+import random
+import sys
+import time
+
+from src.batch import BatchRound
+from src.file import get_warrior_list
+from src.round import Round
+from src.warrior import Warrior
+
+DEFAULT_WARRIORS = ['warriors/mice.red', 'warriors/chang1.red']
+DEFAULT_ROUNDS = [1, 10, 100, 1000]
+
+
+def copy_warriors(warriors):
+    return [Warrior(warrior.instructions(), name=warrior.warrior_info().name(), start=warrior.start())
+            for warrior in warriors]
+
+
+def round_cycles_per_second(warriors, rounds, max_cycles, core_size=8000):
+    """
+    Play rounds one by one with Round
+    :return: Aggregate cycles per second
+    """
+    random.seed(0)
+    cycles = 0
+    start = time.perf_counter()
+    for _ in range(rounds):
+        round_obj = Round(copy_warriors(warriors), core_size=core_size, max_cycles=max_cycles)
+        round_obj.play()
+        cycles += round_obj.cycles()
+    return cycles / (time.perf_counter() - start)
+
+
+def batch_cycles_per_second(warriors, rounds, max_cycles, core_size=8000):
+    """
+    Play rounds in lockstep with BatchRound
+    :return: Aggregate cycles per second
+    """
+    random.seed(0)
+    start = time.perf_counter()
+    batch = BatchRound(copy_warriors(warriors), rounds, core_size=core_size, max_cycles=max_cycles)
+    batch.play()
+    return batch.cycles().sum() / (time.perf_counter() - start)
+
+
+def main(args):
+    parser = argparse.ArgumentParser()
+    parser.add_argument('warriors', nargs='*', default=DEFAULT_WARRIORS)
+    parser.add_argument('--rounds', nargs='+', type=int, default=DEFAULT_ROUNDS)
+    parser.add_argument('--cycles', type=int, default=20000)
+    args = parser.parse_args(args[1:])
+
+    warriors = get_warrior_list(args.warriors)
+    print(f'Round:      {round_cycles_per_second(warriors, 3, args.cycles):12.0f} cycles/s')
+    print(f'{"rounds":>8} {"cycles/s":>12}')
+    for rounds in args.rounds:
+        print(f'{rounds:8} {batch_cycles_per_second(warriors, rounds, args.cycles):12.0f}')
+
+
+if __name__ == '__main__':
+    main(sys.argv)
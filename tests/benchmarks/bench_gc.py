@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Benchmark of cycles per second and garbage collector pressure during round simulation
+
+Run from project's root directory:
+    $ python -m tests.benchmarks.bench_gc [warriors ...] [--cycles N] [--seed S]
+"""
+import argparse
+import gc
+import random
+import sys
+import time
+
+from src.file import get_warrior_list
+from src.round import Round
+
+DEFAULT_WARRIORS = ['warriors/mice.red', 'warriors/chang1.red']
+
+
+def measure(warriors, cycles, core_size=8000):
+    """
+    Simulate round and count garbage collections
+    :param warriors: Warriors list
+    :param cycles: Max number of cycles to execute
+    :param core_size: Core size
+    :return: Tuple (executed cycles, cycles per second, generation 0 collections)
+    """
+    round_obj = Round(warriors, core_size=core_size, max_cycles=cycles)
+    collections = gc.get_stats()[0]['collections']
+    start = time.perf_counter()
+    while not round_obj.is_ended():
+        round_obj.simulation_step()
+    elapsed = time.perf_counter() - start
+    collections = gc.get_stats()[0]['collections'] - collections
+    return round_obj.cycles(), round_obj.cycles() / elapsed, collections
+
+
+def main(args):
+    parser = argparse.ArgumentParser()
+    parser.add_argument('warriors', nargs='*', default=DEFAULT_WARRIORS)
+    parser.add_argument('--cycles', type=int, default=50000)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(args[1:])
+
+    random.seed(args.seed)
+    cycles, speed, collections = measure(get_warrior_list(args.warriors), args.cycles)
+    print(f'cycles: {cycles}')
+    print(f'cycles/s: {speed:.0f}')
+    print(f'gen0 collections: {collections} ({collections / cycles * 1000:.2f} per 1000 cycles)')
+
+
+if __name__ == '__main__':
+    main(sys.argv)
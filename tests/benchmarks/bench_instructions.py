@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark of arithmetic and compare instructions found in warrior files
+
+Run from project's root directory:
+    $ python -m tests.benchmarks.bench_instructions [warriors ...] [--repeat N]
+"""
+import argparse
+import sys
+import time
+
+from src.core import Core
+from src.file import get_warrior_list
+from src.instructions import ArithmeticInstruction, CompareAndSkipInstruction
+from src.warrior import Warrior
+
+DEFAULT_WARRIORS = ['warriors/mice.red', 'warriors/chang1.red']
+
+
+def time_instruction(warrior, offset, repeat, core_size=8000):
+    """
+    Execute single warrior instruction repeatedly
+    :param warrior: Parsed warrior
+    :param offset: Instruction offset in warrior
+    :param repeat: Number of executions
+    :param core_size: Core size
+    :return: Average execution time in microseconds
+    """
+    core = Core(core_size)
+    for address, instruction in enumerate(warrior.instructions()):
+        core[address] = instruction
+    runner = Warrior()
+    cell = core[offset]
+    start = time.perf_counter()
+    for _ in range(repeat):
+        cell.execute(core, offset, runner)
+    elapsed = time.perf_counter() - start
+    return elapsed / repeat * 1e6
+
+
+def main(args):
+    parser = argparse.ArgumentParser()
+    parser.add_argument('warriors', nargs='*', default=DEFAULT_WARRIORS)
+    parser.add_argument('--repeat', type=int, default=20000)
+    args = parser.parse_args(args[1:])
+
+    for path, warrior in zip(args.warriors, get_warrior_list(args.warriors)):
+        print(f'{path} ({warrior.warrior_info().name()})')
+        for offset, instruction in enumerate(warrior.instructions()):
+            if isinstance(instruction, (ArithmeticInstruction, CompareAndSkipInstruction)):
+                cost = time_instruction(warrior, offset, args.repeat)
+                print(f'  {offset:3} {str(instruction):24} {cost:8.3f} us/instruction')
+
+
+if __name__ == '__main__':
+    main(sys.argv)
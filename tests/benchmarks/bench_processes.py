@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+Benchmark of simulation speed depending on warrior process queue depth
+
+Run from project's root directory:
+    $ python -m tests.benchmarks.bench_processes [--depths 1 100 ...] [--cycles N]
+"""
+import argparse
+import sys
+import time
+
+from src.core import Core
+from src.instructions import JMP
+from src.round import Round
+from src.warrior import Warrior
+
+DEFAULT_DEPTHS = [1, 10, 100, 1000, 8000]
+
+
+def cycles_per_second(depth, cycles, core_size=8000):
+    """
+    Run warrior which keeps constant number of processes looping on JMP 0
+    :param depth: Number of processes in queue
+    :param cycles: Number of cycles to execute
+    :param core_size: Core size
+    :return: Executed cycles per second
+    """
+    core = Core(core_size)
+    for address in range(core_size):
+        core[address] = JMP('B', '$', 0, '$', 0)
+    warrior = Warrior(processes=[address % core_size for address in range(depth)], max_processes=depth)
+    round_obj = Round(core=core, warriors=[warrior], init_warriors=False, max_cycles=cycles)
+    start = time.perf_counter()
+    for _ in range(cycles):
+        round_obj.simulation_step()
+    return cycles / (time.perf_counter() - start)
+
+
+def main(args):
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--depths', nargs='+', type=int, default=DEFAULT_DEPTHS)
+    parser.add_argument('--cycles', type=int, default=20000)
+    args = parser.parse_args(args[1:])
+
+    print(f'{"depth":>8} {"cycles/s":>12}')
+    for depth in args.depths:
+        print(f'{depth:8} {cycles_per_second(depth, args.cycles):12.0f}')
+
+
+if __name__ == '__main__':
+    main(sys.argv)
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Benchmark checking that core creation and simulation cost grow linearly with core size and warriors count
+
+Run from project's root directory:
+    $ python -m tests.benchmarks.bench_scaling [--core-sizes 8000 55440 ...] [--warriors 2 8 ...] [--cycles N]
+"""
+import argparse
+import random
+import sys
+import time
+
+from src.core import Core
+from src.file import get_warrior_files, get_warrior_list
+from src.round import Round
+
+DEFAULT_CORE_SIZES = [8000, 55440, 800000]
+DEFAULT_WARRIOR_COUNTS = [2, 8, 32]
+
+
+def time_core_creation(core_size):
+    """
+    :return: Core creation time in milliseconds
+    """
+    start = time.perf_counter()
+    Core(core_size)
+    return (time.perf_counter() - start) * 1e3
+
+
+def time_round(warrior_count, core_size, cycles):
+    """
+    Create round with warrior_count warriors randomly selected from default directory and simulate it
+    :return: Tuple (round creation time in milliseconds, microseconds per cycle)
+    """
+    paths = [random.choice(get_warrior_files()) for _ in range(warrior_count)]
+    warriors = get_warrior_list(paths)
+    start = time.perf_counter()
+    round_obj = Round(warriors, core_size=core_size, max_cycles=cycles)
+    created = time.perf_counter()
+    while not round_obj.is_ended():
+        round_obj.simulation_step()
+    end = time.perf_counter()
+    return (created - start) * 1e3, (end - created) / max(1, round_obj.cycles()) * 1e6
+
+
+def main(args):
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--core-sizes', nargs='+', type=int, default=DEFAULT_CORE_SIZES)
+    parser.add_argument('--warriors', nargs='+', type=int, default=DEFAULT_WARRIOR_COUNTS)
+    parser.add_argument('--cycles', type=int, default=20000)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(args[1:])
+    random.seed(args.seed)
+
+    print(f'{"core size":>10} {"core ms":>9} {"ms/cell*1e3":>12}')
+    for core_size in args.core_sizes:
+        elapsed = time_core_creation(core_size)
+        print(f'{core_size:10} {elapsed:9.2f} {elapsed / core_size * 1e3:12.4f}')
+
+    print()
+    print(f'{"core size":>10} {"warriors":>9} {"round ms":>9} {"us/cycle":>9}')
+    for core_size in args.core_sizes:
+        for warrior_count in args.warriors:
+            created, per_cycle = time_round(warrior_count, core_size, args.cycles)
+            print(f'{core_size:10} {warrior_count:9} {created:9.2f} {per_cycle:9.3f}')
+
+
+if __name__ == '__main__':
+    main(sys.argv)
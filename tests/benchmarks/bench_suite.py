@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite with reproducible JSON baseline
+
+Plays fixed-seed battles between every pair of bundled warriors for several core sizes and process queue depths
+(max processes of a warrior), measures cost of every opcode and address mode and peak memory of a battle.
+
+Run from project's root directory:
+    $ python -m tests.benchmarks.bench_suite [--output results.json] [--baseline tests/benchmarks/baseline.json]
+
+With --baseline results are compared with earlier run; exit code is 1 when any number is worse than --tolerance.
+"""
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+import tracemalloc
+from itertools import combinations
+
+from src.core import Core, OPCODES
+from src.enum.mode import Mode
+from src.instructions import NOP
+from src.file import get_warrior_files, get_warrior_list
+from src.round import Round
+from src.warrior import Warrior
+
+DEFAULT_CORE_SIZES = [8000, 55440]
+DEFAULT_DEPTHS = [64, 8000]
+DEFAULT_SEED = 0
+DEFAULT_CYCLES = 20000
+DEFAULT_REPEAT = 20000
+DEFAULT_TOLERANCE = 0.2
+DEFAULT_RUNS = 3  # Best of runs is reported to reduce noise
+
+
+def play_battle(warriors, core_size, max_cycles, max_processes, seed):
+    """
+    Play single round on warrior copies
+    :return: Tuple (executed cycles, elapsed seconds)
+    """
+    random.seed(seed)
+    players = [Warrior(warrior.instructions(), name=warrior.warrior_info().name(), start=warrior.start())
+               for warrior in warriors]
+    round_obj = Round(players, core_size=core_size, max_cycles=max_cycles, max_processes=max_processes)
+    start = time.perf_counter()
+    round_obj.play()
+    return round_obj.cycles(), time.perf_counter() - start
+
+
+def bench_battles(warriors, core_sizes, depths, max_cycles, seed, runs=DEFAULT_RUNS):
+    """
+    Play every pairing for every core size and queue depth
+    :return: Tuple (list of battle results, list of summaries with cycles/s of all battles together)
+    """
+    battles = []
+    summary = []
+    for core_size in core_sizes:
+        for depth in depths:
+            total_cycles = 0
+            total_time = 0
+            for pairing in combinations(warriors, 2):
+                # Same seed gives the same battle, so only time differs between runs
+                cycles, elapsed = min((play_battle(pairing, core_size, max_cycles, depth, seed) for _ in range(runs)),
+                                      key=lambda result: result[1])
+                total_cycles += cycles
+                total_time += elapsed
+                battles.append({
+                    'warriors': [warrior.warrior_info().name() for warrior in pairing],
+                    'core_size': core_size,
+                    'max_processes': depth,
+                    'cycles': cycles,
+                    'cycles_per_second': cycles / elapsed,
+                })
+            summary.append({
+                'core_size': core_size,
+                'max_processes': depth,
+                'cycles': total_cycles,
+                'cycles_per_second': total_cycles / total_time,
+            })
+    return battles, summary
+
+
+def bench_opcode(instruction_class, repeat, core_size=8000):
+    """
+    Execute opcode on consecutive core addresses filled with the same instruction
+    :return: Average execution time in microseconds
+    """
+    core = Core(core_size)
+    for address in range(core_size):
+        core[address] = instruction_class('F', '$', 1, '$', 2)
+    warrior = Warrior(max_processes=repeat)
+    start = time.perf_counter()
+    for address in range(repeat):
+        core.execute(address, warrior)
+    return (time.perf_counter() - start) / repeat * 1e6
+
+
+def bench_opcodes(repeat, runs=DEFAULT_RUNS):
+    return {instruction_class.__name__: min(bench_opcode(instruction_class, repeat) for _ in range(runs))
+            for instruction_class in OPCODES}
+
+
+def bench_mode(mode, repeat, core_size=8000):
+    """
+    Execute NOP with both operands in the same address mode; NOP doesn't copy operands, so it is resolution cost
+    :return: Average execution time in microseconds
+    """
+    core = Core(core_size)
+    for address in range(core_size):
+        core[address] = NOP('F', mode.value, 1, mode.value, 2)
+    warrior = Warrior(max_processes=repeat)
+    start = time.perf_counter()
+    for address in range(repeat):
+        core.execute(address, warrior)
+    return (time.perf_counter() - start) / repeat * 1e6
+
+
+def bench_modes(repeat, runs=DEFAULT_RUNS):
+    return {mode.name: min(bench_mode(mode, repeat) for _ in range(runs)) for mode in Mode}
+
+
+def bench_memory(warriors, core_sizes, max_cycles, seed):
+    """
+    Peak memory allocated during first battle for every core size
+    :return: Dict core size -> bytes
+    """
+    peak_memory = {}
+    for core_size in core_sizes:
+        tracemalloc.start()
+        play_battle(warriors[:2], core_size, max_cycles, DEFAULT_DEPTHS[-1], seed)
+        peak_memory[str(core_size)] = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return peak_memory
+
+
+def run(warrior_files, core_sizes, depths, max_cycles, repeat, seed, runs=DEFAULT_RUNS):
+    """
+    Run all benchmarks
+    :return: Results dict ready to be saved as JSON
+    """
+    warriors = get_warrior_list(warrior_files)
+    battles, summary = bench_battles(warriors, core_sizes, depths, max_cycles, seed, runs)
+    return {
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'seed': seed,
+        'max_cycles': max_cycles,
+        'summary': summary,
+        'battles': battles,
+        'opcodes': bench_opcodes(repeat, runs),
+        'modes': bench_modes(repeat, runs),
+        'peak_memory': bench_memory(warriors, core_sizes, max_cycles, seed),
+    }
+
+
+def compare(results, baseline, tolerance):
+    """
+    Compare results with baseline
+    :param tolerance: Allowed relative slowdown, e.g. 0.2 for 20%
+    :return: List of (name, baseline value, current value, ratio, is regression) tuples
+    """
+    rows = []
+    baseline_summary = {(item['core_size'], item['max_processes']): item for item in baseline['summary']}
+    for item in results['summary']:
+        key = (item['core_size'], item['max_processes'])
+        if key in baseline_summary:
+            old = baseline_summary[key]['cycles_per_second']
+            ratio = item['cycles_per_second'] / old
+            rows.append((f'cycles/s core={key[0]} depth={key[1]}', old, item['cycles_per_second'], ratio,
+                         ratio < 1 - tolerance))
+    for name, cost in results['opcodes'].items():
+        if name in baseline['opcodes']:
+            old = baseline['opcodes'][name]
+            ratio = cost / old
+            rows.append((f'us/{name}', old, cost, ratio, ratio > 1 + tolerance))
+    for name, cost in results['modes'].items():
+        if name in baseline.get('modes', {}):
+            old = baseline['modes'][name]
+            ratio = cost / old
+            rows.append((f'us/mode {name}', old, cost, ratio, ratio > 1 + tolerance))
+    for core_size, peak in results['peak_memory'].items():
+        if core_size in baseline['peak_memory']:
+            old = baseline['peak_memory'][core_size]
+            ratio = peak / old
+            rows.append((f'peak bytes core={core_size}', old, peak, ratio, ratio > 1 + tolerance))
+    return rows
+
+
+def print_results(results):
+    print(f'{"core size":>10} {"depth":>6} {"cycles":>9} {"cycles/s":>10}')
+    for item in results['summary']:
+        print(f'{item["core_size"]:10} {item["max_processes"]:6} {item["cycles"]:9} {item["cycles_per_second"]:10.0f}')
+    print()
+    for name, cost in results['opcodes'].items():
+        print(f'{name:>6} {cost:8.3f} us/instruction')
+    print()
+    direct = results['modes'][Mode.DIRECT.name]
+    for name, cost in results['modes'].items():
+        # Cost of both operands over direct addressing
+        print(f'{name:>19} {cost:8.3f} us/instruction {cost - direct:+8.3f} us over DIRECT')
+    print()
+    for core_size, peak in results['peak_memory'].items():
+        print(f'core size {core_size:>8}: peak {peak / 1024:10.1f} KiB')
+
+
+def main(args):
+    parser = argparse.ArgumentParser()
+    parser.add_argument('warriors', nargs='*', default=sorted(get_warrior_files()))
+    parser.add_argument('--core-sizes', nargs='+', type=int, default=DEFAULT_CORE_SIZES)
+    parser.add_argument('--depths', nargs='+', type=int, default=DEFAULT_DEPTHS)
+    parser.add_argument('--cycles', type=int, default=DEFAULT_CYCLES)
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT)
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED)
+    parser.add_argument('--runs', type=int, default=DEFAULT_RUNS)
+    parser.add_argument('--output', help='Save results as JSON')
+    parser.add_argument('--baseline', help='Compare results with JSON saved earlier')
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE)
+    args = parser.parse_args(args[1:])
+
+    results = run(args.warriors, args.core_sizes, args.depths, args.cycles, args.repeat, args.seed, args.runs)
+    print_results(results)
+    if args.output:
+        with open(args.output, 'w') as file_handle:
+            json.dump(results, file_handle, indent=2)
+    if args.baseline:
+        with open(args.baseline, 'r') as file_handle:
+            baseline = json.load(file_handle)
+        rows = compare(results, baseline, args.tolerance)
+        print()
+        for name, old, new, ratio, regression in rows:
+            print(f'{name:32} {old:14.3f} {new:14.3f} {ratio:6.2f}{"  REGRESSION" if regression else ""}')
+        if any(row[-1] for row in rows):
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv))
@@ -0,0 +1,94 @@
+import random
+
+import pytest
+
+from src.core import OPCODES
+from src.enum.mode import Mode
+from src.enum.modifier import Modifier
+from src.file import get_warrior_list
+from src.instructions import DIV, MOV, DAT
+from src.round import Round
+from src.tournament import Tournament
+from src.warrior import Warrior
+
+pytest.importorskip('numpy')
+
+from src.batch import BatchRound  # noqa: E402
+
+
+def copy_warriors(warriors):
+    return [Warrior(warrior.instructions(), name=warrior.warrior_info().name(), start=warrior.start())
+            for warrior in warriors]
+
+
+def core_fields(core):
+    return tuple(list(field) for field in (core.opcodes(), core.modifiers(), core.a_modes(), core.a_values(),
+                                           core.b_modes(), core.b_values()))
+
+
+def assert_same_as_round(warriors, rounds, seed, **kwargs):
+    random.seed(seed)
+    batch = BatchRound(copy_warriors(warriors), rounds, **kwargs)
+    batch.play()
+    random.seed(seed)
+    for lane in range(rounds):
+        round_obj = Round(copy_warriors(warriors), **kwargs)
+        round_obj.play()
+        assert core_fields(round_obj.core()) == batch.core_fields(lane)
+        assert round_obj.cycles() == batch.cycles()[lane]
+
+
+def test_batch_same_as_round():
+    warriors = get_warrior_list(['warriors/mice.red', 'warriors/chang1.red', 'warriors/sharpnel.red'])
+    assert_same_as_round(warriors, 4, 1, core_size=800, max_cycles=4000, max_processes=64)
+
+
+def test_batch_same_as_round_random_instructions():
+    rng = random.Random(0)
+    for seed in range(20):
+        warriors = [Warrior([opcode.from_fields(rng.choice(list(Modifier)), rng.choice(list(Mode)), rng.randint(-9, 9),
+                                                rng.choice(list(Mode)), rng.randint(-9, 9))
+                             for opcode in rng.sample(OPCODES, 6)]) for _ in range(2)]
+        assert_same_as_round(warriors, 3, seed, core_size=100, max_cycles=300, max_processes=8)
+
+
+def test_batch_seeds_same_as_round_seeds():
+    warriors = get_warrior_list(['warriors/imp.red', 'warriors/chang1.red'])
+    seeds = [11, 12, 13]
+    batch = BatchRound(copy_warriors(warriors), len(seeds), core_size=800, max_cycles=2000, seeds=seeds)
+    batch.play()
+    for lane, seed in enumerate(seeds):
+        round_obj = Round(copy_warriors(warriors), core_size=800, max_cycles=2000, seed=seed)
+        round_obj.play()
+        assert batch.records()[lane] == round_obj.record()
+        assert core_fields(round_obj.core()) == batch.core_fields(lane)
+
+
+def test_batch_division_by_zero_kills_process():
+    divider = Warrior([DIV("A", "#", 0, "$", 1)])
+    runner = Warrior([MOV("I", "$", 0, "$", 1)])
+    batch = BatchRound([divider, runner], 5, core_size=200)
+    batch.play()
+    assert divider.warrior_info().loses() == 5
+    assert runner.warrior_info().wins() == 5
+
+
+def test_batch_results_counted():
+    bomb = Warrior([DAT("F", "#", 0, "#", 0)])
+    imp = Warrior([MOV("I", "$", 0, "$", 1)])
+    batch = BatchRound([bomb, imp], 10, core_size=200)
+    batch.play()
+    assert batch.results() == [(0, 10, 0), (10, 0, 0)]
+    # Both warriors execute in the first step
+    assert list(batch.cycles()) == [2] * 10
+
+
+def test_tournament_batch_same_as_serial():
+    warriors = get_warrior_list(['warriors/imp.red', 'warriors/mice.red', 'warriors/chang1.red'])
+    serial = copy_warriors(warriors)
+    Tournament(serial, rounds=4, core_size=800, max_cycles=2000, workers=1, seed=3, chunk_size=2).play()
+    batch = copy_warriors(warriors)
+    Tournament(batch, rounds=4, core_size=800, max_cycles=2000, workers=1, seed=3, chunk_size=2, batch=True).play()
+    results = [[(w.warrior_info().wins(), w.warrior_info().loses(), w.warrior_info().ties()) for w in players]
+               for players in (serial, batch)]
+    assert results[0] == results[1]
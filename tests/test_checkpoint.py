@@ -0,0 +1,144 @@
+import pytest
+
+from src.checkpoint import Checkpoint, SLOT_HEADER
+from src.game import Game
+from src.gui.gui import MockGUI, SimulationAbortedException
+from src.instructions import MOV, ADD, JMP, DAT, SPL
+from src.round import Round, RoundHooks
+from src.warrior import Warrior
+
+
+def get_warriors():
+    imp = Warrior([MOV("I", "$", 0, "$", 1)], name="Imp")
+    dwarf = Warrior([ADD("AB", "#", 4, "$", 3), MOV("I", "$", 2, "@", 2), JMP("B", "$", -2, "$", 0),
+                     DAT("F", "#", 0, "#", 0)], name="Dwarf")
+    splitter = Warrior([SPL("B", "$", 0, "$", 0), MOV("I", "$", 0, "$", 1)], name="Splitter")
+    return [imp, dwarf, splitter]
+
+
+def create_checkpoint(path, warriors, interval=100):
+    checkpoint = Checkpoint(str(path), interval)
+    checkpoint.create(warriors, core_size=400, max_cycles=1000, max_processes=64)
+    return checkpoint
+
+
+def results(warriors):
+    return [(warrior.warrior_info().wins(), warrior.warrior_info().loses(), warrior.warrior_info().ties())
+            for warrior in warriors]
+
+
+def test_restored_round_continues(tmp_path):
+    expected = Round(get_warriors(), core_size=400, max_cycles=1000, max_processes=64, seed=5)
+    expected.play()
+    warriors = get_warriors()
+    checkpoint = create_checkpoint(tmp_path / 'round.ckpt', warriors)
+    round_obj = Round(warriors, core_size=400, max_cycles=350, max_processes=64, seed=5,
+                      hooks=RoundHooks(checkpoint=checkpoint))
+    round_obj.play()
+    checkpoint.close()
+    restored = Checkpoint.open(str(tmp_path / 'round.ckpt')).restore()
+    assert restored.cycles() == 300
+    # Interrupted round ended at 350 cycles; checkpoint continues up to max cycles saved in create()
+    restored.play()
+    assert restored.cycles() == expected.cycles()
+    assert restored.core().to_bytes() == expected.core().to_bytes()
+    assert [warrior.process_count() for warrior in restored.warriors()] == \
+           [warrior.process_count() for warrior in expected.warriors()]
+
+
+def test_interrupted_save_keeps_previous_slot(tmp_path):
+    warriors = get_warriors()
+    checkpoint = create_checkpoint(tmp_path / 'round.ckpt', warriors)
+    round_obj = Round(warriors, core_size=400, max_cycles=650, max_processes=64, seed=5,
+                      hooks=RoundHooks(checkpoint=checkpoint))
+    round_obj.play()
+    # Slot of the latest checkpoint is invalidated as if process was killed while writing it
+    SLOT_HEADER.pack_into(checkpoint._map, checkpoint._slot_offset(checkpoint._sequence % 2), 0, 0, 0)
+    checkpoint.close()
+    reopened = Checkpoint.open(str(tmp_path / 'round.ckpt'))
+    assert reopened.has_round()
+    assert reopened.restore().cycles() == 300
+    reopened.remove()
+    assert not (tmp_path / 'round.ckpt').exists()
+
+
+def test_invalid_checkpoint(tmp_path):
+    path = tmp_path / 'invalid.ckpt'
+    path.write_bytes(b'')
+    with pytest.raises(ValueError):
+        Checkpoint.open(str(path))
+    path.write_bytes(b'CWAR' + b'\0' * 64)
+    with pytest.raises(ValueError):
+        Checkpoint.open(str(path))
+    checkpoint = create_checkpoint(path, get_warriors())
+    checkpoint.close()
+    with pytest.raises(ValueError):
+        Checkpoint.open(str(path)).restore()
+    with open(path, 'ab') as file_handle:
+        file_handle.write(b'\0')
+    with pytest.raises(ValueError):
+        Checkpoint.open(str(path))
+
+
+def test_checkpoint_negative_seed(tmp_path):
+    checkpoint = Checkpoint(str(tmp_path / 'game.ckpt'))
+    checkpoint.create(get_warriors(), core_size=400, max_cycles=1000, max_processes=64, seed=-1)
+    checkpoint.close()
+    assert Checkpoint.open(str(tmp_path / 'game.ckpt')).settings()['seed'] == -1
+
+
+def test_resumed_game_has_same_results(tmp_path):
+    expected = Game(get_warriors(), core_size=400, rounds=3, max_cycles=1000, max_processes=64, seed=2)
+    expected.play()
+
+    class Interrupt(Exception):
+        pass
+
+    class InterruptedCheckpoint(Checkpoint):
+        def save(self, round_obj):
+            super().save(round_obj)
+            if round_obj.number() == 2:
+                raise Interrupt()
+
+    checkpoint = InterruptedCheckpoint(str(tmp_path / 'game.ckpt'), interval=200)
+    game = Game(get_warriors(), core_size=400, rounds=3, max_cycles=1000, max_processes=64, seed=2,
+                checkpoint=checkpoint)
+    with pytest.raises(Interrupt):
+        game.play()
+    checkpoint.close()
+    resumed = Game.resume(Checkpoint.open(str(tmp_path / 'game.ckpt')))
+    assert [warrior.warrior_info().name() for warrior in resumed._warriors] == ["Imp", "Dwarf", "Splitter"]
+    resumed.play()
+    assert results(resumed._warriors) == results(expected._warriors)
+
+
+def test_aborted_game_saved_and_resumed(tmp_path):
+    expected = Game(get_warriors(), core_size=400, rounds=3, max_cycles=1000, max_processes=64, seed=2)
+    expected.play()
+
+    class ClosedGUI(MockGUI):
+        def __init__(self, core_size, steps):
+            super().__init__(core_size)
+            self._steps = steps
+
+        def handle_events(self):
+            # Window is closed in the middle of the second round
+            self._steps -= 1
+            if not self._steps:
+                raise SimulationAbortedException()
+
+    # Round has 334 simulation steps; round is saved when window is closed, between checkpoints
+    checkpoint = Checkpoint(str(tmp_path / 'game.ckpt'), interval=100)
+    game = Game(get_warriors(), core_size=400, gui=ClosedGUI(400, 500), rounds=3, max_cycles=1000, max_processes=64,
+                seed=2, checkpoint=checkpoint)
+    game.play()
+    assert game.is_aborted()
+    assert game.played_rounds() == 1
+    checkpoint.close()
+    reopened = Checkpoint.open(str(tmp_path / 'game.ckpt'))
+    # Three warriors execute three cycles in every step
+    assert reopened.restore().cycles() == 3 * (500 - 334)
+    resumed = Game.resume(reopened)
+    resumed.play()
+    assert not resumed.is_aborted()
+    assert results(resumed._warriors) == results(expected._warriors)
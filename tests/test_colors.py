@@ -0,0 +1,11 @@
+from src.gui.colors import Color, get_warrior_color
+
+
+def test_first_colors_from_palette():
+    assert [get_warrior_color(i) for i in range(5)] == Color.WARRIOR_COLORS.value
+
+
+def test_generated_colors_distinct():
+    colors = [get_warrior_color(i) for i in range(64)]
+    assert len(set(colors)) == 64
+    assert all(0 <= channel <= 255 for color in colors for channel in color)
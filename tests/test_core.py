@@ -1,5 +1,10 @@
-from src.core import Core
-from src.instructions import DAT, ADD
+import pytest
+
+from src.core import Core, fold
+from src.enum.event import CoreEvent
+from src.instructions import DAT, ADD, MOV, DJN
+from src.sinks import RecordingSink
+from src.warrior import Warrior
 
 
 def test_get_cycled_value_begin():
@@ -16,3 +21,108 @@ def test_get_cycled_value_end():
     instruction_3 = DAT('F', '$', 1, '$', -5)
     core = Core(data=[instruction_1, instruction_2, instruction_3])
     assert core[5] == instruction_3
+
+
+def test_prepare_core_filled_with_dat():
+    core = Core(size=10)
+    assert core[3] == DAT('F', '$', 0, '$', 0)
+    assert len(core.opcodes()) == 10
+
+
+def test_set_item_encodes_instruction():
+    core = Core(size=10)
+    instruction = ADD('AB', '#', '3', '@', '-2')
+    core[12] = instruction
+    assert core[2] == instruction
+    assert str(core[2]) == 'ADD.AB #3, @8'
+
+
+def test_cell_writes_through_to_core():
+    core = Core(size=10)
+    core[4].set_b_value(7)
+    assert core.b_values()[4] == 7
+    assert core[4].b_value() == 7
+
+
+def test_instruction_is_independent_copy():
+    core = Core(size=10)
+    instruction = core.instruction(1)
+    instruction.set_a_value(5)
+    assert core[1].a_value() == 0
+
+
+def test_cell_copy_and_set_cell():
+    core = Core(size=10)
+    core[1] = ADD('AB', '#', '3', '@', '-2')
+    cell = core.cell(1)
+    core.set_cell(5, cell)
+    core[1].set_a_value(4)
+    assert core[5] == ADD('AB', '#', '3', '@', '-2')
+    assert core.values(1) == (4, -2 % 10)
+
+
+def test_values_normalized_on_write():
+    core = Core(size=10)
+    core[0] = DAT('F', '$', -1, '$', 25)
+    assert core.values(0) == (9, 5)
+    core.set_fields(1, -12, 10)
+    core[2].set_a_value(-3)
+    assert core.values(1) == (8, 0)
+    assert core.a_value(2) == 7
+
+
+def test_fold():
+    assert fold(3, 4, 8) == 3 - 4 + 8
+    assert fold(2, 4, 8) == 2
+    assert fold(7, 4, 8) == 7
+    assert fold(5, 8, 8) == 5
+
+
+def test_invalid_limits():
+    with pytest.raises(ValueError):
+        Core(size=10, read_limit=3)
+
+
+def test_write_limit_folds_target():
+    core = Core(size=8, write_limit=4)
+    core[0] = MOV('I', '$', 0, '$', 3)
+    core.execute(0, Warrior())
+    assert core[3] == DAT('F', '$', 0, '$', 0)
+    assert core[7] == MOV('I', '$', 0, '$', 3)
+
+
+def test_read_limit_folds_source():
+    core = Core(size=8, read_limit=4)
+    core[0] = MOV('AB', '$', 3, '$', 1)
+    core[7] = DAT('F', '$', 5, '$', 0)
+    core.execute(0, Warrior())
+    assert core[1].b_value() == 5
+
+
+def test_djn_decrements_write_folded_target():
+    sink = RecordingSink()
+    core = Core(size=8, write_limit=4, sink=sink)
+    core[0] = DJN('A', '$', 3, '$', 0)
+    core[3] = DAT('F', '$', 5, '$', 0)
+    core[7] = DAT('F', '$', 2, '$', 0)
+    warrior = Warrior()
+    core.execute(0, warrior)
+    # A pointer 3 is folded to -1 for the write, jump target uses read limit (core size)
+    assert core[7].a_value() == 1
+    assert core[3].a_value() == 5
+    assert warrior.next_process() == 3
+    assert (7, warrior, CoreEvent.WRITE) in sink.events()
+
+
+def test_core_bytes_round_trip():
+    core = Core(data=[MOV('I', '$', 0, '$', 1), ADD('AB', '#', 4, '$', -3), DAT('F', '$', 0, '$', 0)])
+    data = core.to_bytes()
+    assert len(data) == core.bytes_size()
+    restored = Core(size=3)
+    restored.load_bytes(data)
+    assert restored[1] == ADD('AB', '#', 4, '$', -3)
+    warrior = Warrior(processes=[])
+    restored.execute(0, warrior)
+    assert restored[1] == MOV('I', '$', 0, '$', 1)
+    with pytest.raises(ValueError):
+        Core(size=4).load_bytes(data)
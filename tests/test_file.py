@@ -0,0 +1,78 @@
+import os
+
+import pytest
+
+from src.file import load_warrior, warrior_to_bytes, warrior_from_bytes, get_warrior_list
+
+IMP = ";name Imp\nMOV.I $0, $1\n"
+DWARF = ";name Dwarf\nADD.AB #4, 3\nMOV.I 2, @2\nJMP -2\nDAT #0, #0\n"
+
+
+def write_warrior(directory, source, name='warrior.red'):
+    path = directory / name
+    path.write_text(source)
+    return str(path)
+
+
+def cache_files(directory):
+    return [name for name in os.listdir(directory) if name.endswith('.bin')]
+
+
+def test_warrior_bytes_round_trip(tmp_path):
+    warrior = load_warrior(write_warrior(tmp_path, DWARF))
+    loaded = warrior_from_bytes(warrior_to_bytes(warrior))
+    assert loaded.instructions() == warrior.instructions()
+    assert loaded.warrior_info().name() == "Dwarf"
+
+
+def test_invalid_cache_bytes():
+    data = warrior_to_bytes(load_warrior('warriors/imp.red'))
+    with pytest.raises(ValueError):
+        warrior_from_bytes(data[:-1])
+    with pytest.raises(ValueError):
+        warrior_from_bytes(b'XXXX' + data[4:])
+    with pytest.raises(ValueError):
+        warrior_from_bytes(b'')
+
+
+def test_cached_warrior_same_as_parsed(tmp_path):
+    path = write_warrior(tmp_path, DWARF)
+    cache_directory = str(tmp_path / 'cache')
+    parsed = load_warrior(path)
+    first = load_warrior(path, cache_directory)
+    assert len(cache_files(cache_directory)) == 1
+    cached = load_warrior(path, cache_directory)
+    assert first.instructions() == cached.instructions() == parsed.instructions()
+
+
+def test_cache_invalidated_on_change(tmp_path):
+    path = write_warrior(tmp_path, DWARF)
+    cache_directory = str(tmp_path / 'cache')
+    load_warrior(path, cache_directory)
+    write_warrior(tmp_path, IMP)
+    warrior = load_warrior(path, cache_directory)
+    assert warrior.warrior_info().name() == "Imp"
+    assert len(cache_files(cache_directory)) == 2
+
+
+def test_broken_cache_file_parsed_again(tmp_path):
+    path = write_warrior(tmp_path, IMP)
+    cache_directory = tmp_path / 'cache'
+    load_warrior(path, str(cache_directory))
+    cache_file = cache_directory / cache_files(cache_directory)[0]
+    cache_file.write_bytes(b'broken')
+    warrior = get_warrior_list([path], str(cache_directory))[0]
+    assert warrior.warrior_info().name() == "Imp"
+    assert warrior_from_bytes(cache_file.read_bytes()).warrior_info().name() == "Imp"
+
+
+def test_cache_keeps_start_and_core_size(tmp_path):
+    path = write_warrior(tmp_path, "ORG start\nDAT #0, #CORESIZE\nstart JMP -1\n")
+    cache_directory = str(tmp_path / 'cache')
+    small = load_warrior(path, cache_directory, core_size=800)
+    large = load_warrior(path, cache_directory, core_size=8000)
+    assert len(cache_files(cache_directory)) == 2
+    cached = load_warrior(path, cache_directory, core_size=800)
+    assert cached.start() == small.start() == 1
+    assert cached.instructions()[0].b_value() == small.instructions()[0].b_value() == 800
+    assert large.instructions()[0].b_value() == 8000
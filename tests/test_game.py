@@ -1,5 +1,5 @@
 from src.game import Game
-from src.instructions import MOV
+from src.instructions import MOV, DAT
 from src.warrior import Warrior
 
 
@@ -15,3 +15,40 @@ def test_game_results():
     warrior_b = Warrior([MOV("I", "#", 1, "}", 0)])
     game = Game([warrior_a, warrior_b], max_cycles=20)
     game.get_results_string()
+
+
+def test_seeded_game_replay():
+    warriors = [Warrior([MOV("I", "$", 0, "$", 1)], name="Imp"), Warrior([MOV("I", "#", 1, "}", 0)], name="Runner")]
+    game = Game(warriors, core_size=200, rounds=3, max_cycles=100, seed=2)
+    game.play()
+    other = Game(warriors, core_size=200, rounds=3, max_cycles=100, seed=2)
+    assert [record.seed for record in game.records()] == other.round_seeds()
+    assert other.round_record(2) == game.records()[1]
+    replayed = game.replay_round(game.records()[1], 2)
+    assert replayed.record() == game.records()[1]
+    assert warriors[0].warrior_info().ties() + warriors[0].warrior_info().wins() + \
+        warriors[0].warrior_info().loses() == 3
+
+
+def test_game_cycle_limit():
+    warriors = [Warrior([MOV("I", "$", 0, "$", 1)], name="Imp"), Warrior([MOV("I", "#", 1, "}", 0)], name="Runner")]
+    # Two imps never die, so every round takes max cycles
+    game = Game(warriors, core_size=200, rounds=3, max_cycles=100, seed=2, cycle_limit=250)
+    game.play()
+    assert game.is_timed_out()
+    assert len(game.records()) == 2
+    assert game.cycles() == 250
+    assert [warrior.warrior_info().ties() for warrior in warriors] == [2, 2]
+    assert game.played_rounds() == 2
+    assert game.get_results_string().startswith('****Won-Lost-Tied after 2 round/s****')
+
+
+def test_game_cycle_limit_ignores_unfinished_round():
+    bomb = Warrior([DAT("F", "#", 0, "#", 0)], name="Bomb")
+    warriors = [Warrior([MOV("I", "$", 0, "$", 1)], name="Imp"), Warrior([MOV("I", "$", 0, "$", 1)], name="Imp"), bomb]
+    # Bomb dies in the first cycle, but the round is stopped before it ends
+    game = Game(warriors, core_size=200, rounds=1, max_cycles=100, seed=2, cycle_limit=10)
+    game.play()
+    assert game.is_timed_out()
+    assert game.played_rounds() == 0
+    assert bomb.warrior_info().loses() == 0
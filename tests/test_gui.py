@@ -0,0 +1,96 @@
+import os
+
+import pygame
+import pytest
+
+os.environ['SDL_VIDEODRIVER'] = 'dummy'
+
+from src.enum.event import CoreEvent
+from src.config import BLOCK_SIZE, MAX_CORE_SIZE
+from src.gui.colors import get_warrior_color
+from src.gui.gui import PyGameGUI, divide_blocks, SimulationAbortedException
+from src.warrior import Warrior
+
+
+@pytest.fixture
+def gui():
+    gui = PyGameGUI(1200, 800, 200, speed=0)
+    gui.init_game_screen()
+    yield gui
+    gui.close()
+
+
+def test_block_events_collected_until_render(gui):
+    gui.set_block_color(5, (255, 0, 0), CoreEvent.READ)
+    gui.set_block_color(5, (255, 0, 0), CoreEvent.WRITE)
+    gui.set_block_color(6, (255, 0, 0), CoreEvent.EXECUTE)
+    assert gui._dirty_blocks == {5: ((255, 0, 0), CoreEvent.WRITE), 6: ((255, 0, 0), CoreEvent.EXECUTE)}
+    gui.render()
+    assert not gui._dirty_blocks
+
+
+def test_game_info_rendered_once_per_frame(gui):
+    warriors = [Warrior(processes=[1])]
+    gui.print_game_info(warriors, 1)
+    gui.set_block_color(1, (255, 0, 0), CoreEvent.EXECUTE)
+    gui.print_game_info(warriors, 2)
+    # Second call is in the same frame so block is still waiting for next frame
+    assert 1 in gui._dirty_blocks
+
+
+def test_closed_window_aborts_simulation(gui):
+    gui.render()
+    pygame.event.post(pygame.event.Event(pygame.QUIT))
+    with pytest.raises(SimulationAbortedException):
+        gui.handle_events()
+
+
+def test_font_loaded_once_per_size(gui):
+    assert gui._get_font(12) is gui._get_font(12)
+    assert gui._get_font(12) is not gui._get_font(13)
+
+
+def test_text_surface_cached(gui):
+    first = gui._render_text('IMP', 13, (255, 0, 0))
+    assert gui._render_text('IMP', 13, (255, 0, 0)) is first
+    assert gui._render_text('IMP', 13, (0, 255, 0)) is not first
+
+
+def test_text_surface_cache_evicts_least_recently_used(gui, monkeypatch):
+    monkeypatch.setattr('src.gui.gui.TEXT_CACHE_SIZE', 2)
+    first = gui._render_text('A', 12, (255, 255, 255))
+    gui._render_text('B', 12, (255, 255, 255))
+    gui._render_text('A', 12, (255, 255, 255))
+    gui._render_text('C', 12, (255, 255, 255))
+    assert gui._render_text('A', 12, (255, 255, 255)) is first
+    assert ('B', 12, (255, 255, 255)) not in gui._text_surfaces
+
+
+def test_blocks_shrink_to_fit_big_core():
+    blocks_x, blocks_y, block_size, cells_per_block = divide_blocks(55440, 800)
+    assert block_size < BLOCK_SIZE
+    assert cells_per_block == 1
+    assert blocks_x * blocks_y >= 55440
+    assert blocks_y * block_size <= 800
+
+
+def test_cells_share_blocks_of_max_core():
+    blocks_x, blocks_y, block_size, cells_per_block = divide_blocks(MAX_CORE_SIZE, 800)
+    assert block_size == 1
+    assert blocks_y * block_size <= 800
+    assert blocks_x * blocks_y * cells_per_block >= MAX_CORE_SIZE
+    gui = PyGameGUI(1200, 800, MAX_CORE_SIZE, speed=0)
+    gui.init_game_screen()
+    assert gui.get_block_position(MAX_CORE_SIZE - 1)[1] < 800
+    assert gui.get_block_position(1) == gui.get_block_position(0)
+    gui.close()
+
+
+def test_many_warriors_info_drawn():
+    gui = PyGameGUI(1200, 800, 55440, speed=0)
+    gui.init_game_screen()
+    warriors = [Warrior(processes=[i]) for i in range(32)]
+    for i, warrior in enumerate(warriors):
+        warrior.set_color(get_warrior_color(i))
+    assert len(gui._draw_game_info(warriors, 0)) == 33
+    gui.close()
@@ -0,0 +1,91 @@
+from src.game import Game
+from src.hill import Hill, warrior_hash, pairing_seed
+from src.instructions import MOV, DAT, ADD, JMP
+from src.warrior import Warrior
+
+
+def get_warriors():
+    imp = Warrior([MOV("I", "#", 1, "}", 0)], name="Imp")
+    dwarf = Warrior([ADD("AB", "#", 4, "$", 3), MOV("I", "$", 2, "@", 2), JMP("B", "$", -2, "$", 0),
+                     DAT("F", "#", 0, "#", 0)], name="Dwarf")
+    bomb = Warrior([DAT("F", "#", 0, "#", 0)], name="Bomb")
+    return [imp, dwarf, bomb]
+
+
+def get_hill(path, **kwargs):
+    return Hill(str(path / 'hill.sqlite3'), core_size=200, max_cycles=200, rounds=2, **kwargs)
+
+
+def test_warrior_hash_ignores_name():
+    imp, dwarf, _ = get_warriors()
+    assert warrior_hash(imp) == warrior_hash(Warrior(imp.instructions(), name="Other"))
+    assert warrior_hash(imp) != warrior_hash(dwarf)
+    assert warrior_hash(imp) != warrior_hash(Warrior(imp.instructions(), start=1))
+
+
+def test_submit_plays_only_new_pairings(tmp_path):
+    hill = get_hill(tmp_path)
+    assert [hill.submit(warrior) for warrior in get_warriors()] == [0, 1, 2]
+    assert hill.submit(get_warriors()[0]) == 0
+    ranking = hill.ranking()
+    assert [entry.name for entry in ranking][-1] == "Bomb"
+    # Bomb dies in its first cycle so it loses every round
+    assert ranking[-1][2:] == (0, 4, 0, 0)
+    assert sum(entry.wins for entry in ranking) == sum(entry.loses for entry in ranking)
+
+
+def test_ranking_is_query(tmp_path, monkeypatch):
+    hill = get_hill(tmp_path)
+    for warrior in get_warriors():
+        hill.submit(warrior)
+    hill.close()
+
+    def play(game):
+        raise AssertionError('Stored pairing played again')
+
+    monkeypatch.setattr(Game, 'play', play)
+    hill = get_hill(tmp_path)
+    assert len(hill.ranking()) == 3
+    assert all(hill.submit(warrior) == 0 for warrior in get_warriors())
+    assert 'Bomb: 0-4-0 score 0' in hill.get_results_string()
+
+
+def test_results_keyed_by_settings(tmp_path):
+    hill = get_hill(tmp_path)
+    for warrior in get_warriors()[:2]:
+        hill.submit(warrior)
+    other = get_hill(tmp_path, max_processes=10)
+    assert sum(entry.score for entry in other.ranking()) == 0
+    assert other.submit(get_warriors()[2]) == 2
+
+
+def test_removed_warrior_not_ranked(tmp_path):
+    hill = get_hill(tmp_path)
+    warriors = get_warriors()
+    for warrior in warriors:
+        hill.submit(warrior)
+    hill.remove(warrior_hash(warriors[2]))
+    ranking = hill.ranking()
+    assert sorted(entry.name for entry in ranking) == ["Dwarf", "Imp"]
+    # Only Imp - Dwarf pairing is counted; every round is counted for both warriors
+    assert sum(entry.wins + entry.loses + entry.ties for entry in ranking) == 4
+    assert hill.submit(warriors[2]) == 0
+
+
+def test_pairing_played_with_seed_of_hashes(tmp_path, monkeypatch):
+    seeds = []
+
+    class SeedRecordingGame(Game):
+        def __init__(self, *args, seed=None, **kwargs):
+            seeds.append(seed)
+            super().__init__(*args, seed=seed, **kwargs)
+
+    monkeypatch.setattr('src.hill.Game', SeedRecordingGame)
+    hill = get_hill(tmp_path)
+    imp, dwarf, _ = get_warriors()
+    hill.submit(imp)
+    hill.submit(dwarf)
+    hash_a, hash_b = sorted((warrior_hash(imp), warrior_hash(dwarf)))
+    # Rechallenge of the same pairing (e.g. in other database) is played with the same placements
+    assert seeds == [pairing_seed(hash_a, hash_b)]
+    assert pairing_seed(hash_a, hash_b) != pairing_seed(hash_b, hash_a)
@@ -2,7 +2,7 @@ from src.core import Core
 from src.enum.mode import Mode
 from src.enum.modifier import Modifier
 from src.instructions import DAT, MOV, ADD, JMP, SUB, SPL, JMZ, JMN, DJN, SEQ, DIV, MOD, SLT
-from src.instructions import get_default_modifier
+from src.instructions import get_default_modifier, compile_instruction
 from src.round import Round
 from src.warrior import Warrior
 
@@ -32,11 +32,11 @@ def test_mov_a():
 
 def test_mov_b():
     warrior = Warrior(processes=[0])
-    core = Core(data=[MOV('B', '$', '1', '$', '2'), DAT('F', '$', 1, '$', 3), DAT('F', '$', 0, '$', 0)])
+    core = Core(data=[MOV('B', '$', '1', '$', '2'), DAT('F', '$', 1, '$', 2), DAT('F', '$', 0, '$', 0)])
     game = Round(core=core, warriors=[warrior], init_warriors=False)
     game.simulation_step()
     assert game.core()[2].a_value() == 0
-    assert game.core()[2].b_value() == 3
+    assert game.core()[2].b_value() == 2
 
 
 def test_mov_ab():
@@ -50,28 +50,28 @@ def test_mov_ab():
 
 def test_mov_ba():
     warrior = Warrior(processes=[0])
-    core = Core(data=[MOV('BA', '$', '1', '$', '2'), DAT('F', '$', 1, '$', 5), DAT('F', '$', 0, '$', 0)])
+    core = Core(data=[MOV('BA', '$', '1', '$', '2'), DAT('F', '$', 1, '$', 2), DAT('F', '$', 0, '$', 0)])
     game = Round(core=core, warriors=[warrior], init_warriors=False)
     game.simulation_step()
-    assert game.core()[2].a_value() == 5
+    assert game.core()[2].a_value() == 2
     assert game.core()[2].b_value() == 0
 
 
 def test_mov_f():
     warrior = Warrior(processes=[0])
-    core = Core(data=[MOV('F', '$', '1', '$', '2'), DAT('F', '$', 1, '$', 6), DAT('F', '$', 0, '$', 0)])
+    core = Core(data=[MOV('F', '$', '1', '$', '2'), DAT('F', '$', 1, '$', 2), DAT('F', '$', 0, '$', 0)])
     game = Round(core=core, warriors=[warrior], init_warriors=False)
     game.simulation_step()
     assert game.core()[2].a_value() == 1
-    assert game.core()[2].b_value() == 6
+    assert game.core()[2].b_value() == 2
 
 
 def test_mov_x():
     warrior = Warrior(processes=[0])
-    core = Core(data=[MOV('X', '$', '1', '$', '2'), DAT('F', '$', 1, '$', 7), DAT('F', '$', 0, '$', 0)])
+    core = Core(data=[MOV('X', '$', '1', '$', '2'), DAT('F', '$', 1, '$', 2), DAT('F', '$', 0, '$', 0)])
     game = Round(core=core, warriors=[warrior], init_warriors=False)
     game.simulation_step()
-    assert game.core()[2].a_value() == 7
+    assert game.core()[2].a_value() == 2
     assert game.core()[2].b_value() == 1
 
 
@@ -90,8 +90,8 @@ def test_sub_a():
     game = Round(core=core, warriors=[warrior], init_warriors=False)
     game.simulation_step()
     instruction = game.core()[1]
-    assert instruction.a_value() == -1
-    assert instruction.b_value() == -5
+    assert instruction.a_value() == (2 - 3) % 2
+    assert instruction.b_value() == -5 % 2
 
 
 def test_sub_b():
@@ -100,8 +100,8 @@ def test_sub_b():
     game = Round(core=core, warriors=[warrior], init_warriors=False)
     game.simulation_step()
     instruction = game.core()[1]
-    assert instruction.a_value() == 2
-    assert instruction.b_value() == -6
+    assert instruction.a_value() == 2 % 2
+    assert instruction.b_value() == (-5 - 1) % 2
 
 
 def test_sub_ab():
@@ -110,8 +110,8 @@ def test_sub_ab():
     game = Round(core=core, warriors=[warrior], init_warriors=False)
     game.simulation_step()
     instruction = game.core()[1]
-    assert instruction.a_value() == 2
-    assert instruction.b_value() == -8
+    assert instruction.a_value() == 2 % 2
+    assert instruction.b_value() == (-5 - 3) % 2
 
 
 def test_sub_ba():
@@ -120,8 +120,8 @@ def test_sub_ba():
     game = Round(core=core, warriors=[warrior], init_warriors=False)
     game.simulation_step()
     instruction = game.core()[1]
-    assert instruction.a_value() == -8
-    assert instruction.b_value() == -5
+    assert instruction.a_value() == (-5 - 3) % 2
+    assert instruction.b_value() == -5 % 2
 
 
 def test_sub_f():
@@ -130,8 +130,8 @@ def test_sub_f():
     game = Round(core=core, warriors=[warrior], init_warriors=False)
     game.simulation_step()
     instruction = game.core()[1]
-    assert instruction.a_value() == -1
-    assert instruction.b_value() == -6
+    assert instruction.a_value() == (2 - 3) % 2
+    assert instruction.b_value() == (-5 - 1) % 2
 
 
 def test_sub_x():
@@ -140,8 +140,8 @@ def test_sub_x():
     game = Round(core=core, warriors=[warrior], init_warriors=False)
     game.simulation_step()
     instruction = game.core()[1]
-    assert instruction.a_value() == 1
-    assert instruction.b_value() == -8
+    assert instruction.a_value() == (2 - 1) % 2
+    assert instruction.b_value() == (-5 - 3) % 2
 
 
 def test_add_ab():
@@ -150,8 +150,8 @@ def test_add_ab():
     game = Round(core=core, warriors=[warrior], init_warriors=False)
     game.simulation_step()
     instruction = game.core()[1]
-    assert instruction.a_value() == 2
-    assert instruction.b_value() == -2
+    assert instruction.a_value() == 2 % 2
+    assert instruction.b_value() == (-5 + 3) % 2
 
 
 def test_sub_typical():
@@ -159,7 +159,7 @@ def test_sub_typical():
     core = Core(data=[SUB('AB', '#', '3', '$', '1'), DAT('F', '$', 1, '$', -5)])
     game = Round(core=core, warriors=[warrior], init_warriors=False)
     game.simulation_step()
-    assert game.core()[1].b_value() == -8
+    assert game.core()[1].b_value() == (-5 - 3) % 2
 
 
 def test_jmp_typical():
@@ -167,7 +167,7 @@ def test_jmp_typical():
     core = Core(data=[DAT('F', '$', 1, '$', -5), DAT('F', '$', 1, '$', -5), JMP('B', '$', -1, '$', 0)])
     game = Round(core=core, warriors=[warrior], init_warriors=False)
     game.simulation_step()
-    assert game.warriors()[0].processes()[0] == 1
+    assert game.warriors()[0].processes()[0] % 3 == 1
 
 
 def test_core_add_cycle_end():
@@ -175,7 +175,7 @@ def test_core_add_cycle_end():
     core = Core(data=[DAT('F', '$', 1, '$', 5), ADD('AB', '#', '3', '$', '2'), DAT('F', '$', 1, '$', -5)])
     game = Round(core=core, warriors=[warrior], init_warriors=False)
     game.simulation_step()
-    assert game.core()[0].b_value() == 8
+    assert game.core()[0].b_value() == (5 + 3) % 3
 
 
 def test_core_add_cycle_end_two_times():
@@ -183,7 +183,7 @@ def test_core_add_cycle_end_two_times():
     core = Core(data=[DAT('F', '$', 1, '$', 5), ADD('AB', '#', '3', '$', '5'), DAT('F', '$', 1, '$', -5)])
     game = Round(core=core, warriors=[warrior], init_warriors=False)
     game.simulation_step()
-    assert game.core()[0].b_value() == 8
+    assert game.core()[0].b_value() == (5 + 3) % 3
 
 
 def test_core_add_cycle_begin():
@@ -191,7 +191,7 @@ def test_core_add_cycle_begin():
     core = Core(data=[DAT('F', '$', 1, '$', 5), ADD('AB', '#', '3', '$', '-2'), DAT('F', '$', 1, '$', -5)])
     game = Round(core=core, warriors=[warrior], init_warriors=False)
     game.simulation_step()
-    assert game.core()[2].b_value() == -2
+    assert game.core()[2].b_value() == (-5 + 3) % 3
 
 
 def test_core_add_cycle_begin_two_times():
@@ -199,7 +199,7 @@ def test_core_add_cycle_begin_two_times():
     core = Core(data=[DAT('F', '$', 1, '$', 5), ADD('AB', '#', '3', '$', '-5'), DAT('F', '$', 1, '$', -5)])
     game = Round(core=core, warriors=[warrior], init_warriors=False)
     game.simulation_step()
-    assert game.core()[2].b_value() == -2
+    assert game.core()[2].b_value() == (-5 + 3) % 3
 
 
 def test_core_predecrement_a():
@@ -207,7 +207,18 @@ def test_core_predecrement_a():
     core = Core(data=[DAT('F', '{', 1, '$', 1), DAT('F', '$', 0, '$', 0)])
     game = Round(core=core, warriors=[warrior], init_warriors=False)
     game.simulation_step()
-    assert game.core()[1].a_value() == -1
+    assert game.core()[1].a_value() == -1 % 2
+
+
+def test_core_predecrement_relative_to_instruction():
+    warrior = Warrior(processes=[1])
+    core = Core(data=[DAT('F', '$', 0, '$', 0), DAT('F', '{', 1, '<', 2), DAT('F', '$', 0, '$', 0),
+                      DAT('F', '$', 0, '$', 0)])
+    game = Round(core=core, warriors=[warrior], init_warriors=False)
+    game.simulation_step()
+    assert game.core()[2].a_value() == -1 % 4
+    assert game.core()[3].b_value() == -1 % 4
+    assert game.core()[1] == DAT('F', '{', 1, '<', 2)
 
 
 def test_core_predecrement_b():
@@ -215,7 +226,7 @@ def test_core_predecrement_b():
     core = Core(data=[DAT('F', '<', 1, '$', 1), DAT('F', '$', 0, '$', 0)])
     game = Round(core=core, warriors=[warrior], init_warriors=False)
     game.simulation_step()
-    assert game.core()[1].b_value() == -1
+    assert game.core()[1].b_value() == -1 % 2
 
 
 def test_core_postincrement_a():
@@ -469,7 +480,7 @@ def test_seq_f_yes():
 
 def test_seq_f_no():
     warrior = Warrior(processes=[0])
-    core = Core(data=[SEQ('F', '$', 1, '$', 2), DAT('F', '$', 1, '$', 4), DAT('F', '$', 1, '$', 1)])
+    core = Core(data=[SEQ('F', '$', 1, '$', 2), DAT('F', '$', 1, '$', 2), DAT('F', '$', 1, '$', 1)])
     game = Round(core=core, warriors=[warrior], init_warriors=False)
     game.simulation_step()
     assert warrior.processes()[0] == 1
@@ -485,7 +496,7 @@ def test_seq_x_yes():
 
 def test_seq_x_no():
     warrior = Warrior(processes=[0])
-    core = Core(data=[SEQ('X', '$', 1, '$', 2), DAT('F', '$', 1, '$', 4), DAT('F', '$', 1, '$', 4)])
+    core = Core(data=[SEQ('X', '$', 1, '$', 2), DAT('F', '$', 1, '$', 2), DAT('F', '$', 1, '$', 2)])
     game = Round(core=core, warriors=[warrior], init_warriors=False)
     game.simulation_step()
     assert warrior.processes()[0] == 1
@@ -526,3 +537,57 @@ def test_mod_zero():
 def test_get_default_modifier():
     assert get_default_modifier(DAT) == Modifier.F
     assert get_default_modifier(SLT) == Modifier.B
+    assert get_default_modifier(MOV, Mode.IMMEDIATE, Mode.DIRECT) == Modifier.AB
+    assert get_default_modifier(SUB, Mode.DIRECT, Mode.IMMEDIATE) == Modifier.B
+    assert get_default_modifier(ADD) == Modifier.F
+    assert get_default_modifier(SEQ) == Modifier.I
+
+
+def test_div_integer_result():
+    warrior = Warrior(processes=[0])
+    core = Core(size=8)
+    core[0] = DIV('AB', '#', 2, '$', 1)
+    core[1] = DAT('F', '$', 0, '$', 7)
+    game = Round(core=core, warriors=[warrior], init_warriors=False)
+    game.simulation_step()
+    assert core[1].b_value() == 3
+
+
+def test_sub_result_mod_core_size():
+    warrior = Warrior(processes=[0])
+    core = Core(data=[SUB('AB', '#', 3, '$', 1), DAT('F', '$', 0, '$', 1), DAT('F', '$', 0, '$', 0)])
+    game = Round(core=core, warriors=[warrior], init_warriors=False)
+    game.simulation_step()
+    assert core[1].b_value() == 1
+
+
+def test_slt_skip():
+    warrior = Warrior(processes=[0])
+    core = Core(data=[SLT('A', '#', 1, '$', 1), DAT('F', '$', 2, '$', 0), DAT('F', '$', 0, '$', 0)])
+    game = Round(core=core, warriors=[warrior], init_warriors=False)
+    game.simulation_step()
+    assert warrior.processes()[0] == 2
+
+
+def test_spl_full_queue():
+    warrior = Warrior(processes=[0], max_processes=1)
+    core = Core(data=[SPL('F', '$', 2, '$', 2), DAT('F', '$', 0, '$', 0), DAT('F', '$', 0, '$', 0)])
+    game = Round(core=core, warriors=[warrior], init_warriors=False)
+    game.simulation_step()
+    assert warrior.processes() == [1]
+
+
+def test_compile_instruction_cached():
+    first = compile_instruction(MOV, Modifier.I, Mode.DIRECT, Mode.DIRECT)
+    second = compile_instruction(MOV, Modifier.I, Mode.DIRECT, Mode.DIRECT)
+    assert first is second
+    assert first is not compile_instruction(MOV, Modifier.F, Mode.DIRECT, Mode.DIRECT)
+
+
+def test_mov_i_recompiles_target():
+    warrior = Warrior(processes=[0])
+    core = Core(data=[MOV('I', '$', 0, '$', 1), DAT('F', '$', 0, '$', 0)])
+    game = Round(core=core, warriors=[warrior], init_warriors=False)
+    game.simulation_step()
+    game.simulation_step()
+    assert warrior.processes() == [2]
@@ -1,10 +1,14 @@
+import os
+import tarfile
+import zipfile
 from io import StringIO
 
 import pytest
 
 from src.instructions import *
-from src.parser import InvalidInstructionCodeException, InvalidInstructionSyntaxException
-from src.parser import parse_warrior
+from src.parser import InvalidInstructionCodeException, InvalidInstructionSyntaxException, EmptyWarriorException
+from src.parser import InvalidExpressionException
+from src.parser import parse_warrior, parse_warriors, stream_warriors
 
 
 def test_parse_warrior_instructions_classes():
@@ -79,3 +83,164 @@ def test_parse_warrior_invalid_instruction_syntax():
     file_handle = StringIO(data)
     with pytest.raises(InvalidInstructionSyntaxException):
         parse_warrior(file_handle)
+
+
+def test_parse_warrior_labels():
+    data = """
+            bomb    DAT #0, #0
+            start:  ADD #4, bomb
+                    MOV bomb, @bomb
+                    JMP start
+            """
+    instructions = parse_warrior(StringIO(data)).instructions()
+    assert instructions[1] == ADD("AB", "#", 4, "$", -1)
+    assert instructions[2] == MOV("I", "$", -2, "@", -2)
+    assert instructions[3] == JMP("B", "$", -2, "$", 0)
+
+
+def test_parse_warrior_equ_and_expressions():
+    data = """
+            step    EQU 2 * (3 + 1)
+            half    EQU CORESIZE / 2
+                    DAT #step, #half - step
+                    DAT -7 / 2, -7 % 2
+                    DAT 1 + 2 == 3 && 2 > 1, !0 || 0
+            """
+    instructions = parse_warrior(StringIO(data), constants={'CORESIZE': 800}).instructions()
+    assert instructions[0] == DAT("F", "#", 8, "#", 392)
+    assert instructions[1] == DAT("F", "$", -3, "$", -1)
+    assert instructions[2] == DAT("F", "$", 1, "$", 1)
+
+
+def test_parse_warrior_for_rof():
+    data = """
+            i       FOR 3
+            x&i     DAT #i, x01
+                    ROF
+            """
+    instructions = parse_warrior(StringIO(data)).instructions()
+    assert instructions == [DAT("F", "#", 1, "$", 0), DAT("F", "#", 2, "$", -1), DAT("F", "#", 3, "$", -2)]
+
+
+def test_parse_warrior_start():
+    data = """
+                    ORG start
+                    DAT #0, #0
+            start   MOV 0, 1
+                    END
+            """
+    assert parse_warrior(StringIO(data)).start() == 1
+    assert parse_warrior(StringIO("DAT 0\nMOV 0, 1\nEND 1\nDAT 0\n")).start() == 1
+
+
+def test_parse_warrior_default_modifiers():
+    instructions = parse_warrior(StringIO("MOV #1, 0\nMOV 1, #0\nADD 1, 0\nSLT #1, 0\nCMP 1, 0\n")).instructions()
+    assert [instruction.modifier() for instruction in instructions] == [Modifier.AB, Modifier.B, Modifier.F,
+                                                                         Modifier.AB, Modifier.I]
+    assert type(instructions[-1]) is SEQ
+
+
+@pytest.mark.parametrize('data', ["DAT undefined", "DAT 1 / 0", "DAT (1", "a EQU b\nb EQU a\nDAT a",
+                                  "x DAT 0\nx DAT 0"])
+def test_parse_warrior_invalid_expression(data):
+    with pytest.raises(InvalidExpressionException):
+        parse_warrior(StringIO(data))
+
+
+MULTI_WARRIOR = """;redcode-94
+;name Imp
+MOV.I $0, $1
+END
+;redcode-94
+;name Broken
+MOV.I $0, $1
+XYZ 1, 2
+;redcode
+;name Dwarf
+ADD.AB #4, 3
+MOV.I 2, @2
+JMP -2
+DAT #0, #0
+"""
+
+
+def test_parse_warriors_multi_warrior_stream():
+    parsed = list(parse_warriors(StringIO(MULTI_WARRIOR), 'hill'))
+    assert [(item.origin, item.index) for item in parsed] == [('hill', 0), ('hill', 1), ('hill', 2)]
+    assert parsed[0].warrior.warrior_info().name() == 'Imp'
+    assert parsed[0].error is None
+    assert parsed[1].warrior is None
+    assert isinstance(parsed[1].error, InvalidInstructionCodeException)
+    assert len(parsed[2].warrior.instructions()) == 4
+
+
+def test_parse_warriors_error_line_number():
+    parsed = list(parse_warriors(StringIO("MOV 0, 1\nEND\nMOV 0, 1\n???\n")))
+    assert 'line 3' in str(parsed[1].error)
+
+
+def test_parse_warriors_empty():
+    parsed = list(parse_warriors(StringIO(";just a comment\n")))
+    assert len(parsed) == 1
+    assert isinstance(parsed[0].error, EmptyWarriorException)
+
+
+def write_hill(directory):
+    (directory / 'imp.red').write_text(';name Imp\nMOV.I $0, $1\n')
+    (directory / 'sub').mkdir()
+    (directory / 'sub' / 'broken.red').write_bytes(b'\xff\xfe MOV 0\n')
+    (directory / 'notes.txt').write_text('not a warrior')
+
+
+def test_stream_warriors_directory(tmp_path):
+    write_hill(tmp_path)
+    parsed = list(stream_warriors(str(tmp_path)))
+    origins = [os.path.relpath(item.origin, str(tmp_path)) for item in parsed]
+    assert origins == ['imp.red', os.path.join('sub', 'broken.red')]
+    assert parsed[0].warrior.warrior_info().name() == 'Imp'
+    assert parsed[1].error is not None
+
+
+def test_stream_warriors_archives(tmp_path):
+    hill = tmp_path / 'hill'
+    hill.mkdir()
+    write_hill(hill)
+    tar_path = str(tmp_path / 'hill.tar.gz')
+    with tarfile.open(tar_path, 'w:gz') as archive:
+        archive.add(str(hill), arcname='hill')
+    zip_path = str(tmp_path / 'hill.zip')
+    with zipfile.ZipFile(zip_path, 'w') as archive:
+        for name in ('imp.red', 'sub/broken.red', 'notes.txt'):
+            archive.write(str(hill / name), name)
+    for path in (tar_path, zip_path):
+        parsed = sorted(stream_warriors(path), key=lambda item: item.origin)
+        assert len(parsed) == 2
+        assert parsed[0].origin.endswith('imp.red')
+        assert parsed[0].warrior.instructions() == [MOV("I", "$", 0, "$", 1)]
+        assert parsed[1].error is not None
+
+
+def test_stream_warriors_tar_members_released(tmp_path, monkeypatch):
+    tar_path = str(tmp_path / 'hill.tar')
+    with tarfile.open(tar_path, 'w') as archive:
+        for index in range(20):
+            path = tmp_path / f'imp{index}.red'
+            path.write_text('MOV 0, 1\n')
+            archive.add(str(path), arcname=path.name)
+    member_counts = []
+    next_member = tarfile.TarFile.next
+
+    def counting_next(archive):
+        member_counts.append(len(archive.members))
+        return next_member(archive)
+
+    monkeypatch.setattr(tarfile.TarFile, 'next', counting_next)
+    assert len(list(stream_warriors(tar_path))) == 20
+    # Members aren't accumulated, so memory doesn't grow with archive size
+    assert max(member_counts) <= 1
+
+
+def test_stream_warriors_multi_warrior_file(tmp_path):
+    path = tmp_path / 'hill.txt'
+    path.write_text(MULTI_WARRIOR)
+    assert [item.error is None for item in stream_warriors(str(path))] == [True, False, True]
@@ -0,0 +1,102 @@
+import csv
+import io
+import json
+
+from src.core import Core
+from src.instructions import MOV, DAT, ADD, DIV, JMP, NOP
+from src.profiler import Profiler
+from src.round import Round, RoundHooks
+from src.tournament import Tournament
+from src.warrior import Warrior
+
+
+def get_warriors():
+    imp = Warrior([MOV("I", "$", 0, "$", 1)], name="Imp")
+    dwarf = Warrior([ADD("AB", "#", 4, "$", 3), MOV("I", "$", 2, "@", 2), JMP("B", "$", -2, "$", 0),
+                     DAT("F", "#", 0, "#", 0)], name="Dwarf")
+    return [imp, dwarf]
+
+
+def test_profiler_counts_measured_accesses():
+    profiler = Profiler()
+    core = Core(10, sink=profiler.sink())
+    warrior = Warrior(name="Test")
+    # DIV.F divides A field by zero first, so nothing is written; DIV.X writes A field before B field is divided by zero
+    for instruction in (MOV("I", "$", 0, ">", 1), DIV("F", "#", 0, "$", 1), DIV("X", "#", 0, "$", 1)):
+        core[0] = instruction
+        profiler.execute_instruction(instruction, core, 0, warrior)
+    report = profiler.report()
+    assert report['modifiers']['I'] | {'seconds': 0} == {'executions': 1, 'seconds': 0, 'reads': 1, 'writes': 2}
+    assert (report['modifiers']['F']['reads'], report['modifiers']['F']['writes']) == (0, 0)
+    assert (report['modifiers']['X']['reads'], report['modifiers']['X']['writes']) == (1, 1)
+
+
+def test_profiler_keeps_warriors_with_same_name_apart():
+    profiler = Profiler()
+    warriors = [Warrior([MOV("I", "$", 0, "$", 1)], name="Imp"), Warrior([MOV("I", "$", 0, "$", 1)], name="Imp")]
+    round_obj = Round(warriors, core_size=200, max_cycles=10, seed=1, hooks=RoundHooks(profiler=profiler))
+    round_obj.play()
+    report = profiler.report()['warriors']
+    assert report['0:Imp']['executions'] == report['1:Imp']['executions'] == round_obj.cycles() // 2
+
+
+def test_profiler_round_counts_every_cycle():
+    profiler = Profiler()
+    warriors = get_warriors()
+    round_obj = Round(warriors, core_size=200, max_cycles=100, seed=1, hooks=RoundHooks(profiler=profiler))
+    round_obj.play()
+    report = profiler.report()
+    assert report['total']['executions'] == round_obj.cycles() == profiler.executions()
+    assert report['warriors']['0:Imp']['executions'] == report['opcodes']['MOV']['executions'] - \
+        report['b_modes']['@']['executions']
+    assert sum(item['executions'] for item in report['a_modes'].values()) == round_obj.cycles()
+    assert report['modifiers']['AB']['writes'] == report['modifiers']['AB']['executions']
+    assert report['total']['seconds'] > 0
+
+
+def test_profiler_round_same_results():
+    profiled = get_warriors()
+    Round(profiled, core_size=200, max_cycles=500, seed=3, hooks=RoundHooks(profiler=Profiler())).play()
+    plain = get_warriors()
+    Round(plain, core_size=200, max_cycles=500, seed=3).play()
+    assert [w.warrior_info().ties() for w in profiled] == [w.warrior_info().ties() for w in plain]
+
+
+def test_profiler_execute_instruction():
+    profiler = Profiler()
+    core = Core(10)
+    warrior = Warrior(name="Test")
+    profiler.execute_instruction(NOP("F", "$", 1, "$", 2), core, 0, warrior)
+    profiler.execute_instruction(NOP("F", "$", 1, "$", 2), core, 1, warrior)
+    assert profiler.report()['opcodes']['NOP']['executions'] == 2
+    assert warrior.processes() == [1, 2]
+
+
+def test_profiler_outputs():
+    profiler = Profiler()
+    Round(get_warriors(), core_size=200, max_cycles=30, seed=1, hooks=RoundHooks(profiler=profiler)).play()
+
+    json_file = io.StringIO()
+    profiler.write_json(json_file)
+    assert json.loads(json_file.getvalue()) == profiler.report()
+
+    csv_file = io.StringIO()
+    profiler.write_csv(csv_file)
+    rows = list(csv.DictReader(io.StringIO(csv_file.getvalue())))
+    assert rows[-1]['category'] == 'total'
+    assert int(rows[-1]['executions']) == profiler.executions()
+    assert {row['name'] for row in rows if row['category'] == 'warriors'} == {'0:Imp', '1:Dwarf'}
+
+    folded_file = io.StringIO()
+    profiler.write_folded(folded_file, by_time=False)
+    lines = folded_file.getvalue().splitlines()
+    assert '0:Imp;MOV;MOV.I $ $ 16' in lines
+    assert sum(int(line.rsplit(' ', 1)[1]) for line in lines) == profiler.executions()
+
+
+def test_tournament_profile_merged():
+    tournament = Tournament(get_warriors(), rounds=4, core_size=200, max_cycles=100, workers=1, seed=1, chunk_size=2,
+                            profile=True)
+    tournament.play()
+    assert tournament.profiler().executions() == tournament.cycles()
+    assert Tournament(get_warriors(), rounds=1).profiler() is None
@@ -1,5 +1,6 @@
-from src.instructions import MOV
-from src.round import Round
+from src.core import Core
+from src.instructions import MOV, DAT, JMP
+from src.round import Round, draw_record
 from src.warrior import Warrior
 
 
@@ -22,3 +23,64 @@ def test_has_alive_warriors_false():
     warrior_b = Warrior(processes=[])
     game = Round([warrior_a, warrior_b], core_size=2)
     assert game.get_alive_warriors()
+
+
+def test_round_big_core_many_warriors():
+    warriors = [Warrior([MOV("I", "$", 0, "$", 1)]) for _ in range(32)]
+    round_obj = Round(warriors, core_size=55440, max_cycles=1000)
+    round_obj.play()
+    assert len(round_obj.get_alive_warriors()) == 32
+
+
+def test_dead_warrior_skipped():
+    core = Core(data=[DAT("F", "$", 0, "$", 0), JMP("B", "$", 0, "$", 0)])
+    warrior_a = Warrior(processes=[0])
+    warrior_b = Warrior(processes=[1])
+    round_obj = Round([warrior_a, warrior_b], core=core, init_warriors=False)
+    round_obj.simulation_step()
+    assert round_obj.get_alive_warriors() == [warrior_b]
+    assert round_obj.is_ended()
+    round_obj.simulation_step()
+    assert round_obj.cycles() == 3
+    # Loses are counted when the round ends
+    assert warrior_a.warrior_info().loses() == 0
+    round_obj.update_warriors_results()
+    assert warrior_a.warrior_info().loses() == 1
+
+
+def test_warrior_start_offset():
+    warrior = Warrior([DAT("F", "$", 0, "$", 0), MOV("I", "$", 0, "$", 1)], start=1)
+    round_obj = Round([warrior], core_size=100)
+    assert round_obj.get_alive_warriors() == [warrior]
+    round_obj.simulation_step()
+    assert warrior.process_count() == 1
+
+
+def get_core_values(round_obj):
+    core = round_obj.core()
+    return list(core.opcodes()), list(core.a_values()), list(core.b_values())
+
+
+def test_seeded_round_reproducible():
+    rounds = []
+    for _ in range(2):
+        warriors = [Warrior([MOV("I", "$", 0, "$", 1)]), Warrior([MOV("I", "#", 1, "}", 0)])]
+        round_obj = Round(warriors, core_size=200, max_cycles=300, seed=5)
+        round_obj.play()
+        rounds.append(round_obj)
+    assert rounds[0].record() == rounds[1].record() == draw_record(2, 200, 5)
+    assert get_core_values(rounds[0]) == get_core_values(rounds[1])
+
+
+def test_round_replayed_from_record():
+    warriors = [Warrior([MOV("I", "$", 0, "$", 1)]), Warrior([MOV("I", "#", 1, "}", 0)])]
+    round_obj = Round(warriors, core_size=200, max_cycles=300)
+    round_obj.play()
+    record = round_obj.record()
+    assert sorted(record.order) == [0, 1]
+    assert abs(record.positions[0] - record.positions[1]) == 100
+    replayed = Round([Warrior([MOV("I", "$", 0, "$", 1)]), Warrior([MOV("I", "#", 1, "}", 0)])], core_size=200,
+                     max_cycles=300, seed=1, record=record)
+    replayed.play()
+    assert replayed.record() == record
+    assert get_core_values(replayed) == get_core_values(round_obj)
@@ -0,0 +1,149 @@
+import asyncio
+import json
+import time
+
+import pytest
+
+from src.server import BattleServer, job_args, play_job
+
+IMP = "MOV 0, 1\n"
+DWARF = """;name Dwarf
+ADD #4, 3
+MOV 2, @2
+JMP -2
+DAT #0, #0
+"""
+BOMB = ";name Bomb\nDAT #0, #0\n"
+
+
+def test_job_args():
+    assert job_args({'warriors': [IMP, DWARF], 'rounds': 2, 'seed': 1}) == \
+           ([IMP, DWARF], 2, 8000, 80000, 8000, 1, None)
+    for request in ([], {'warriors': [IMP]}, {'warriors': IMP}, {'warriors': [IMP, 1]},
+                    {'warriors': [IMP, DWARF], 'rounds': 0}, {'warriors': [IMP, DWARF], 'core_size': '800'},
+                    {'warriors': [IMP, DWARF], 'max_cycles': True}, {'warriors': [IMP, DWARF], 'cycle_limit': 0},
+                    {'warriors': [IMP, DWARF], 'seed': 1.5}):
+        with pytest.raises(ValueError):
+            job_args(request)
+
+
+def test_play_job():
+    result = play_job([DWARF, BOMB], 3, 200, 200, 64, 1, None)
+    assert result['status'] == 'finished'
+    assert result['rounds'] == 3
+    # Bomb dies in its first cycle so it loses every round
+    assert result['results'][1] == {'name': 'Bomb', 'wins': 0, 'loses': 3, 'ties': 0}
+    assert play_job([DWARF, 'FOO 1, 2'], 3, 200, 200, 64, 1, None)['status'] == 'error'
+
+
+def test_play_job_timeout():
+    result = play_job([IMP, IMP], 3, 200, 100, 64, 1, 150)
+    assert result['status'] == 'timeout'
+    assert result['rounds'] == 1
+    assert [entry['ties'] for entry in result['results']] == [1, 1]
+
+
+def test_server_streams_results(tmp_path):
+    path = str(tmp_path / 'server.sock')
+    requests = [{'id': 'long', 'warriors': [IMP, IMP], 'rounds': 10, 'core_size': 200, 'max_cycles': 20000},
+                {'warriors': [IMP, BOMB], 'core_size': 200},
+                {'id': 'invalid', 'warriors': [IMP]},
+                {'id': 'short', 'warriors': [DWARF, BOMB], 'rounds': 1, 'core_size': 200}]
+
+    async def run():
+        server = BattleServer(workers=2, queue_size=1)
+        await server.start(path=path)
+        try:
+            reader, writer = await asyncio.open_unix_connection(path)
+            for request in requests:
+                writer.write(json.dumps(request).encode() + b'\n')
+            writer.write_eof()
+            messages = []
+            while line := await reader.readline():
+                messages.append(json.loads(line))
+            writer.close()
+            return messages
+        finally:
+            await server.close()
+
+    messages = asyncio.run(run())
+    statuses = [(message['id'], message['status']) for message in messages]
+    assert [status for status in statuses if status[1] == 'queued'] == [('long', 'queued'), (1, 'queued'),
+                                                                       ('short', 'queued')]
+    assert ('invalid', 'error') in statuses
+    results = {message['id']: message for message in messages if message['status'] == 'finished'}
+    assert set(results) == {'long', 1, 'short'}
+    assert results[1]['results'][0]['wins'] == 10
+    # Short job is played by the second worker while the long one is running
+    assert statuses.index(('short', 'finished')) < statuses.index(('long', 'finished'))
+
+
+def test_server_rejects_nested_request(tmp_path):
+    path = str(tmp_path / 'server.sock')
+
+    async def run():
+        server = BattleServer(workers=1)
+        await server.start(path=path)
+        try:
+            reader, writer = await asyncio.open_unix_connection(path)
+            writer.write(json.dumps({'id': 'job', 'warriors': [DWARF, BOMB], 'core_size': 200}).encode() + b'\n')
+            writer.write(b'[' * 100000 + b'\n')
+            writer.write_eof()
+            messages = [json.loads(line) async for line in reader]
+            writer.close()
+            return messages
+        finally:
+            await server.close()
+
+    statuses = [(message['id'], message['status']) for message in asyncio.run(run())]
+    assert statuses == [('job', 'queued'), (None, 'error'), ('job', 'finished')]
+
+
+def test_server_replaces_dead_worker(tmp_path):
+    path = str(tmp_path / 'server.sock')
+    long_job = {'id': 'long', 'warriors': [IMP, IMP], 'rounds': 100, 'core_size': 200, 'max_cycles': 1000000}
+
+    async def run():
+        server = BattleServer(workers=1)
+        await server.start(path=path)
+        try:
+            reader, writer = await asyncio.open_unix_connection(path)
+            writer.write(json.dumps(long_job).encode() + b'\n')
+            messages = [json.loads(await reader.readline())]
+            # Worker is killed while it plays the long job, as if it was killed when out of memory
+            while not server._executor._processes:
+                await asyncio.sleep(0.01)
+            for process in server._executor._processes.values():
+                process.kill()
+            messages.append(json.loads(await reader.readline()))
+            writer.write(json.dumps({'id': 'next', 'warriors': [DWARF, BOMB], 'core_size': 200}).encode() + b'\n')
+            writer.write_eof()
+            messages += [json.loads(line) async for line in reader]
+            writer.close()
+            return messages
+        finally:
+            await server.close()
+
+    statuses = [(message['id'], message['status']) for message in asyncio.run(run())]
+    assert statuses == [('long', 'queued'), ('long', 'error'), ('next', 'queued'), ('next', 'finished')]
+
+
+def test_server_close_doesnt_wait_for_running_job(tmp_path):
+    path = str(tmp_path / 'server.sock')
+    long_job = {'id': 'long', 'warriors': [IMP, IMP], 'rounds': 100, 'core_size': 200, 'max_cycles': 1000000}
+
+    async def run():
+        server = BattleServer(workers=1)
+        await server.start(path=path)
+        reader, writer = await asyncio.open_unix_connection(path)
+        writer.write(json.dumps(long_job).encode() + b'\n')
+        await reader.readline()
+        while not server._executor._processes:
+            await asyncio.sleep(0.01)
+        start = time.perf_counter()
+        await server.close()
+        writer.close()
+        return time.perf_counter() - start
+
+    # Long job would take minutes
+    assert asyncio.run(run()) < 5
@@ -0,0 +1,73 @@
+from src.core import Core
+from src.enum.event import CoreEvent
+from src.gui.gui import MockGUI
+from src.instructions import MOV, ADD, JMP, DAT, DJN
+from src.round import Round, RoundHooks
+from src.sinks import RecordingSink, GUISink, NULL_SINK
+from src.warrior import Warrior
+
+
+def get_warriors():
+    imp = Warrior([MOV("I", "$", 0, "$", 1)], name="Imp")
+    dwarf = Warrior([ADD("AB", "#", 4, "$", 3), MOV("I", "$", 2, "@", 2), JMP("B", "$", -2, "$", 0),
+                     DAT("F", "#", 0, "#", 0)], name="Dwarf")
+    return [imp, dwarf]
+
+
+def test_core_without_sink_has_no_events():
+    core = Core(10)
+    assert core.sink() is NULL_SINK
+    assert not core.has_events()
+    assert not Core(10, gui=MockGUI(10)).has_events()
+    assert isinstance(Core(10, gui=MockGUI(10), sink=RecordingSink()).sink(), RecordingSink)
+
+
+def test_recording_sink_collects_events():
+    sink = RecordingSink()
+    core = Core(10, sink=sink)
+    core[0] = MOV("I", "$", 0, "}", 1)
+    warrior = Warrior(name="Imp")
+    core.execute(0, warrior)
+    assert sink.events() == [(1, warrior, CoreEvent.WRITE), (0, warrior, CoreEvent.EXECUTE),
+                             (0, warrior, CoreEvent.READ), (1, warrior, CoreEvent.WRITE)]
+
+
+def test_recording_sink_flushes_full_buffer():
+    flushed = []
+    sink = RecordingSink(buffer_size=2, on_flush=flushed.append)
+    warrior = Warrior()
+    for address in range(5):
+        sink.emit(address, warrior, CoreEvent.EXECUTE)
+    assert [len(events) for events in flushed] == [2, 2]
+    sink.flush()
+    assert [len(events) for events in flushed] == [2, 2, 1]
+    assert not sink.events()
+
+
+def test_gui_sink_colors_blocks():
+    colored = []
+
+    class ColorGUI(MockGUI):
+        def set_block_color(self, block_number, color, event):
+            colored.append((block_number, event))
+
+    core = Core(10, sink=GUISink(ColorGUI(10)))
+    core[3] = DJN("B", "$", 0, "<", 2)
+    core.execute(13, Warrior())
+    assert colored == [(5, CoreEvent.WRITE), (3, CoreEvent.EXECUTE), (3, CoreEvent.WRITE)]
+
+
+def test_round_with_sink_same_results():
+    sink = RecordingSink()
+    recorded = get_warriors()
+    recorded_round = Round(recorded, core_size=200, max_cycles=500, seed=3, hooks=RoundHooks(sink=sink))
+    recorded_round.play()
+    plain = get_warriors()
+    plain_round = Round(plain, core_size=200, max_cycles=500, seed=3)
+    plain_round.play()
+    assert recorded_round.core().opcodes() == plain_round.core().opcodes()
+    assert recorded_round.core().a_values() == plain_round.core().a_values()
+    assert recorded_round.core().b_values() == plain_round.core().b_values()
+    # Loaded warriors and every executed instruction
+    executed = [event for event in sink.events() if event[2] == CoreEvent.EXECUTE]
+    assert len(executed) == 5 + recorded_round.cycles()
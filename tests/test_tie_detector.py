@@ -0,0 +1,65 @@
+import random
+
+from src.instructions import MOV, JMP, ADD, DAT
+from src.round import Round, RoundHooks
+from src.tie_detector import TieDetector
+from src.tournament import Tournament
+from src.warrior import Warrior
+
+
+def get_imps():
+    return [Warrior([MOV("I", "$", 0, "$", 1)]), Warrior([MOV("I", "$", 0, "$", 1)])]
+
+
+def test_imps_tied_early():
+    warriors = get_imps()
+    round_obj = Round(warriors, core_size=200, max_cycles=10000, hooks=RoundHooks(tie_detector=TieDetector(window=10)))
+    round_obj.play()
+    assert round_obj.cycles() < 1000
+    assert round_obj.saved_cycles() == 10000 - round_obj.cycles()
+    assert [warrior.warrior_info().ties() for warrior in warriors] == [1, 1]
+
+
+def test_same_results_as_without_detector():
+    dwarf = [ADD("AB", "#", 4, "$", 3), MOV("I", "$", 2, "@", 2), JMP("B", "$", -2, "$", 0), DAT("F", "#", 0, "#", 0)]
+    imp = [MOV("I", "$", 0, "$", 1)]
+    results = []
+    for tie_detector in (None, TieDetector(window=10)):
+        random.seed(3)
+        warriors = [Warrior(dwarf), Warrior(imp)]
+        round_obj = Round(warriors, core_size=200, max_cycles=5000, hooks=RoundHooks(tie_detector=tie_detector))
+        round_obj.play()
+        results.append([(w.warrior_info().wins(), w.warrior_info().loses(), w.warrior_info().ties()) for w in warriors])
+    assert results[0] == results[1]
+
+
+def test_changing_core_not_tied():
+    # Warrior keeps incrementing its own field, which repeats only after core size increments
+    counter = Warrior([ADD("AB", "#", 1, "$", 1), JMP("B", "$", -1, "$", 0)])
+    warriors = [counter, Warrior([JMP("B", "$", 0, "$", 0)])]
+    round_obj = Round(warriors, core_size=8000, max_cycles=2000, hooks=RoundHooks(tie_detector=TieDetector(window=10)))
+    round_obj.play()
+    assert round_obj.saved_cycles() == 0
+
+
+def test_stall_checks_ends_unchanged_core():
+    warrior = Warrior(processes=[0])
+    round_obj = Round([warrior, Warrior(processes=[0])], core_size=200, init_warriors=False)
+    exact = TieDetector(window=1)
+    stall = TieDetector(window=1, stall_checks=3)
+    tied = []
+    for position in range(1, 5):
+        # Processes don't return to the same state, but core doesn't change
+        warrior.clear_processes()
+        warrior.add_process(position)
+        tied.append((exact.is_tied(round_obj), stall.is_tied(round_obj)))
+    assert tied == [(False, False), (False, False), (False, False), (False, True)]
+
+
+def test_tournament_reports_saved_cycles():
+    tournament = Tournament(get_imps(), rounds=2, core_size=200, max_cycles=5000, workers=1, seed=1,
+                            detect_ties=True)
+    tournament.play()
+    assert tournament.saved_cycles() > 0
+    assert tournament.cycles() + tournament.saved_cycles() == 2 * 5000
+    assert 'saved by tie detection' in tournament.get_results_string()
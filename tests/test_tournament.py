@@ -0,0 +1,36 @@
+from src.instructions import MOV, DAT, ADD, JMP
+from src.tournament import Tournament
+from src.warrior import Warrior
+
+
+def get_warriors():
+    imp = Warrior([MOV("I", "#", 1, "}", 0)], name="Imp")
+    dwarf = Warrior([ADD("AB", "#", 4, "$", 3), MOV("I", "$", 2, "@", 2), JMP("B", "$", -2, "$", 0),
+                     DAT("F", "#", 0, "#", 0)], name="Dwarf")
+    bomb = Warrior([DAT("F", "#", 0, "#", 0)], name="Bomb")
+    return [imp, dwarf, bomb]
+
+
+def get_results(warriors):
+    return [(w.warrior_info().wins(), w.warrior_info().loses(), w.warrior_info().ties()) for w in warriors]
+
+
+def test_tournament_pairings():
+    tournament = Tournament(get_warriors(), rounds=1)
+    assert tournament.pairings() == [(0, 1), (0, 2), (1, 2)]
+
+
+def test_tournament_rounds_counted():
+    warriors = get_warriors()
+    tournament = Tournament(warriors, rounds=3, core_size=200, max_cycles=200, workers=1, seed=1, chunk_size=2)
+    tournament.play()
+    # Bomb dies in its first cycle so it loses every round
+    assert get_results(warriors)[2] == (0, 6, 0)
+
+
+def test_tournament_parallel_same_as_serial():
+    serial = get_warriors()
+    Tournament(serial, rounds=4, core_size=200, max_cycles=500, workers=1, seed=7, chunk_size=2).play()
+    parallel = get_warriors()
+    Tournament(parallel, rounds=4, core_size=200, max_cycles=500, workers=2, seed=7, chunk_size=2).play()
+    assert get_results(serial) == get_results(parallel)
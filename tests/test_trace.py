@@ -0,0 +1,139 @@
+import io
+
+import pytest
+
+from src.game import Game
+from src.gui.gui import MockGUI
+from src.instructions import MOV, ADD, JMP, DAT, SPL
+from src.round import Round, RoundHooks
+from src.trace import TraceRecorder, TraceReader, TraceSnapshot, append_varint, read_varint, TRACE_TRAILER, \
+    INDEX_ENTRY
+from src.warrior import Warrior
+
+
+def get_warriors():
+    imp = Warrior([MOV("I", "$", 0, "$", 1)], name="Imp")
+    dwarf = Warrior([ADD("AB", "#", 4, "$", 3), MOV("I", "$", 2, "@", 2), JMP("B", "$", -2, "$", 0),
+                     DAT("F", "#", 0, "#", 0)], name="Dwarf")
+    return [imp, dwarf]
+
+
+def record_round(max_cycles=500, snapshot_interval=100, warriors=None):
+    file_handle = io.BytesIO()
+    recorder = TraceRecorder(file_handle, snapshot_interval=snapshot_interval)
+    round_obj = Round(warriors or get_warriors(), core_size=200, max_cycles=max_cycles, seed=3,
+                      hooks=RoundHooks(recorder=recorder))
+    round_obj.play()
+    recorder.finish()
+    return round_obj, file_handle.getvalue()
+
+
+def test_varint():
+    buffer = bytearray()
+    for value in (0, 1, 127, 128, 300, 2 ** 40):
+        append_varint(buffer, value)
+    offset = 0
+    values = []
+    while offset < len(buffer):
+        value, offset = read_varint(buffer, offset)
+        values.append(value)
+    assert values == [0, 1, 127, 128, 300, 2 ** 40]
+    assert len(buffer) == 1 + 1 + 1 + 2 + 2 + 6
+
+
+def test_trace_reconstructs_final_core():
+    round_obj, data = record_round()
+    reader = TraceReader(data)
+    assert reader.core_size() == 200
+    assert reader.warrior_names() == ["Imp", "Dwarf"]
+    assert reader.cycles() == round_obj.cycles()
+    assert [cycle for cycle, _ in reader.snapshots()] == list(range(0, round_obj.cycles(), 100))
+    core, _ = reader.state(reader.cycles())
+    assert core.to_bytes() == round_obj.core().to_bytes()
+
+
+def test_trace_snapshots_store_changed_cells():
+    file_handle = io.BytesIO()
+    recorder = TraceRecorder(file_handle, snapshot_interval=100)
+    round_obj = Round(get_warriors(), core_size=8000, max_cycles=2000, seed=3, hooks=RoundHooks(recorder=recorder))
+    round_obj.play()
+    recorder.finish()
+    data = file_handle.getvalue()
+    reader = TraceReader(data)
+    assert len(reader.snapshots()) == 21
+    # Whole trace is smaller than one full copy of the core; 21 of them were stored before
+    assert len(data) < round_obj.core().bytes_size()
+    assert reader.state(reader.cycles())[0].to_bytes() == round_obj.core().to_bytes()
+
+
+def test_trace_seeks_to_cycle():
+    _, data = record_round()
+    reader = TraceReader(data)
+    # The same round stopped earlier
+    short_round = Round(get_warriors(), core_size=200, max_cycles=249, seed=3)
+    short_round.play()
+    core, processes = reader.state(short_round.cycles())
+    assert core.to_bytes() == short_round.core().to_bytes()
+    assert len(processes) == 2
+    events = reader.events(start_cycle=251)
+    assert next(events).cycle == 251
+
+
+def test_trace_snapshot_has_processes():
+    warriors = [Warrior([SPL("B", "$", 2, "$", 0), JMP("B", "$", 0, "$", 0), JMP("B", "$", 0, "$", 0)],
+                        name="Splitter"), Warrior([JMP("B", "$", 0, "$", 0)], name="Loop")]
+    round_obj, data = record_round(max_cycles=50, snapshot_interval=20, warriors=warriors)
+    reader = TraceReader(data)
+    assert reader.state(0)[1] == [[position] for position in round_obj.record().positions]
+    splitter, loop = round_obj.record().positions
+    splitter_processes, loop_processes = reader.state(20)[1]
+    assert sorted(splitter_processes) == [splitter + 1, splitter + 2]
+    assert loop_processes == [loop]
+
+
+def test_unfinished_trace_is_indexed():
+    _, data = record_round()
+    reader = TraceReader(data)
+    footer_size = TRACE_TRAILER.size + INDEX_ENTRY.size * len(reader.snapshots())
+    unfinished = TraceReader(data[:-footer_size])
+    assert unfinished.snapshots() == reader.snapshots()
+    assert unfinished.cycles() == reader.cycles() - 1
+    # Truncated record at the end is skipped
+    truncated = TraceReader(data[:reader.snapshots()[-1][1] + 10])
+    assert truncated.snapshots() == reader.snapshots()[:-1]
+
+
+def test_invalid_trace():
+    with pytest.raises(ValueError):
+        TraceReader(b'CWAR')
+    with pytest.raises(ValueError):
+        TraceReader(b'\0' * 32)
+
+
+def test_trace_replay_without_simulation():
+    log = []
+
+    class ColorGUI(MockGUI):
+        def set_block_color(self, block_number, color, event):
+            log.append((block_number, event))
+
+        def clock_tick(self):
+            log.append('tick')
+
+    _, data = record_round(max_cycles=100)
+    reader = TraceReader(data)
+    reader.replay(ColorGUI(200), start_cycle=10)
+    events = list(reader.events())
+    # Events before start cycle are painted before the first tick
+    assert log[:log.index('tick')] == [(event.address, event.event) for event in events if event.cycle < 10]
+    assert [entry for entry in log if entry != 'tick'] == [(event.address, event.event) for event in events]
+    assert log.count('tick') == len({event.cycle for event in events if event.cycle >= 10})
+
+
+def test_game_records_every_round(tmp_path):
+    game = Game(get_warriors(), core_size=200, rounds=2, max_cycles=100, seed=1, trace=str(tmp_path / 'game'))
+    game.play()
+    for round_num in (1, 2):
+        reader = TraceReader.from_file(game.trace_path(round_num))
+        assert isinstance(next(reader._records(reader.snapshots()[0][1]))[1], TraceSnapshot)
+        assert reader.warrior_names() == ["Imp", "Dwarf"]
@@ -0,0 +1,22 @@
+from src.warrior import Warrior
+
+
+def test_process_queue_order():
+    warrior = Warrior(processes=[3, 5])
+    warrior.add_process(7)
+    assert warrior.next_process() == 3
+    assert warrior.processes() == [5, 7]
+    assert warrior.process_count() == 2
+
+
+def test_process_queue_max_processes():
+    warrior = Warrior(processes=[1], max_processes=2)
+    warrior.add_process(2)
+    warrior.add_process(3)
+    assert warrior.processes() == [1, 2]
+
+
+def test_processes_returns_copy():
+    warrior = Warrior(processes=[1])
+    warrior.processes().append(2)
+    assert warrior.process_count() == 1
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+import argparse
+import sys
+
+from src.args import IntBetween
+from src.config import MAX_PROCESSES, MAX_CORE_SIZE, MAX_ROUNDS, MAX_CYCLES, WARRIOR_CACHE_DIRECTORY
+from src.file import get_warrior_list
+from src.tournament import Tournament, DEFAULT_CHUNK_SIZE
+
+
+def parse_args(args):
+    parser = argparse.ArgumentParser()
+    parser.add_argument('warriors', nargs='+')
+    parser.add_argument('--rounds', nargs='?', default=100, type=IntBetween(1, MAX_ROUNDS))
+    parser.add_argument('--core-size', nargs='?', default=8000, type=IntBetween(100, MAX_CORE_SIZE))
+    parser.add_argument('--max-cycles', nargs='?', default=80000, type=IntBetween(100, MAX_CYCLES))
+    parser.add_argument('--max-processes', nargs='?', default=MAX_PROCESSES, type=IntBetween(1, MAX_CORE_SIZE))
+    parser.add_argument('--workers', nargs='?', default=None, type=IntBetween(1, 1024))
+    parser.add_argument('--chunk-size', nargs='?', default=DEFAULT_CHUNK_SIZE, type=IntBetween(1, 1000000))
+    parser.add_argument('--seed', nargs='?', default=None, type=int)
+    parser.add_argument('--batch', action='store_true')
+    parser.add_argument('--detect-ties', action='store_true')
+    parser.add_argument('--stall-checks', nargs='?', default=None, type=IntBetween(1, 1000))
+    parser.add_argument('--cache-dir', nargs='?', default=WARRIOR_CACHE_DIRECTORY)
+    parser.add_argument('--no-cache', action='store_true')
+    parser.add_argument('--profile', nargs='?', default=None,
+                        help='Profile instructions; report is saved to PROFILE.json, PROFILE.csv and PROFILE.folded')
+    return parser.parse_args(args[1:])
+
+
+def save_profile(profiler, prefix):
+    with open(f'{prefix}.json', 'w') as file_handle:
+        profiler.write_json(file_handle)
+    with open(f'{prefix}.csv', 'w', newline='') as file_handle:
+        profiler.write_csv(file_handle)
+    with open(f'{prefix}.folded', 'w') as file_handle:
+        profiler.write_folded(file_handle)
+
+
+def main(args):
+    args = parse_args(args)
+    warriors = get_warrior_list(args.warriors, None if args.no_cache else args.cache_dir, args.core_size)
+    if len(warriors) < 2:
+        print('At least two warriors are required')
+        return
+    tournament = Tournament(warriors, args.rounds, args.core_size, args.max_cycles, args.max_processes,
+                            args.workers, args.seed, args.chunk_size, args.batch, args.detect_ties,
+                            args.stall_checks, args.profile is not None)
+    tournament.play()
+    print(tournament.get_results_string())
+    if args.profile:
+        save_profile(tournament.profiler(), args.profile)
+
+
+if __name__ == '__main__':
+    main(sys.argv)